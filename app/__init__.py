@@ -7,6 +7,8 @@ from flask_session import Session
 from flask_migrate import Migrate
 from authlib.integrations.flask_client import OAuth
 from config import Config
+from app.utils.score_cache import score_cache
+from app.utils.seen_pairs import seen_pairs
 
 # Mail instance
 mail = Mail()
@@ -99,6 +101,17 @@ def create_app(config_class=Config):
     # Initialize the Flask Mail extension
     mail.init_app(app)
     
+    # Size the scoring result cache
+    score_cache.configure(app.config['SCORE_CACHE_SIZE'], app.config['SCORE_CACHE_TTL'])
+    
+    # Size the per-user store of vote pairs already shown
+    seen_pairs.configure(app.config['VOTE_SEEN_BLOOM_BITS'], app.config['VOTE_SEEN_BLOOM_HASHES'], app.config['VOTE_SEEN_MAX_ENTRIES'])
+    
+    # Fold write-behind votes from a thread in this process if no separate flusher runs
+    if app.config['VOTE_WRITE_BEHIND'] and app.config['VOTE_FLUSH_IN_PROCESS']:
+        from app.utils.vote import start_vote_flusher
+        start_vote_flusher(app)
+    
     # Initialize OAuth with the application
     oauth = OAuth(app)
     for name, config in app.config['OAUTH_PROVIDERS'].items():
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, Text, Date
+from sqlalchemy import Column, BigInteger, String, Text, Date, UniqueConstraint
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -18,6 +18,9 @@ class Challenge(Base):
         None
     """
     __tablename__ = 'daily_challenges'
+    __table_args__ = (
+        UniqueConstraint('category', 'date', name='uq_daily_challenges_category_date'),
+    )
     id = Column(BigInteger, primary_key=True)
     challenge_id = Column(String, unique=True, nullable=False)
     category = Column(String, nullable=False)
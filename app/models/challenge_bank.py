@@ -0,0 +1,27 @@
+from sqlalchemy import Column, BigInteger, String, Text, DateTime, Index
+from datetime import datetime
+from .base import Base
+
+# Define the BankedChallenge model
+class BankedChallenge(Base):
+    """
+    BankedChallenge model for the database. Rows are generated ahead of time by refill_challenge_bank.py
+    and removed when they are promoted to a daily challenge.
+    
+    Attributes:
+        id: The banked challenge ID.
+        category: The category of the challenge.
+        prompt: The generated challenge prompt.
+        created_at: When the prompt was generated.
+        
+    Methods:
+        None
+    """
+    __tablename__ = 'challenge_bank'
+    __table_args__ = (
+        Index('ix_challenge_bank_category_id', 'category', 'id'),
+    )
+    id = Column(BigInteger, primary_key=True)
+    category = Column(String(64), nullable=False)
+    prompt = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
@@ -4,7 +4,14 @@ from app.models.base import Base
 from app.models.user import User
 from app.models.submission import Submission
 from app.models.challenge import Challenge
+from app.models.challenge_bank import BankedChallenge
 from app.models.leaderboard import LeaderboardEntry
+from app.models.scoring_job import ScoringJob
+from app.models.rate_limit import RateLimitBucket
+from app.models.user_category_vote import UserCategoryVote
+from app.models.vote_event import VoteEvent
+from app.models.leaderboard_rollup import LeaderboardRollup, LeaderboardRollupState, LeaderboardSnapshot
+from app.models.score_preview import ScorePreview
 import os
 from datetime import datetime
 from typing import Optional
@@ -75,9 +82,10 @@ def create_user(session, email: str, name: str, total_votes: int = 0) -> None:
         session.rollback()
 
 #Function to insert a submission
-def insert_submission(session, user_id: int, username: str, date: datetime, user_phrase: str, category: str, challenge_id: str, challenge: str, initial_score: int, scored_first=False, final_submission=True) -> None:
+def insert_submission(session, user_id: int, username: str, date: datetime, user_phrase: str, category: str, challenge_id: str, challenge: str, initial_score: int, scored_first=False, final_submission=True, feedback: Optional[str] = None, score_status: str = 'done') -> int:
     """
-    Adds a new submission into the database.
+    Adds a new submission into the database. A submission with a 'pending' score_status is queued for
+    scoring_worker.py in the same transaction.
 
     Args:
         session (Session): The database session object.
@@ -91,18 +99,24 @@ def insert_submission(session, user_id: int, username: str, date: datetime, user
         initial_score (int): The initial score of the submission.
         scored_first (bool): Whether the user chose to score first before submitting.
         final_submission (bool): Whether this is the final submission or a preliminary scoring.
+        feedback (Optional[str]): The LLM feedback for the initial score, if already scored.
+        score_status (str): 'done' if initial_score is final, 'pending' to queue the submission for scoring.
 
     Returns:
-        None
+        int: The ID of the new submission.
     """
     try:
         new_submission = Submission(
             user_id=user_id, username=username, date=date, user_phrase=user_phrase,
             category=category, challenge_id=challenge_id, challenge=challenge, initial_score=initial_score,
-            scored_first=scored_first, final_submission=final_submission
+            scored_first=scored_first, final_submission=final_submission, feedback=feedback, score_status=score_status
         )
         session.add(new_submission)
+        if score_status == 'pending':
+            session.flush()
+            session.add(ScoringJob(submission_id=new_submission.id))
         session.commit()
+        return new_submission.id
     except Exception as e:
         print(f"Database operation error: {e}")
         session.rollback()
@@ -166,4 +180,4 @@ def drop_tables():
 # drop_tables()
 create_tables()
 
-__all__ = ['User', 'Submission', 'Challenge', 'LeaderboardEntry', 'get_db_connection', 'get_user_by_email', 'create_user', 'insert_submission', 'update_username', 'phrase_already_submitted']
\ No newline at end of file
+__all__ = ['User', 'Submission', 'Challenge', 'BankedChallenge', 'LeaderboardEntry', 'ScoringJob', 'RateLimitBucket', 'UserCategoryVote', 'VoteEvent', 'LeaderboardRollup', 'LeaderboardRollupState', 'LeaderboardSnapshot', 'ScorePreview', 'get_db_connection', 'get_user_by_email', 'create_user', 'insert_submission', 'update_username', 'phrase_already_submitted']
\ No newline at end of file
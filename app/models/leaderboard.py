@@ -1,9 +1,13 @@
 from app.models.base import Base
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 class LeaderboardEntry(Base):
     __tablename__ = 'leaderboard_entries'
+    # One entry per user, category and day. Leading with (category, date) lets the same index serve leaderboard reads.
+    __table_args__ = (
+        Index('ux_leaderboard_entries_category_date_user', 'category', 'date', 'user_id', unique=True),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -11,4 +15,4 @@ class LeaderboardEntry(Base):
     score = Column(Integer, nullable=False)
     date = Column(Date, nullable=False)
 
-    user = relationship("User", back_populates="leaderboard_entries")
\ No newline at end of file
+    user = relationship("User", back_populates="leaderboard_entries")
@@ -0,0 +1,71 @@
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey
+from datetime import datetime
+from .base import Base
+
+# Define the LeaderboardRollup model
+class LeaderboardRollup(Base):
+    """
+    LeaderboardRollup model for the database. A user's total leaderboard score in a category over the current
+    window of a rolling period ('weekly', 'monthly' or 'all-time'), kept up to date by update_leaderboards.py
+    as each day is finalized instead of being summed from leaderboard_entries on every read.
+
+    Attributes:
+        category: The category of the leaderboard.
+        period: The rolling period.
+        user_id: The ID of the user.
+        score: The user's total score in the period's window.
+
+    Methods:
+        None
+    """
+    __tablename__ = 'leaderboard_rollups'
+    category = Column(String(64), primary_key=True)
+    period = Column(String(16), primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    score = Column(Integer, nullable=False, default=0)
+
+# Define the LeaderboardRollupState model
+class LeaderboardRollupState(Base):
+    """
+    LeaderboardRollupState model for the database. Records the window each category's rollup for a period
+    currently covers, so the next finalized day can be applied incrementally.
+
+    Attributes:
+        category: The category of the leaderboard.
+        period: The rolling period.
+        window_start: The first day counted in the rollup.
+        through_date: The last finalized day counted in the rollup.
+        updated_at: When the rollup was last updated.
+
+    Methods:
+        None
+    """
+    __tablename__ = 'leaderboard_rollup_state'
+    category = Column(String(64), primary_key=True)
+    period = Column(String(16), primary_key=True)
+    window_start = Column(Date, nullable=True)
+    through_date = Column(Date, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
+
+# Define the LeaderboardSnapshot model
+class LeaderboardSnapshot(Base):
+    """
+    LeaderboardSnapshot model for the database. The ranked top entries of each category's rollup for a period,
+    rewritten whenever the rollup changes, so reading a leaderboard is a primary key range scan.
+
+    Attributes:
+        category: The category of the leaderboard.
+        period: The rolling period.
+        position: The 1-based rank.
+        user_id: The ID of the user at this rank.
+        score: The user's total score in the period's window.
+
+    Methods:
+        None
+    """
+    __tablename__ = 'leaderboard_snapshots'
+    category = Column(String(64), primary_key=True)
+    period = Column(String(16), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    score = Column(Integer, nullable=False)
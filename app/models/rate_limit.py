@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Float, DateTime
+from datetime import datetime
+from .base import Base
+
+# Define the RateLimitBucket model
+class RateLimitBucket(Base):
+    """
+    RateLimitBucket model for the database. Holds the token buckets of the rate limiter when it is shared
+    across worker processes (RATE_LIMIT_BACKEND = 'database').
+    
+    Attributes:
+        key: The bucket key, e.g. 'score:user:42' or 'challenge:global'.
+        tokens: The number of tokens left at updated_at.
+        updated_at: When the bucket was last refilled.
+        
+    Methods:
+        None
+    """
+    __tablename__ = 'rate_limit_buckets'
+    key = Column(String(255), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime, nullable=False, default=datetime.now)
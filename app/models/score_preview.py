@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+from .base import Base
+
+# Define the ScorePreview model
+class ScorePreview(Base):
+    """
+    ScorePreview model for the database. The score and feedback of a score-first preview, so the final
+    submission can reuse them from any worker instead of scoring the phrase again. Rows older than
+    SCORE_CACHE_TTL are ignored and removed as new previews are stored.
+    
+    Attributes:
+        cache_key: The normalized hash of the phrase, category and challenge (score_cache_key).
+        score: The preview score.
+        feedback: The preview feedback.
+        created_at: When the preview was scored.
+        
+    Methods:
+        None
+    """
+    __tablename__ = 'score_previews'
+    __table_args__ = (
+        Index('ix_score_previews_created_at', 'created_at'),
+    )
+    cache_key = Column(String(64), primary_key=True)
+    score = Column(Integer, nullable=False)
+    feedback = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, BigInteger, String, Text, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import text
+from datetime import datetime
+from .base import Base
+
+# Define the ScoringJob model
+class ScoringJob(Base):
+    """
+    ScoringJob model for the database. Each row is a submission waiting to be scored by scoring_worker.py.
+    Rows are deleted once the submission has been scored, so the table only holds outstanding or failed work.
+    
+    Attributes:
+        id: The job ID.
+        submission_id: The ID of the submission to score.
+        status: The job status ('pending', 'running' or 'failed').
+        attempts: The number of times a worker has claimed the job.
+        last_error: The error from the last failed attempt.
+        created_at: When the job was queued.
+        locked_at: When a worker last claimed the job.
+        submission: The submission with a relationship to the Submission model.
+        
+    Methods:
+        None
+    """
+    __tablename__ = 'scoring_jobs'
+    __table_args__ = (
+        Index('ix_scoring_jobs_status_id', 'status', 'id'),
+    )
+    id = Column(BigInteger, primary_key=True)
+    submission_id = Column(BigInteger, ForeignKey('submissions.id', ondelete='CASCADE'), unique=True, nullable=False)
+    status = Column(String(16), nullable=False, default='pending', server_default=text("'pending'"))
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    locked_at = Column(DateTime, nullable=True)
+    
+    submission = relationship("Submission")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, String, Text, Date, Integer, ForeignKey, Boolean
+from sqlalchemy import Column, BigInteger, String, Text, Date, Integer, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import text
 from .base import Base
@@ -18,7 +18,10 @@ class Submission(Base):
         user_id: The ID of the user who submitted the phrase.
         username: The username of the user who submitted the phrase.
         initial_score: The initial score of the submission.
+        score_status: Whether the initial score is 'done', still 'pending' in the scoring queue, or 'failed'.
+        feedback: The LLM feedback for the initial score.
         votes: The number of votes the submission has.
+        impressions: The number of times the submission has been shown on the vote page.
         user: The user who submitted the phrase with a relationship to the User model.
         scored_first: Whether the submission was scored first.
         final_submission: Whether the submission is the final submission.
@@ -27,6 +30,9 @@ class Submission(Base):
         None
     """
     __tablename__ = 'submissions'
+    __table_args__ = (
+        Index('ix_submissions_category_date', 'category', 'date'),
+    )
     id = Column(BigInteger, primary_key=True)
     date = Column(Date, nullable=False, index=True)
     category = Column(String(64), nullable=False)
@@ -36,7 +42,10 @@ class Submission(Base):
     user_id = Column(Integer, ForeignKey('users.id'), index=True, nullable=False)
     username = Column(String(128), nullable=True)
     initial_score = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    score_status = Column(String(16), nullable=False, default='done', server_default=text("'done'"))
+    feedback = Column(Text, nullable=True)
     votes = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    impressions = Column(Integer, nullable=False, default=0, server_default=text("0"))
     
     scored_first = Column(Boolean, default=False)
     final_submission = Column(Boolean, default=True)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy.sql import text
+from .base import Base
+
+# Define the UserCategoryVote model
+class UserCategoryVote(Base):
+    """
+    UserCategoryVote model for the database. One row per user, category and voting date, holding the number of
+    votes the user has cast. Replaces the per-user votes_per_category JSONB for vote limit enforcement.
+    
+    Attributes:
+        user_id: The ID of the user who voted.
+        category: The category voted in.
+        date: The date of the submissions voted on.
+        votes: The number of votes cast.
+        
+    Methods:
+        None
+    """
+    __tablename__ = 'user_category_votes'
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    category = Column(String(64), primary_key=True)
+    date = Column(Date, primary_key=True)
+    votes = Column(Integer, nullable=False, default=0, server_default=text("0"))
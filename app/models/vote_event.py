@@ -0,0 +1,25 @@
+from sqlalchemy import Column, BigInteger, Integer, DateTime, ForeignKey
+from datetime import datetime
+from .base import Base
+
+# Define the VoteEvent model
+class VoteEvent(Base):
+    """
+    VoteEvent model for the database. Votes are appended here in the voter's transaction and folded into
+    submissions.votes in batches by flush_vote_events, so concurrent votes never wait on a submission's row lock.
+    Rows are deleted as they are folded, so the table only holds votes not yet counted on their submission.
+    
+    Attributes:
+        id: The event ID.
+        submission_id: The ID of the submission voted for.
+        user_id: The ID of the user who voted.
+        created_at: When the vote was cast.
+        
+    Methods:
+        None
+    """
+    __tablename__ = 'vote_events'
+    id = Column(BigInteger, primary_key=True)
+    submission_id = Column(BigInteger, ForeignKey('submissions.id', ondelete='CASCADE'), nullable=False)
+    user_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
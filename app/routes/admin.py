@@ -1,10 +1,17 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
-from datetime import datetime
-from app.models.db import get_db_connection, User, Submission, Challenge, get_user_by_email, create_user, update_username
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app
+from datetime import datetime, timedelta
+from app.models.db import get_db_connection, User, Submission, Challenge, get_user_by_email, update_username
 from app.utils.auth import admin_required
 from app.utils.email import is_valid_email
 from app.utils.auth import is_strong_password
-from app.utils.vote import format_category_name
+from app.utils.vote import format_category_name, get_vote_history, set_vote_counts, VOTE_LIMIT_WINDOW_DAYS
+from app.utils.challenge_cache import invalidate_challenge_cache
+from app.utils.score_cache import score_cache
+from app.utils.llm import get_provider
+from app.utils.prefilter import phrase_prefilter
+from app.utils.rate_limit import get_rate_limiter
+from app.utils.seen_pairs import seen_pairs
+from app.utils.live_leaderboard import get_live_leaderboard
 import bleach
 import json
 
@@ -32,6 +39,22 @@ def admin_dashboard():
     finally:
         session_db.close()
 
+@admin_bp.route('/metrics')
+@admin_required
+def metrics():
+    """
+    Report the in-process counters for this worker.
+    """
+    provider = get_provider()
+    return jsonify({
+        'score_cache': score_cache.stats(),
+        'prefilter': phrase_prefilter.stats(),
+        'rate_limits': get_rate_limiter().stats(),
+        'seen_pairs': seen_pairs.stats(),
+        'live_leaderboard': get_live_leaderboard().stats(),
+        'llm_breakers': provider.stats() if hasattr(provider, 'stats') else {}
+    })
+
 @admin_bp.route('/users')
 @admin_required
 def list_users():
@@ -87,6 +110,10 @@ def update_user(user_id):
             flash('User not found.', 'error')
             return redirect(url_for('admin.list_users'))
         
+        # Show the vote counts that still affect vote limits
+        since = datetime.now(current_app.config['TIMEZONE']).date() - timedelta(days=VOTE_LIMIT_WINDOW_DAYS)
+        recent_votes = get_vote_history(session_db, user.id, since)
+        
         if request.method == 'POST':
             new_name = bleach.clean(request.form['name'])
             new_email = bleach.clean(request.form['email'])
@@ -99,20 +126,21 @@ def update_user(user_id):
             user.is_admin = 'is_admin' in request.form
             user.email_verified = 'email_verified' in request.form
             
-            # Handle votes_per_category (JSONB field)
+            # Handle votes per category, stored in user_category_votes
             try:
                 votes_per_category = json.loads(request.form['votes_per_category'])
-                user.votes_per_category = votes_per_category
-            except json.JSONDecodeError:
+                set_vote_counts(session_db, user.id, votes_per_category, since)
+            except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+                session_db.rollback()
                 flash('Invalid JSON for votes per category', 'error')
-                return render_template('admin/update_user.html', user=user)
+                return render_template('admin/update_user.html', user=user, votes_per_category=recent_votes)
 
             update_username(session_db, user.id, new_name)
             session_db.commit()
             flash('User updated successfully.', 'success')
             return redirect(url_for('admin.list_users'))
         
-        return render_template('admin/update_user.html', user=user)
+        return render_template('admin/update_user.html', user=user, votes_per_category=recent_votes)
     finally:
         session_db.close()
 
@@ -195,6 +223,7 @@ def edit_challenge(challenge_id):
                 return render_template('admin/edit_challenge.html', challenge=challenge)
             
             session_db.commit()
+            invalidate_challenge_cache()
             flash('Challenge updated successfully.', 'success')
             return redirect(url_for('admin.list_challenges'))
         
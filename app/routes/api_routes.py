@@ -1,14 +1,21 @@
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, jsonify, request, session, Response, stream_with_context, current_app
 from sqlalchemy import text
 from datetime import datetime, date, timedelta
 from sqlalchemy.exc import SQLAlchemyError
 from app.models.db import get_db_connection, phrase_already_submitted, insert_submission, User
-from app.utils.score import calculate_initial_score
+from app.utils.score import calculate_initial_score, get_cached_score, stream_initial_score
+from app.utils.scoring_queue import get_submission_score
+from app.utils.score_previews import store_score_preview, get_score_preview
 from app.utils.auth import login_required, admin_required
 from app.utils.get_challenge import get_or_create_daily_challenge
 from app.utils.get_leaderboard import get_leaderboard, update_daily_leaderboard
+from app.utils.leaderboard_rollups import get_rollup_leaderboard, ROLLUP_PERIODS
 from app.utils.streaks import update_submission_streak
+from app.utils.llm import LLMProviderError
+from app.utils.prefilter import prefilter_phrase, phrase_prefilter
+from app.utils.rate_limit import check_rate_limit, enforce_rate_limit, too_many_requests, RateLimitExceeded
 import bleach
+import json
 
 # Create a Blueprint for the API routes
 api_bp = Blueprint('api', __name__)
@@ -43,12 +50,16 @@ def generate_category_challenge(category):
     category = bleach.clean(category)
 
     try:
-        # Get or create a daily challenge for the category
-        challenge_id, challenge = get_or_create_daily_challenge(category, session_db)
+        # Get or create a daily challenge for the category; only an inline OpenAI generation is rate limited
+        challenge_id, challenge = get_or_create_daily_challenge(category, session_db, lambda: enforce_rate_limit('challenge'))
         if challenge_id is None or challenge is None:
             return jsonify({'error': 'Failed to retrieve or create challenge'}), 500
         
         return jsonify({'challenge_id': challenge_id, 'challenge': challenge, 'category': category})
+    except RateLimitExceeded as e:
+        return too_many_requests(e.retry_after)
+    except LLMProviderError:
+        return jsonify({'error': 'Challenge generation is temporarily unavailable. Please try again shortly.'}), 503
     except Exception as e:
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
@@ -107,17 +118,37 @@ def submit_phrase():
         
         previously_scored = session.get(session_key, False)
         
+        # The score-first preview is the LLM-backed part of this endpoint
         if score_first and not previously_scored:
-            initial_score, feedback = calculate_initial_score(user_phrase, category, challenge)
+            retry_after = check_rate_limit('score')
+            if retry_after > 0:
+                return too_many_requests(retry_after)
+        
+        # Obvious junk gets a fixed score without an LLM call. A previewed phrase was already checked for duplicates.
+        rejected = prefilter_phrase(session_db, user_phrase, challenge_id, challenge, not previously_scored) if score_first or previously_scored else None
+        
+        if score_first and not previously_scored:
+            if rejected is not None:
+                initial_score, feedback = rejected
+            else:
+                initial_score, feedback = calculate_initial_score(user_phrase, category, challenge)
+                store_score_preview(session_db, user_phrase, category, challenge, initial_score, feedback)
             session[session_key] = True
             return jsonify({'message': 'Phrase scored', 'feedback': feedback, 'score': initial_score}), 200
 
         # If we're here, it's a submission (either direct or after scoring)
-        if previously_scored:
-            # Recalculate score for consistency
-            initial_score, _ = calculate_initial_score(user_phrase, category, challenge)
-        else:
-            initial_score = 0
+        feedback = None
+        score_status = 'done'
+        initial_score = 0
+        if rejected is not None:
+            initial_score, feedback = rejected
+        elif previously_scored:
+            # Reuse the preview score from this worker or the one that scored it, otherwise queue the phrase for the scoring worker
+            cached = get_cached_score(user_phrase, category, challenge) or get_score_preview(session_db, user_phrase, category, challenge)
+            if cached is not None:
+                initial_score, feedback = cached
+            else:
+                score_status = 'pending'
         
         # Validate user ID, user phrase, challenge ID, challenge, and category
         if not all([user_id, user_phrase, challenge_id, challenge, category]):
@@ -125,11 +156,13 @@ def submit_phrase():
             return jsonify({'error': f"Missing {', '.join(missing)}"}), 400
         
         # Insert submission into database
-        insert_submission(session_db, user_id, username, current_date, user_phrase, category, 
-                        challenge_id, challenge, initial_score=initial_score, scored_first=score_first)
+        submission_id = insert_submission(session_db, user_id, username, current_date, user_phrase, category, 
+                        challenge_id, challenge, initial_score=initial_score, scored_first=score_first,
+                        feedback=feedback, score_status=score_status)
         
         # Commit the insertion to ensure the user and submission are in the database
         session_db.commit()
+        phrase_prefilter.record_submission(challenge_id, user_phrase)
         
         # Clear the scoring session for this challenge
         session.pop(session_key, None)
@@ -140,13 +173,18 @@ def submit_phrase():
             update_submission_streak(user_obj, session_db)
             session_db.commit()
     
-        return jsonify({'message': 'Submission successful!'}), 200
+        return jsonify({'message': 'Submission successful!', 'submission_id': submission_id, 'score_status': score_status}), 200
         
     # Handle database errors
     except SQLAlchemyError as e:
         session_db.rollback()
         return jsonify({'error': 'Database error: ' + str(e)}), 500
     
+    # Handle a failing or unavailable LLM provider
+    except LLMProviderError:
+        session_db.rollback()
+        return jsonify({'error': 'Scoring is temporarily unavailable. Please try again shortly.'}), 503
+    
     # Handle other exceptions
     except Exception as e:
         session_db.rollback()
@@ -156,15 +194,118 @@ def submit_phrase():
     finally:
         session_db.close()
     
+# Route to stream the score-first preview
+@api_bp.route('/score_phrase_stream', methods=['POST'])
+@login_required
+def score_phrase_stream():
+    
+    """
+    Stream the score-first evaluation of a phrase over Server-Sent Events. Each feedback chunk is sent as a data event
+    as soon as the LLM produces it, followed by a 'score' event with the parsed score and the full feedback.
+    """
+    current_date = datetime.now().date()
+    data = request.get_json()
+    user_id = session['user'].get('id')
+    
+    required_fields = ['user_phrase', 'challenge_id']
+    if not data or not all(field in data for field in required_fields):
+        return jsonify({'error': 'Missing required fields'}), 400
+    
+    challenge_id = data['challenge_id']
+    user_phrase = data['user_phrase']
+    session_key = f'scored_{challenge_id}'
+    
+    session_stream = get_db_connection()
+    try:
+        # Fetch challenge details from the database
+        challenge_data = session_stream.execute(
+            text("SELECT category, original_challenge FROM daily_challenges WHERE challenge_id = :challenge_id"),
+            {'challenge_id': challenge_id}
+        ).fetchone()
+        
+        if not challenge_data:
+            return jsonify({'error': 'Invalid challenge ID'}), 400
+        
+        category, challenge = challenge_data
+        
+        if len(user_phrase) < 3:
+            return jsonify({'error': 'Phrase must be at least 3 characters long.'}), 400
+        
+        if len(user_phrase) > 150:  # Adjust to match script.js limit
+            return jsonify({'error': 'Character limit exceeded'}), 400
+        
+        if phrase_already_submitted(session_stream, user_id, category, current_date):
+            return jsonify({'error': 'You have already submitted a phrase for this category today.'}), 400
+        
+        if session.get(session_key, False):
+            return jsonify({'error': 'This phrase has already been scored.'}), 400
+        
+        retry_after = check_rate_limit('score')
+        if retry_after > 0:
+            return too_many_requests(retry_after)
+        
+        # Obvious junk gets a fixed score without an LLM call
+        rejected = prefilter_phrase(session_stream, user_phrase, challenge_id, challenge)
+    finally:
+        session_stream.close()
+    
+    # The session is saved before the body streams, so mark the challenge as scored up front
+    session[session_key] = True
+    
+    def events():
+        if rejected is not None:
+            score, feedback = rejected
+            yield f"data: {json.dumps(feedback)}\n\n"
+            yield f"event: score\ndata: {json.dumps({'score': score, 'feedback': feedback})}\n\n"
+            return
+        try:
+            for event, payload in stream_initial_score(user_phrase, category, challenge):
+                if event == 'chunk':
+                    yield f"data: {json.dumps(payload)}\n\n"
+                else:
+                    score, feedback = payload
+                    session_preview = get_db_connection()
+                    try:
+                        store_score_preview(session_preview, user_phrase, category, challenge, score, feedback)
+                    finally:
+                        session_preview.close()
+                    yield f"event: score\ndata: {json.dumps({'score': score, 'feedback': feedback})}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': 'An unexpected error occurred: ' + str(e)})}\n\n"
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @api_bp.route('/check_previous_score/<challenge_id>', methods=['GET'])
 @login_required
 def check_previous_score(challenge_id):
     previously_scored = session.get(f'scored_{challenge_id}', False)
     return jsonify({'previously_scored': previously_scored}), 200
 
+@api_bp.route('/submission_status/<int:submission_id>', methods=['GET'])
+@login_required
+def submission_status(submission_id):
+    """
+    Report whether a submission has been scored yet. Polled by the client after a queued submission.
+    
+    Args:
+        submission_id (int): The ID of the submission.
+    
+    Returns:
+        JSON: The scoring status, and the score and feedback once scoring is done.
+    """
+    session_status = get_db_connection()
+    try:
+        status = get_submission_score(session_status, submission_id, session['user']['id'])
+        if status is None:
+            return jsonify({'error': 'Submission not found'}), 404
+        return jsonify(status), 200
+    finally:
+        session_status.close()
+
 @api_bp.route('/leaderboard/<category>/<timeframe>')
 def get_leaderboard_api(category, timeframe):
-    today = date.today()
+    today = datetime.now(current_app.config['TIMEZONE']).date()
     if timeframe == 'daily':
         start_date = end_date = today - timedelta(days=1)
     elif timeframe == 'weekly':
@@ -180,6 +321,16 @@ def get_leaderboard_api(category, timeframe):
     else:
         return jsonify({'error': 'Invalid timeframe'}), 400
 
+    # Rolling periods are served from their ranked snapshot while update_leaderboards.py keeps it current
+    if timeframe in ROLLUP_PERIODS:
+        session_rollup = get_db_connection()
+        try:
+            leaderboard = get_rollup_leaderboard(session_rollup, category, timeframe, end_date)
+        finally:
+            session_rollup.close()
+        if leaderboard is not None:
+            return jsonify(leaderboard)
+
     leaderboard = get_leaderboard(category, start_date, end_date)
     return jsonify(leaderboard)
 
@@ -1,11 +1,12 @@
 from flask import Blueprint, request, session, redirect, url_for, flash, render_template, current_app
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta
 from flask_wtf.csrf import validate_csrf
 from wtforms.validators import ValidationError
-from sqlalchemy.sql import text
 from app.models.db import get_db_connection, User, Submission
-from app.utils.vote import get_user_votes, increment_user_vote, reset_daily_votes, MAX_VOTES_PER_CATEGORY, format_category_name
-from app.utils.get_leaderboard import get_leaderboard
+from app.utils.vote import get_user_votes, cast_vote, VoteError, MAX_VOTES_PER_CATEGORY, format_category_name
+from app.utils.get_leaderboard import get_leaderboards, leaderboard_timeframes
+from app.utils.vote_candidates import next_vote_pair
+from app.utils.live_leaderboard import get_live_leaderboard
 import bleach
 import logging
 
@@ -14,11 +15,6 @@ logger = logging.getLogger(__name__)
 # Create a Blueprint for the view routes
 view_bp = Blueprint('view', __name__)
 
-@view_bp.before_request
-def before_request():
-    # This will reset votes daily. You might want to optimize this to run only once per day.
-    reset_daily_votes()
-
 # Route to the index page
 @view_bp.route('/')
 def index():
@@ -55,14 +51,14 @@ def vote():
     progress_class = ''
     progress_width = 0
     
-    # Fetch the user object
-    if 'user' in session:
+    # Fetch the user object for the page; the vote itself only needs the user ID from the session
+    if 'user' in session and request.method == 'GET':
         user_id = session['user']['id']
         user = session_db.query(User).filter_by(id=user_id).first()
         
         if user:
-            yesterday = (date.today() - timedelta(days=1)).isoformat()
-            votes_used = user.votes_per_category.get(yesterday, {}).get(category, 0)
+            vote_date = (et_now - timedelta(days=1)).date()
+            votes_used = get_user_votes(session_db, user.id, category, vote_date)
             votes_remaining = MAX_VOTES_PER_CATEGORY - votes_used 
             
             if votes_remaining == 0:
@@ -89,45 +85,32 @@ def vote():
             flash("Invalid CSRF token.", "error")
             return redirect(url_for('view.vote', category=category))
         
-        # Check if the user has reached the voting limit for this category
-        if votes_remaining <= 0:
-            flash(f"You have reached your voting limit for the {formatted_category} category.", "error")
-            return redirect(url_for('view.vote', category=category))
-        
         # Handle the vote submission
-        voted_submission_id = request.form.get('submission_id')
-        voted_submission_id = bleach.clean(voted_submission_id)
-    
-        # Check if the user is trying to vote on their own submission
-        submission_owner = session_db.execute(
-            text('SELECT username FROM submissions WHERE id = :id'),
-            {'id': voted_submission_id}
-        ).scalar()
-        
-        if submission_owner == session['user']['name']:
-            flash("You cannot vote for your own submission.", "error")
+        try:
+            voted_submission_id = int(bleach.clean(request.form.get('submission_id', '')))
+        except ValueError:
+            flash("Invalid submission.", "error")
             return redirect(url_for('view.vote', category=category))
         
-        # Update the vote count for the selected submission
+        # Check the limit, count the vote and update the voting streak in one transaction
         try:
-            session_db.execute(
-                text('UPDATE submissions SET votes = votes + 1 WHERE id = :id'),
-                {'id': voted_submission_id}
-            )
-            
-            # Increment the user's votes for this category and update the voting streak
-            remaining_votes = increment_user_vote(user, category, session_db)
+            vote_date = (et_now - timedelta(days=1)).date()
+            remaining_votes = cast_vote(session_db, session['user']['id'], voted_submission_id, category, vote_date)
             
-            if remaining_votes is None:
-                raise Exception("Failed to increment user vote")
-
-            session_db.commit()
+            # The vote is already committed; a failure here only delays it on the live standings until the next rebuild
+            try:
+                get_live_leaderboard().record_vote(session_db, category, vote_date, voted_submission_id)
+            except Exception as e:
+                logger.error(f"Error updating the live leaderboard: {e}")
             
             if remaining_votes > 0:
                 flash(f"Vote successful! You have {remaining_votes} vote{'s' if remaining_votes != 1 else ''} left for the {formatted_category} category.", "success")
             else:
                 flash(f"Vote successful! You have used all your votes for the {formatted_category} category today.", "success")
                 
+            return redirect(url_for('view.vote', category=category))
+        except VoteError as e:
+            flash(str(e), "error")
             return redirect(url_for('view.vote', category=category))
         except Exception as e:
             session_db.rollback()
@@ -144,44 +127,23 @@ def vote():
             # Calculate the date for the previous day
             yesterday = (et_now - timedelta(days=1)).date()
             
-            # Fetch two random submissions from the previous day for the given category
-            submissions_result = session_db.execute(
-                text('''
-                    SELECT id, username, category, challenge, user_phrase, votes 
-                    FROM submissions 
-                    WHERE category = :category 
-                    AND DATE(date) = :yesterday_date
-                    ORDER BY RANDOM() 
-                    LIMIT 2
-                '''),
-                {'category': category, 'yesterday_date': yesterday}
-            ).fetchall()
-            
-            submissions = [{column: value for column, value in zip(['id', 'username', 'category', 'challenge', 'user_phrase', 'votes'], submission)} for submission in submissions_result]
+            # Fetch the two least-shown submissions from the previous day for the given category
+            submissions = next_vote_pair(session_db, category, yesterday, user.id if user else None) or []
             
             # Check if there are enough submissions to vote on
             if len(submissions) < 2:
                 return render_template('main/error.html', error_message='Not enough submissions to vote on.')
                 
-            # Fetch the leaderboard for the category
-            leaderboard_result = session_db.execute(
-                text('''
-                    SELECT username, SUM(votes) as total_votes
-                    FROM submissions
-                    WHERE category = :category
-                    GROUP BY username
-                    ORDER BY total_votes DESC
-                    LIMIT 10
-                '''),
-                {'category': category}
-            ).fetchall()
-
-            leaderboard = [{column: value for column, value in zip(['username', 'total_votes'], entry)} for entry in leaderboard_result]
+            # Fetch the live standings for the day being voted on, and the user's place in them
+            live_leaderboard = get_live_leaderboard()
+            leaderboard = live_leaderboard.top(session_db, category, yesterday, 10)
+            user_rank = live_leaderboard.rank(session_db, category, yesterday, user.name) if user else None
             
             return render_template('votes/vote.html', 
                         submission1=submissions[0],
                         submission2=submissions[1],
                         leaderboard=leaderboard,
+                        user_rank=user_rank,
                         username=username,
                         category=category,
                         formatted_category=formatted_category,
@@ -246,18 +208,17 @@ def leaderboards():
     categories = ['tiny_story', 'scene_description', 'specific_word', 'rhyming_phrase', 'emotion', 'dialogue', 'idiom', 'slogan', 'movie_quote']
     today = datetime.now().date()
     et_now = datetime.now(current_app.config['TIMEZONE'])
-    daily_leaderboards = {}
-    weekly_leaderboards = {}
-    monthly_leaderboards = {}
-    
-    for category in categories:
-        daily_leaderboards[category] = get_leaderboard(category, today - timedelta(days=1), today - timedelta(days=1))
-        weekly_leaderboards[category] = get_leaderboard(category, today - timedelta(days=7), today - timedelta(days=1))
-        monthly_leaderboards[category] = get_leaderboard(category, today.replace(day=1) - timedelta(days=1), today - timedelta(days=1))
+
+    # Every category and timeframe is ranked in one query
+    session_db = get_db_connection()
+    try:
+        leaderboards = get_leaderboards(session_db, categories, leaderboard_timeframes(today))
+    finally:
+        session_db.close()
     
     return render_template('votes/leaderboards.html', 
-                            daily_leaderboards=daily_leaderboards,
-                            weekly_leaderboards=weekly_leaderboards,
-                            monthly_leaderboards=monthly_leaderboards,
+                            daily_leaderboards=leaderboards['daily'],
+                            weekly_leaderboards=leaderboards['weekly'],
+                            monthly_leaderboards=leaderboards['monthly'],
                             categories=categories,
                             server_time=et_now.isoformat())
\ No newline at end of file
@@ -216,6 +216,11 @@ async function submitPhrase() {
         return;
     }
 
+    if (scoreFirst && !hasScored) {
+        await streamScore(userPhrase);
+        return;
+    }
+
     displayFeedback('Submitting...', '');
 
     try {
@@ -232,6 +237,9 @@ async function submitPhrase() {
         } else if (data.message === 'Submission successful!') {
             displayFeedback("Phrase submitted successfully!", 'success');
             setTimeout(resetUI, 2000);
+            if (data.score_status === 'pending') {
+                pollSubmissionStatus(data.submission_id);
+            }
         }
     } catch (error) {
         console.error('Error submitting phrase:', error);
@@ -239,6 +247,93 @@ async function submitPhrase() {
     }
 }
 
+// Stream the score-first evaluation and show the feedback as it arrives
+async function streamScore(userPhrase) {
+    displayFeedback('Scoring...', 'info');
+
+    try {
+        const csrfToken = document.querySelector('meta[name="csrf-token"]').getAttribute('content');
+        const response = await fetch('/api/score_phrase_stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': csrfToken
+            },
+            body: JSON.stringify({
+                user_phrase: userPhrase,
+                challenge_id: currentChallengeId
+            })
+        });
+
+        if (!response.ok) {
+            const data = await response.json();
+            throw new Error(data.error);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let partial = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            // Server-Sent Events are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let eventType = 'message';
+                let eventData = '';
+                rawEvent.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) eventType = line.slice(7);
+                    if (line.startsWith('data: ')) eventData += line.slice(6);
+                });
+                const payload = JSON.parse(eventData);
+
+                if (eventType === 'message') {
+                    partial += payload;
+                    elements.feedbackDisplay.textContent = partial;
+                } else if (eventType === 'score') {
+                    displayFeedback(formatFeedback(payload.feedback), 'info');
+                    hasScored = true;
+                    elements.scoreFirstToggle.disabled = true;
+                    updateButtonText();
+                } else if (eventType === 'error') {
+                    throw new Error(payload.error);
+                }
+            }
+        }
+    } catch (error) {
+        console.error('Error scoring phrase:', error);
+        displayFeedback(`Error: ${error.message}`, 'error');
+    }
+}
+
+// Poll until a queued submission has been scored, then show the score
+async function pollSubmissionStatus(submissionId, attempt = 0) {
+    const maxAttempts = 30;
+    try {
+        const response = await fetch(`/api/submission_status/${submissionId}`);
+        const data = await response.json();
+
+        if (data.status === 'done') {
+            displayFeedback(`Phrase submitted successfully! Your score: ${data.score}/10`, 'success');
+            return;
+        }
+        if (data.status === 'failed' || !response.ok) return;
+    } catch (error) {
+        console.error('Error checking submission status:', error);
+    }
+
+    if (attempt < maxAttempts) {
+        setTimeout(() => pollSubmissionStatus(submissionId, attempt + 1), 2000);
+    }
+}
+
 // Display feedback to the user
 function displayFeedback(message, type) {
     elements.feedbackDisplay.innerHTML = message;
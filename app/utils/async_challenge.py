@@ -0,0 +1,202 @@
+from typing import Tuple, Optional, List, Dict, Iterable, Hashable
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text, bindparam
+from flask import current_app
+from datetime import date
+import asyncio
+from app.utils.get_challenge import challenge_request, store_challenge
+from app.utils.llm import get_provider
+from app.utils.challenge_bank import take_banked_challenge, return_banked_challenge, bank_levels
+
+# Function to generate a single challenge on the async client
+async def _generate_one(client, semaphore: asyncio.Semaphore, key: Hashable, category: str, timeout: float) -> Tuple[Hashable, Optional[str]]:
+    """
+    Generate one challenge on an async provider session, waiting for a free slot so no more than the configured number of calls are in flight.
+
+    Returns:
+        Tuple[Hashable, Optional[str]]: The request key and the challenge text, or None if the call failed.
+    """
+    async with semaphore:
+        try:
+            challenge = await asyncio.wait_for(
+                client.complete('challenge', **challenge_request(category)),
+                timeout=timeout
+            )
+            return key, challenge.strip()
+        except asyncio.TimeoutError:
+            current_app.logger.error(f"Timed out generating {category} challenge ({key}) after {timeout}s")
+        except Exception as e:
+            current_app.logger.error(f"Error generating {category} challenge ({key}): {e}")
+        return key, None
+
+# Function to run many generation requests concurrently
+async def _generate_many(requests: Iterable[Tuple[Hashable, str]], max_concurrency: int, timeout: float) -> Dict[Hashable, str]:
+    """
+    Run (key, category) generation requests concurrently on the provider's async client (AsyncOpenAI for OpenAI).
+
+    Returns:
+        Dict[Hashable, str]: The generated challenge text keyed by request key. Failed requests are omitted.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    async with get_provider().async_session() as client:
+        results = await asyncio.gather(*[
+            _generate_one(client, semaphore, key, category, timeout)
+            for key, category in requests
+        ])
+    return {key: challenge for key, challenge in results if challenge is not None}
+
+# Function to generate many challenges concurrently
+async def generate_challenges_async(pairs: Iterable[Tuple[str, date]], max_concurrency: int = 4, timeout: float = 30.0) -> Dict[Tuple[str, date], str]:
+    """
+    Generate challenges for many (category, date) pairs concurrently.
+
+    Args:
+        pairs (Iterable[Tuple[str, date]]): The (category, date) pairs to generate.
+        max_concurrency (int): The maximum number of OpenAI calls in flight at once.
+        timeout (float): The deadline in seconds for each call.
+
+    Returns:
+        Dict[Tuple[str, date], str]: The generated challenge text keyed by (category, date). Failed pairs are omitted.
+    """
+    return await _generate_many([((category, challenge_date), category) for category, challenge_date in pairs], max_concurrency, timeout)
+
+# Function to generate a number of prompts per category concurrently
+async def generate_prompts_async(counts: Dict[str, int], max_concurrency: int = 4, timeout: float = 30.0) -> List[Tuple[str, str]]:
+    """
+    Generate a number of undated prompts per category concurrently, e.g. to refill the challenge bank.
+
+    Args:
+        counts (Dict[str, int]): The number of prompts to generate, keyed by category.
+        max_concurrency (int): The maximum number of OpenAI calls in flight at once.
+        timeout (float): The deadline in seconds for each call.
+
+    Returns:
+        List[Tuple[str, str]]: The (category, prompt) pairs that were generated. Failed requests are omitted.
+    """
+    requests = [((category, i), category) for category, count in counts.items() for i in range(count)]
+    results = await _generate_many(requests, max_concurrency, timeout)
+    return [(category, prompt) for (category, _), prompt in results.items()]
+
+# Function to generate and store challenges for a set of categories and dates
+def generate_and_store_challenges(session: Session, categories: List[str], dates: List[date], max_concurrency: Optional[int] = None, timeout: Optional[float] = None) -> Dict[Tuple[str, date], str]:
+    """
+    Fill every missing (category, date) challenge. Banked prompts are used first and the rest are generated
+    concurrently. Banked prompts are only taken once generation has finished, in the transaction that stores them,
+    and a prompt whose challenge was stored by someone else first is put back. Pairs that already have a stored
+    challenge are skipped, so the function is safe to re-run.
+
+    Args:
+        session (Session): The database session.
+        categories (List[str]): The categories to generate.
+        dates (List[date]): The ET dates to generate.
+        max_concurrency (Optional[int]): The maximum number of OpenAI calls in flight. Defaults to CHALLENGE_GENERATION_CONCURRENCY.
+        timeout (Optional[float]): The deadline in seconds for each call. Defaults to CHALLENGE_GENERATION_TIMEOUT.
+
+    Returns:
+        Dict[Tuple[str, date], str]: The challenge IDs created, keyed by (category, date).
+    """
+    if max_concurrency is None:
+        max_concurrency = current_app.config['CHALLENGE_GENERATION_CONCURRENCY']
+    if timeout is None:
+        timeout = current_app.config['CHALLENGE_GENERATION_TIMEOUT']
+
+    existing = session.execute(
+        text("SELECT category, date FROM daily_challenges WHERE category IN :categories AND date IN :dates")
+            .bindparams(bindparam('categories', expanding=True), bindparam('dates', expanding=True)),
+        {'categories': list(categories), 'dates': list(dates)}
+    ).fetchall()
+    existing = {(row.category, row.date) for row in existing}
+
+    pairs = [(category, challenge_date) for challenge_date in dates for category in categories if (category, challenge_date) not in existing]
+    if not pairs:
+        return {}
+
+    # Plan which pairs the bank can cover without taking anything yet, so no bank rows are locked while the LLM runs
+    levels = bank_levels(session)
+    session.rollback()
+    banked_pairs, missing = [], []
+    for pair in pairs:
+        category = pair[0]
+        if levels.get(category, 0) > 0:
+            levels[category] -= 1
+            banked_pairs.append(pair)
+        else:
+            missing.append(pair)
+
+    created = {}
+    while True:
+        generated = asyncio.run(generate_challenges_async(missing, max_concurrency, timeout)) if missing else {}
+
+        missing = []
+        try:
+            for (category, challenge_date), challenge in generated.items():
+                challenge_id = store_challenge(session, category, challenge, challenge_date)
+                if challenge_id is not None:
+                    created[(category, challenge_date)] = challenge_id
+            for category, challenge_date in banked_pairs:
+                banked = take_banked_challenge(session, category)
+                if banked is None:
+                    # Another caller emptied the bank since it was counted
+                    missing.append((category, challenge_date))
+                    continue
+                challenge_id = store_challenge(session, category, banked, challenge_date)
+                if challenge_id is None:
+                    return_banked_challenge(session, category, banked)
+                else:
+                    created[(category, challenge_date)] = challenge_id
+            session.commit()
+        except Exception as e:
+            current_app.logger.error(f"Error storing generated challenges: {e}")
+            session.rollback()
+            raise
+
+        if not missing:
+            break
+        banked_pairs = []
+
+    return created
+
+# Function to top up the challenge bank
+def refill_challenge_bank(session: Session, categories: List[str], target_size: Optional[int] = None, max_concurrency: Optional[int] = None, timeout: Optional[float] = None) -> Dict[str, int]:
+    """
+    Generate prompts for every category whose bank holds fewer than target_size unused prompts.
+
+    Args:
+        session (Session): The database session.
+        categories (List[str]): The categories to refill.
+        target_size (Optional[int]): The number of unused prompts to keep per category. Defaults to CHALLENGE_BANK_SIZE.
+        max_concurrency (Optional[int]): The maximum number of OpenAI calls in flight. Defaults to CHALLENGE_GENERATION_CONCURRENCY.
+        timeout (Optional[float]): The deadline in seconds for each call. Defaults to CHALLENGE_GENERATION_TIMEOUT.
+
+    Returns:
+        Dict[str, int]: The number of prompts added, keyed by category.
+    """
+    if target_size is None:
+        target_size = current_app.config['CHALLENGE_BANK_SIZE']
+    if max_concurrency is None:
+        max_concurrency = current_app.config['CHALLENGE_GENERATION_CONCURRENCY']
+    if timeout is None:
+        timeout = current_app.config['CHALLENGE_GENERATION_TIMEOUT']
+
+    levels = bank_levels(session)
+    counts = {category: target_size - levels.get(category, 0) for category in categories if levels.get(category, 0) < target_size}
+    if not counts:
+        return {}
+
+    prompts = asyncio.run(generate_prompts_async(counts, max_concurrency, timeout))
+
+    added = {}
+    try:
+        for category, prompt in prompts:
+            session.execute(
+                text("INSERT INTO challenge_bank (category, prompt, created_at) VALUES (:category, :prompt, NOW())"),
+                {'category': category, 'prompt': prompt}
+            )
+            added[category] = added.get(category, 0) + 1
+        session.commit()
+    except Exception as e:
+        current_app.logger.error(f"Error storing banked challenges: {e}")
+        session.rollback()
+        raise
+
+    return added
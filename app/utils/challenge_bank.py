@@ -0,0 +1,61 @@
+from typing import Optional, Dict
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+
+# Function to take a prompt from the challenge bank
+def take_banked_challenge(session: Session, category: str) -> Optional[str]:
+    """
+    Remove and return the oldest banked prompt for a category. The row is locked with SKIP LOCKED so concurrent
+    callers never take the same prompt. The caller is responsible for committing.
+
+    Args:
+        session (Session): The database session.
+        category (str): The category of the challenge.
+
+    Returns:
+        Optional[str]: The prompt, or None if the bank is empty for the category.
+    """
+    return session.execute(
+        text("""
+            DELETE FROM challenge_bank
+            WHERE id = (
+                SELECT id FROM challenge_bank
+                WHERE category = :category
+                ORDER BY id
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING prompt
+        """),
+        {'category': category}
+    ).scalar()
+
+# Function to count the banked prompts per category
+def bank_levels(session: Session) -> Dict[str, int]:
+    """
+    Count the unused prompts in the challenge bank.
+
+    Args:
+        session (Session): The database session.
+
+    Returns:
+        Dict[str, int]: The number of banked prompts keyed by category.
+    """
+    rows = session.execute(text("SELECT category, COUNT(*) AS banked FROM challenge_bank GROUP BY category")).fetchall()
+    return {row.category: row.banked for row in rows}
+
+# Function to put an unused prompt back in the challenge bank
+def return_banked_challenge(session: Session, category: str, prompt: str) -> None:
+    """
+    Put back a prompt taken with take_banked_challenge that could not be used, e.g. because the challenge it was
+    meant for was stored by someone else first. The caller is responsible for committing.
+
+    Args:
+        session (Session): The database session.
+        category (str): The category of the challenge.
+        prompt (str): The prompt to put back.
+    """
+    session.execute(
+        text("INSERT INTO challenge_bank (category, prompt, created_at) VALUES (:category, :prompt, NOW())"),
+        {'category': category, 'prompt': prompt}
+    )
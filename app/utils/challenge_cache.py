@@ -0,0 +1,148 @@
+from typing import Tuple, Optional, Dict, Any
+from flask import current_app
+from datetime import datetime, date, time, timedelta
+from contextlib import contextmanager
+import json
+import mmap
+import os
+import tempfile
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl, writes are still atomic through os.replace
+    fcntl = None
+
+# Parsed copy of the cache file, reused until the file changes on disk
+_local_copy: Dict[str, Any] = {'stamp': None, 'data': None}
+
+def _cache_path() -> str:
+    """
+    Get the path of the shared cache file. Every worker process on the host reads the same file.
+    """
+    return current_app.config.get('CHALLENGE_CACHE_PATH') or os.path.join(tempfile.gettempdir(), 'phrasecraze_challenges.json')
+
+def _next_midnight_timestamp(challenge_date: date) -> float:
+    """
+    Get the epoch timestamp of the ET midnight that ends the given challenge date.
+    """
+    timezone = current_app.config['TIMEZONE']
+    midnight = timezone.localize(datetime.combine(challenge_date + timedelta(days=1), time.min))
+    return midnight.timestamp()
+
+@contextmanager
+def _write_lock(path: str):
+    """
+    Serialize writers across processes with an advisory file lock.
+    """
+    with open(path + '.lock', 'w') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _read_cache_file(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read the cache file through a memory map, reusing the parsed copy if the file has not changed.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if _local_copy['stamp'] == stamp:
+        return _local_copy['data']
+
+    try:
+        with open(path, 'rb') as cache_file:
+            if stat.st_size == 0:
+                return None
+            with mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                data = json.loads(mapped[:])
+    except (OSError, ValueError) as e:
+        current_app.logger.warning(f"Ignoring unreadable challenge cache: {e}")
+        return None
+
+    _local_copy['stamp'] = stamp
+    _local_copy['data'] = data
+    return data
+
+def _current_data(path: str, today: date) -> Optional[Dict[str, Any]]:
+    """
+    Return the cache contents if they belong to today and have not passed ET midnight.
+    """
+    data = _read_cache_file(path)
+    if not data or data.get('date') != today.isoformat():
+        return None
+    if datetime.now().timestamp() >= data.get('expires_at', 0):
+        return None
+    return data
+
+def get_cached_challenge(category: str, today: date) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Look up today's challenge for a category in the shared cache.
+
+    Args:
+        category (str): The category of the challenge.
+        today (date): Today's ET date.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: The challenge ID and the challenge text, or (None, None) on a miss.
+    """
+    data = _current_data(_cache_path(), today)
+    if data is None:
+        return None, None
+
+    entry = data['challenges'].get(category)
+    if entry is None:
+        return None, None
+    return entry[0], entry[1]
+
+def cache_challenge(category: str, challenge_id: str, challenge: str, today: date) -> None:
+    """
+    Store today's challenge for a category in the shared cache. The entry expires at the next ET midnight.
+
+    Args:
+        category (str): The category of the challenge.
+        challenge_id (str): The ID of the challenge.
+        challenge (str): The challenge text.
+        today (date): Today's ET date.
+
+    Returns:
+        None
+    """
+    path = _cache_path()
+    try:
+        with _write_lock(path):
+            data = _current_data(path, today) or {
+                'date': today.isoformat(),
+                'expires_at': _next_midnight_timestamp(today),
+                'challenges': {}
+            }
+            data = dict(data, challenges=dict(data['challenges'], **{category: [challenge_id, challenge]}))
+
+            # Write to a temporary file and swap it in so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.challenge_cache_')
+            with os.fdopen(fd, 'w') as tmp_file:
+                json.dump(data, tmp_file)
+            os.replace(tmp_path, path)
+    except OSError as e:
+        current_app.logger.warning(f"Could not write challenge cache: {e}")
+
+def invalidate_challenge_cache() -> None:
+    """
+    Drop the shared cache so every worker re-reads the challenges from the database.
+    """
+    path = _cache_path()
+    try:
+        with _write_lock(path):
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        current_app.logger.warning(f"Could not invalidate challenge cache: {e}")
+    _local_copy['stamp'] = None
+    _local_copy['data'] = None
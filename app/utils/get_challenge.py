@@ -1,19 +1,22 @@
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Dict, Callable
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import text
-from openai import OpenAI
 from flask import current_app
-from datetime import datetime
-import pytz
+from datetime import datetime, date
 import uuid
-import os
-from dotenv import load_dotenv
+import threading
+from app.utils.challenge_cache import get_cached_challenge, cache_challenge
+from app.utils.llm import get_provider
+from app.utils.challenge_bank import take_banked_challenge
+from app.utils.rate_limit import RateLimitExceeded
 
-# Load environment variables from .env file
-load_dotenv()
+# Per-(category, date) locks so threads in one worker coalesce onto a single generation
+_generation_locks: Dict[Tuple[str, date], threading.Lock] = {}
+_generation_locks_guard = threading.Lock()
 
-# Initialize the OpenAI API client
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# Categories that receive a daily challenge
+CATEGORIES = ['tiny_story', 'scene_description', 'specific_word', 'rhyming_phrase', 
+                'emotion', 'dialogue', 'idiom', 'slogan', 'movie_quote']
 
 # System prompt for Phrase Craze
 SYSTEM_PROMPT = [{
@@ -73,6 +76,24 @@ Always begin with "Create a phrase that..." followed by the specific task, falli
     """
 }]
 
+# Function to build the completion request for a challenge
+def challenge_request(category: str) -> Dict:
+    """
+    Build the completion arguments used to generate a challenge, shared by the sync and async paths.
+
+    Args:
+        category (str): The category for which to generate the challenge.
+
+    Returns:
+        Dict: The messages and model parameters for LLMProvider.complete.
+    """
+    return {
+        'model': "gpt-4o",
+        'messages': SYSTEM_PROMPT + [{"role": "user", "content": f"Generate a {category} phrase"}],
+        'temperature': 1.75,
+        'presence_penalty': 1.5
+    }
+
 # Function to generate challenges
 def generate_challenge(category: str) -> str:
     """
@@ -82,33 +103,141 @@ def generate_challenge(category: str) -> str:
         category (str): The category for which to generate the challenge.
 
     Returns:
-        str: The generated challenge response from OpenAI.
+        str: The generated challenge response from the LLM provider.
 
     Raises:
         Exception: If there's an error in generating the challenge.
     """
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=SYSTEM_PROMPT + [{"role": "user", "content": f"Generate a {category} phrase"}],
-            temperature=1.75,
-            presence_penalty=1.5
-        )
-        return response.choices[0].message.content.strip()
+        return get_provider().complete('challenge', **challenge_request(category)).strip()
     except Exception as e:
         current_app.logger.error(f"Error generating challenge: {e}")
         raise
 
+# Function to store a generated challenge
+def store_challenge(session: Session, category: str, challenge: str, challenge_date: date) -> Optional[str]:
+    """
+    Insert a generated challenge into the daily_challenges table. The caller is responsible for committing.
+    The (category, date) unique constraint means a row that already exists is left untouched.
+
+    Args:
+        session (Session): The database session.
+        category (str): The category of the challenge.
+        challenge (str): The challenge text.
+        challenge_date (date): The ET date the challenge is for.
+
+    Returns:
+        Optional[str]: The challenge ID of the new row, or None if a challenge already existed for that date.
+    """
+    challenge_id = str(uuid.uuid4())
+    inserted = session.execute(
+        text("""
+            INSERT INTO daily_challenges (challenge_id, category, original_challenge, date)
+            VALUES (:challenge_id, :category, :original_challenge, :date)
+            ON CONFLICT (category, date) DO NOTHING
+            RETURNING challenge_id
+        """),
+        {'challenge_id': challenge_id, 'category': category, 'original_challenge': challenge, 'date': challenge_date}
+    ).scalar()
+    return inserted
+
+# Function to read a stored challenge
+def get_challenge_for_date(category: str, challenge_date: date, session: Session) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Retrieve the stored challenge for a category and date without generating anything.
+
+    Args:
+        category (str): The category of the challenge.
+        challenge_date (date): The ET date of the challenge.
+        session (Session): The database session.
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: The challenge ID and the challenge text, or (None, None) if no row exists.
+    """
+    result = session.execute(
+        text("SELECT challenge_id, original_challenge FROM daily_challenges WHERE category = :category AND date = :date LIMIT 1"),
+        {'category': category, 'date': challenge_date}
+    ).fetchone()
+    
+    if result is None:
+        return None, None
+    return result.challenge_id, result.original_challenge
+
+# Function to create a challenge exactly once per category and date
+def create_challenge_once(category: str, challenge_date: date, session: Session, before_generate: Optional[Callable[[], None]] = None) -> Tuple[str, str, bool]:
+    """
+    Return the challenge for a category and date, generating it if needed. Concurrent callers are coalesced:
+    threads in this process wait on a per-(category, date) lock, and other workers wait on a Postgres advisory
+    lock, so exactly one prompt is taken from the challenge bank (or one OpenAI call is made when the bank is empty)
+    and everyone else reuses the stored row.
+
+    Args:
+        category (str): The category of the challenge.
+        challenge_date (date): The ET date of the challenge.
+        session (Session): The database session.
+        before_generate (Optional[Callable[[], None]]): Called just before an OpenAI call is made, e.g. to apply a
+            rate limit. Exceptions it raises abort the generation.
+
+    Returns:
+        Tuple[str, str, bool]: The challenge ID, the challenge text and whether this call generated it.
+    """
+    key = (category, challenge_date)
+    with _generation_locks_guard:
+        lock = _generation_locks.setdefault(key, threading.Lock())
+
+    with lock:
+        # Another thread may have finished the generation while we waited
+        challenge_id, challenge = get_challenge_for_date(category, challenge_date, session)
+        if challenge_id is not None:
+            return challenge_id, challenge, False
+        
+        try:
+            # The advisory lock is held until the transaction ends, so other workers block here
+            if session.get_bind().dialect.name == 'postgresql':
+                session.execute(
+                    text("SELECT pg_advisory_xact_lock(hashtext(:lock_key))"),
+                    {'lock_key': f"daily_challenge:{category}:{challenge_date.isoformat()}"}
+                )
+                challenge_id, challenge = get_challenge_for_date(category, challenge_date, session)
+                if challenge_id is not None:
+                    session.commit()
+                    return challenge_id, challenge, False
+            
+            # Promote a banked prompt so the request does not wait on the LLM
+            challenge = take_banked_challenge(session, category)
+            if challenge is None:
+                if before_generate is not None:
+                    before_generate()
+                current_app.logger.warning(f"Challenge bank is empty for {category}, generating inline")
+                challenge = generate_challenge(category)
+            challenge_id = store_challenge(session, category, challenge, challenge_date)
+            if challenge_id is None:
+                # Lost the race on the unique constraint, keep the stored challenge and leave any banked prompt unused
+                session.rollback()
+                challenge_id, challenge = get_challenge_for_date(category, challenge_date, session)
+                return challenge_id, challenge, False
+            
+            session.commit()
+            return challenge_id, challenge, True
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            with _generation_locks_guard:
+                if _generation_locks.get(key) is lock:
+                    del _generation_locks[key]
+
 # Function to get or create a daily challenge
-def get_or_create_daily_challenge(category: str, session: Session) -> Tuple[Optional[str], Optional[str]]:
+def get_or_create_daily_challenge(category: str, session: Session, before_generate: Optional[Callable[[], None]] = None) -> Tuple[Optional[str], Optional[str]]:
     """
-    Generate a challenge based on the specified category if one does not already exist for the current date.
-    If a challenge already exists for the current date, retrieve it.
+    Retrieve today's challenge for the specified category. Challenges are normally created ahead of time by
+    pregenerate_challenges.py, so this is a plain read; a challenge is only generated inline if the job did not run.
 
     Args:
         category (str): The category for which to generate the challenge.
         session (Session): The database session.
+        before_generate (Optional[Callable[[], None]]): Called only if the challenge has to be generated by OpenAI.
 
     Returns:
         Tuple[Optional[str], Optional[str]]: The challenge ID and the challenge text.
@@ -118,38 +247,24 @@ def get_or_create_daily_challenge(category: str, session: Session) -> Tuple[Opti
     """
     
     today = datetime.now(current_app.config['TIMEZONE']).date()
-    challenge_id = None
-    challenge = None
+
+    # Serve from the shared cache when another worker already loaded today's challenge
+    challenge_id, challenge = get_cached_challenge(category, today)
+    if challenge_id is not None:
+        return challenge_id, challenge
 
     try:
-        result = session.execute(
-            text("SELECT original_challenge, date, challenge_id FROM daily_challenges WHERE category = :category ORDER BY date DESC LIMIT 1"),
-            {'category': category}
-        ).fetchone()
+        challenge_id, challenge = get_challenge_for_date(category, today, session)
         
-        if result:
-            challenge_row = result._asdict()
-            challenge_date = challenge_row['date']
-            challenge_id = challenge_row['challenge_id']
-
-            if challenge_date == today:
-                challenge = challenge_row['original_challenge']
-            else:
-                challenge = generate_challenge(category)
-                challenge_id = str(uuid.uuid4())
-                session.execute(
-                    text("INSERT INTO daily_challenges (challenge_id, category, original_challenge, date) VALUES (:challenge_id, :category, :original_challenge, :date)"),
-                    {'challenge_id': challenge_id, 'category': category, 'original_challenge': challenge, 'date': today}
-                )
-                session.commit()
-        else:
-            challenge = generate_challenge(category)
-            challenge_id = str(uuid.uuid4())
-            session.execute(
-                text("INSERT INTO daily_challenges (challenge_id, category, original_challenge, date) VALUES (:challenge_id, :category, :original_challenge, :date)"),
-                {'challenge_id': challenge_id, 'category': category, 'original_challenge': challenge, 'date': today}
-            )
-            session.commit()
+        if challenge_id is None:
+            current_app.logger.warning(f"No pre-generated challenge for {category} on {today}, generating inline")
+            challenge_id, challenge, _ = create_challenge_once(category, today, session, before_generate)
+        
+        cache_challenge(category, challenge_id, challenge, today)
+
+    except RateLimitExceeded:
+        session.rollback()
+        raise
 
     # Handle exceptions
     except Exception as e:
@@ -157,4 +272,4 @@ def get_or_create_daily_challenge(category: str, session: Session) -> Tuple[Opti
         session.rollback()
         raise
 
-    return challenge_id, challenge
\ No newline at end of file
+    return challenge_id, challenge
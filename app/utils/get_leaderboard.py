@@ -1,31 +1,97 @@
+from typing import Dict, List, Tuple, Any, Optional
 from datetime import date, timedelta
 from sqlalchemy import func
-from app.models.db import get_db_connection, User, LeaderboardEntry, Submission
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text, bindparam
+from app.models.db import get_db_connection, User, LeaderboardEntry
+
+# Function to write the leaderboard entries of a day from its submissions' votes
+def finalize_daily_leaderboards(session: Session, target_date: date, categories: Optional[List[str]] = None) -> Tuple[Dict[str, int], int]:
+    """
+    Write every user's leaderboard entry for a day, in all categories or the given ones, with one GROUP BY over
+    the day's submissions and one upsert on (category, date, user_id). Entries whose score has not changed are
+    left alone and entries with no submissions behind them are removed, so re-running a day is safe and leaves
+    the same rows. If entries change for a day a rollup has already counted, that rollup's state is reset so the
+    next update_leaderboard_rollups call rebuilds it. The caller's session is committed.
+
+    Args:
+        session (Session): The database session.
+        target_date (date): The day to finalize.
+        categories (Optional[List[str]]): The categories to finalize, or None for all of them.
+
+    Returns:
+        Tuple[Dict[str, int], int]: The number of entries inserted or changed per category, and the number of stale entries removed.
+    """
+    params: Dict[str, Any] = {'target_date': target_date}
+    category_filter = ''
+    if categories is not None:
+        category_filter = 'AND category IN :categories'
+        params['categories'] = list(categories)
+
+    def statement(sql):
+        clause = text(sql)
+        if categories is not None:
+            clause = clause.bindparams(bindparam('categories', expanding=True))
+        return clause
+
+    try:
+        written = session.execute(
+            statement(f"""
+                INSERT INTO leaderboard_entries (user_id, category, score, date)
+                SELECT user_id, category, COALESCE(SUM(votes), 0), :target_date
+                FROM submissions
+                WHERE date = :target_date {category_filter}
+                GROUP BY user_id, category
+                ON CONFLICT (category, date, user_id) DO UPDATE
+                SET score = EXCLUDED.score
+                WHERE leaderboard_entries.score IS DISTINCT FROM EXCLUDED.score
+                RETURNING category
+            """),
+            params
+        ).fetchall()
+        removed = session.execute(
+            statement(f"""
+                DELETE FROM leaderboard_entries
+                WHERE date = :target_date {category_filter}
+                AND NOT EXISTS (
+                    SELECT 1 FROM submissions s
+                    WHERE s.user_id = leaderboard_entries.user_id AND s.category = leaderboard_entries.category
+                    AND s.date = leaderboard_entries.date
+                )
+                RETURNING category
+            """),
+            params
+        ).fetchall()
+
+        # Rollups that already counted this day were built from the old entries, so they must be rebuilt
+        changed = sorted({row.category for row in written} | {row.category for row in removed})
+        if changed:
+            session.execute(
+                text("""
+                    UPDATE leaderboard_rollup_state
+                    SET window_start = NULL, through_date = NULL, updated_at = CURRENT_TIMESTAMP
+                    WHERE category IN :changed AND through_date >= :target_date
+                """).bindparams(bindparam('changed', expanding=True)),
+                {'changed': changed, 'target_date': target_date}
+            )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    counts: Dict[str, int] = {}
+    for row in written:
+        counts[row.category] = counts.get(row.category, 0) + 1
+    return counts, len(removed)
 
 def update_daily_leaderboard(category, target_date=None):
     session = get_db_connection()
     if target_date is None:
         target_date = date.today() - timedelta(days=1)
-    
-    results = session.query(
-        Submission.user_id,
-        func.sum(Submission.votes).label('total_votes')
-    ).filter(
-        Submission.category == category,
-        Submission.date == target_date
-    ).group_by(Submission.user_id).all()
-
-    for user_id, total_votes in results:
-        entry = LeaderboardEntry(
-            user_id=user_id,
-            category=category,
-            score=total_votes,
-            date=target_date
-        )
-        session.merge(entry)
-    
-    session.commit()
-    session.close()
+    try:
+        finalize_daily_leaderboards(session, target_date, [category])
+    finally:
+        session.close()
 
 def get_leaderboard(category, start_date, end_date):
     session = get_db_connection()
@@ -41,4 +107,79 @@ def get_leaderboard(category, start_date, end_date):
     ).limit(10).all()
     
     session.close()
-    return [{"username": result.name, "total_score": result.total_score} for result in results]
\ No newline at end of file
+    return [{"username": result.name, "total_score": result.total_score} for result in results]
+
+# Function to get the date ranges shown on the leaderboards page
+def leaderboard_timeframes(today: date) -> Dict[str, Tuple[date, date]]:
+    """
+    Get the (start, end) date range of each leaderboards page timeframe. Every range ends yesterday.
+
+    Args:
+        today (date): The current date.
+
+    Returns:
+        Dict[str, Tuple[date, date]]: The date ranges keyed by timeframe ('daily', 'weekly', 'monthly').
+    """
+    yesterday = today - timedelta(days=1)
+    return {
+        'daily': (yesterday, yesterday),
+        'weekly': (today - timedelta(days=7), yesterday),
+        'monthly': (today.replace(day=1) - timedelta(days=1), yesterday)
+    }
+
+# Function to get the top entries of many leaderboards at once
+def get_leaderboards(session: Session, categories: List[str], timeframes: Dict[str, Tuple[date, date]], limit: int = 10) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """
+    Get the top users of every category and timeframe with one query. The entries in any of the date
+    ranges are read once, summed per (timeframe, category, user) and ranked with ROW_NUMBER() in each
+    (timeframe, category) partition, so the cost no longer grows with the number of leaderboards shown.
+
+    Args:
+        session (Session): The database session.
+        categories (List[str]): The categories to rank.
+        timeframes (Dict[str, Tuple[date, date]]): The (start, end) date range of each timeframe, inclusive.
+        limit (int): The number of users in each leaderboard.
+
+    Returns:
+        Dict[str, Dict[str, List[Dict[str, Any]]]]: The leaderboards keyed by timeframe and category, each a
+        list of {"username", "total_score"} ordered by score, as get_leaderboard returns them.
+    """
+    leaderboards = {timeframe: {category: [] for category in categories} for timeframe in timeframes}
+    if not categories or not timeframes:
+        return leaderboards
+
+    ranges = []
+    params: Dict[str, Any] = {'categories': list(categories), 'limit': limit}
+    for index, (timeframe, (start_date, end_date)) in enumerate(timeframes.items()):
+        ranges.append(f"(:timeframe_{index}, :start_{index}, :end_{index})")
+        params.update({f'timeframe_{index}': timeframe, f'start_{index}': start_date, f'end_{index}': end_date})
+    params['min_date'] = min(start_date for start_date, _ in timeframes.values())
+    params['max_date'] = max(end_date for _, end_date in timeframes.values())
+
+    rows = session.execute(
+        text(f"""
+            WITH ranges (timeframe, start_date, end_date) AS (
+                VALUES {', '.join(ranges)}
+            ), totals AS (
+                SELECT r.timeframe, e.category, e.user_id, SUM(e.score) AS total_score
+                FROM leaderboard_entries e
+                JOIN ranges r ON e.date BETWEEN r.start_date AND r.end_date
+                WHERE e.category IN :categories AND e.date BETWEEN :min_date AND :max_date
+                GROUP BY r.timeframe, e.category, e.user_id
+            ), ranked AS (
+                SELECT timeframe, category, user_id, total_score,
+                       ROW_NUMBER() OVER (PARTITION BY timeframe, category ORDER BY total_score DESC, user_id) AS position
+                FROM totals
+            )
+            SELECT ranked.timeframe, ranked.category, users.name, ranked.total_score
+            FROM ranked
+            JOIN users ON users.id = ranked.user_id
+            WHERE ranked.position <= :limit
+            ORDER BY ranked.timeframe, ranked.category, ranked.position
+        """).bindparams(bindparam('categories', expanding=True)),
+        params
+    ).fetchall()
+
+    for row in rows:
+        leaderboards[row.timeframe][row.category].append({"username": row.name, "total_score": row.total_score})
+    return leaderboards
@@ -0,0 +1,193 @@
+from typing import List, Dict, Any, Optional
+from datetime import date, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+from app.models.db import LeaderboardRollupState
+
+# The rolling periods kept as rollups, named as get_leaderboard_api's timeframes
+ROLLUP_PERIODS = ('weekly', 'monthly', 'all-time')
+
+# The first day counted on the all-time leaderboards
+ALL_TIME_START = date(2000, 1, 1)
+
+# Function to get the first day of a rolling period's window
+def rollup_window_start(period: str, end_date: date) -> date:
+    """
+    Get the first day of a period's window ending on end_date, matching the date ranges get_leaderboard_api
+    uses when end_date is yesterday.
+
+    Args:
+        period (str): The rolling period ('weekly', 'monthly' or 'all-time').
+        end_date (date): The last day in the window.
+
+    Returns:
+        date: The first day in the window.
+    """
+    if period == 'weekly':
+        return end_date - timedelta(days=6)
+    if period == 'monthly':
+        # From the first of the month before the one the next day falls in
+        return ((end_date + timedelta(days=1)).replace(day=1) - timedelta(days=1)).replace(day=1)
+    if period == 'all-time':
+        return ALL_TIME_START
+    raise ValueError(f"Unknown leaderboard period: {period}")
+
+def _rebuild_rollup(session: Session, category: str, period: str, window_start: date, end_date: date) -> None:
+    session.execute(
+        text("DELETE FROM leaderboard_rollups WHERE category = :category AND period = :period"),
+        {'category': category, 'period': period}
+    )
+    session.execute(
+        text("""
+            INSERT INTO leaderboard_rollups (category, period, user_id, score)
+            SELECT :category, :period, user_id, SUM(score)
+            FROM leaderboard_entries
+            WHERE category = :category AND date BETWEEN :window_start AND :end_date
+            GROUP BY user_id
+        """),
+        {'category': category, 'period': period, 'window_start': window_start, 'end_date': end_date}
+    )
+
+def _advance_rollup(session: Session, category: str, period: str, old_start: date, window_start: date, end_date: date) -> None:
+    # Add the newly finalized day and subtract the days that slid out of the window, in one upsert
+    params = {
+        'category': category, 'period': period, 'end_date': end_date,
+        'drop_start': old_start, 'drop_end': window_start - timedelta(days=1), 'window_start': window_start
+    }
+    session.execute(
+        text("""
+            INSERT INTO leaderboard_rollups (category, period, user_id, score)
+            SELECT :category, :period, user_id, SUM(CASE WHEN date = :end_date THEN score ELSE -score END)
+            FROM leaderboard_entries
+            WHERE category = :category AND (date = :end_date OR date BETWEEN :drop_start AND :drop_end)
+            GROUP BY user_id
+            ON CONFLICT (category, period, user_id) DO UPDATE
+            SET score = leaderboard_rollups.score + EXCLUDED.score
+        """),
+        params
+    )
+    if window_start > old_start:
+        # Users with nothing left in the window drop off the rollup
+        session.execute(
+            text("""
+                DELETE FROM leaderboard_rollups
+                WHERE category = :category AND period = :period AND score = 0
+                AND NOT EXISTS (
+                    SELECT 1 FROM leaderboard_entries e
+                    WHERE e.user_id = leaderboard_rollups.user_id AND e.category = :category
+                    AND e.date BETWEEN :window_start AND :end_date
+                )
+            """),
+            params
+        )
+
+def _refresh_snapshot(session: Session, category: str, period: str, snapshot_size: int) -> None:
+    session.execute(
+        text("DELETE FROM leaderboard_snapshots WHERE category = :category AND period = :period"),
+        {'category': category, 'period': period}
+    )
+    session.execute(
+        text("""
+            INSERT INTO leaderboard_snapshots (category, period, position, user_id, score)
+            SELECT category, period, ROW_NUMBER() OVER (ORDER BY score DESC, user_id), user_id, score
+            FROM leaderboard_rollups
+            WHERE category = :category AND period = :period
+            ORDER BY score DESC, user_id
+            LIMIT :snapshot_size
+        """),
+        {'category': category, 'period': period, 'snapshot_size': snapshot_size}
+    )
+
+# Function to update a category's rollups after a day is finalized
+def update_leaderboard_rollups(session: Session, category: str, finalized_date: date, snapshot_size: int, rebuild: bool = False) -> Dict[str, str]:
+    """
+    Bring a category's weekly, monthly and all-time rollups and snapshots up to date after the leaderboard
+    entries of finalized_date have been written. When finalized_date is the day after the one each rollup
+    was last advanced to, only that day and the days leaving the window are read. Otherwise (the first run,
+    a skipped day, or a re-run of a day already counted) the rollup is rebuilt for the window ending on the
+    later of finalized_date and the day it was last advanced to, so re-runs are idempotent. Pass rebuild=True
+    when other days in the window may have changed too, e.g. after a backfill.
+    Each (category, period) state row is locked while it is updated, and the caller's session is committed.
+
+    Args:
+        session (Session): The database session.
+        category (str): The category of the leaderboard.
+        finalized_date (date): The day whose leaderboard entries were just written.
+        snapshot_size (int): The number of ranked entries to keep in each snapshot.
+        rebuild (bool): Rebuild every rollup from leaderboard_entries instead of advancing it.
+
+    Returns:
+        Dict[str, str]: 'incremental' or 'rebuilt' for each period.
+    """
+    modes = {}
+    try:
+        for period in ROLLUP_PERIODS:
+            session.execute(
+                text("""
+                    INSERT INTO leaderboard_rollup_state (category, period, updated_at)
+                    VALUES (:category, :period, CURRENT_TIMESTAMP)
+                    ON CONFLICT (category, period) DO NOTHING
+                """),
+                {'category': category, 'period': period}
+            )
+            state = session.get(LeaderboardRollupState, (category, period), with_for_update=True, populate_existing=True)
+
+            end_date = finalized_date if state.through_date is None else max(state.through_date, finalized_date)
+            window_start = rollup_window_start(period, end_date)
+            if (not rebuild and state.through_date is not None and state.window_start is not None
+                    and finalized_date == end_date == state.through_date + timedelta(days=1)):
+                _advance_rollup(session, category, period, state.window_start, window_start, end_date)
+                modes[period] = 'incremental'
+            else:
+                _rebuild_rollup(session, category, period, window_start, end_date)
+                modes[period] = 'rebuilt'
+            _refresh_snapshot(session, category, period, snapshot_size)
+
+            session.execute(
+                text("""
+                    UPDATE leaderboard_rollup_state
+                    SET window_start = :window_start, through_date = :through_date, updated_at = CURRENT_TIMESTAMP
+                    WHERE category = :category AND period = :period
+                """),
+                {'category': category, 'period': period, 'window_start': window_start, 'through_date': end_date}
+            )
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return modes
+
+# Function to read a ranked leaderboard snapshot
+def get_rollup_leaderboard(session: Session, category: str, period: str, end_date: date, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+    """
+    Read the top of a category's leaderboard for a rolling period from its snapshot.
+
+    Args:
+        session (Session): The database session.
+        category (str): The category of the leaderboard.
+        period (str): The rolling period ('weekly', 'monthly' or 'all-time').
+        end_date (date): The last day the leaderboard should count, normally yesterday (ET).
+        limit (int): The number of entries to return.
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: The entries as {"username", "total_score"} in rank order, or None if the
+        rollup has not been advanced through end_date, e.g. because update_leaderboards.py missed a night.
+    """
+    through_date = session.execute(
+        text("SELECT through_date FROM leaderboard_rollup_state WHERE category = :category AND period = :period"),
+        {'category': category, 'period': period}
+    ).scalar()
+    if through_date != end_date:
+        return None
+
+    rows = session.execute(
+        text("""
+            SELECT users.name, s.score
+            FROM leaderboard_snapshots s
+            JOIN users ON users.id = s.user_id
+            WHERE s.category = :category AND s.period = :period AND s.position <= :limit
+            ORDER BY s.position
+        """),
+        {'category': category, 'period': period, 'limit': limit}
+    ).fetchall()
+    return [{"username": row.name, "total_score": row.score} for row in rows]
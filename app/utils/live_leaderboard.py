@@ -0,0 +1,341 @@
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+from flask import current_app
+from datetime import date
+import random
+import threading
+import time
+
+try:
+    import redis
+except ImportError:  # Only needed for LIVE_LEADERBOARD_BACKEND=redis
+    redis = None
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, levels: int):
+        self.key = key
+        self.next: List['_Node'] = [None] * levels
+        # width[level] is how many positions next[level] is ahead of this node
+        self.width = [0] * levels
+
+class IndexableSkipList:
+    """
+    Sorted keys in a skip list whose links record how many positions they span, so inserting, removing and
+    finding the position of a key are all O(log n) on average, and the first k keys are read in O(k).
+
+    Methods:
+        insert: Add a key.
+        remove: Remove a key.
+        rank: Return the 0-based position of a key.
+        first: Return the first k keys in order.
+    """
+    MAX_LEVELS = 32
+
+    def __init__(self):
+        self.head = _Node(None, self.MAX_LEVELS)
+        self.head.width = [1] * self.MAX_LEVELS
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _path(self, key) -> Tuple[List[_Node], List[int]]:
+        # The last node before key on every level, and the positions skipped on each level to get there
+        chain = [None] * self.MAX_LEVELS
+        steps = [0] * self.MAX_LEVELS
+        node = self.head
+        for level in reversed(range(self.MAX_LEVELS)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        return chain, steps
+
+    def insert(self, key) -> None:
+        chain, steps = self._path(key)
+        levels = 1
+        while levels < self.MAX_LEVELS and random.random() < 0.5:
+            levels += 1
+
+        node = _Node(key, levels)
+        skipped = 0
+        for level in range(levels):
+            previous = chain[level]
+            node.next[level] = previous.next[level]
+            previous.next[level] = node
+            node.width[level] = previous.width[level] - skipped
+            previous.width[level] = skipped + 1
+            skipped += steps[level]
+        for level in range(levels, self.MAX_LEVELS):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, key) -> None:
+        chain, _ = self._path(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        for level in range(len(node.next)):
+            previous = chain[level]
+            previous.width[level] += node.width[level] - 1
+            previous.next[level] = node.next[level]
+        for level in range(len(node.next), self.MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self.size -= 1
+
+    def rank(self, key) -> Optional[int]:
+        chain, steps = self._path(key)
+        node = chain[0].next[0]
+        if node is None or node.key != key:
+            return None
+        return sum(steps)
+
+    def first(self, k: int) -> List:
+        keys = []
+        node = self.head.next[0]
+        while node is not None and len(keys) < k:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+class SortedScoreSet:
+    """
+    Members with integer scores, ranked highest score first with ties in member order, like a Redis sorted set.
+
+    Methods:
+        incr: Add to a member's score.
+        rank: Return a member's 1-based rank.
+        top: Return the k highest-ranked members and their scores.
+    """
+    def __init__(self, scores: Optional[Dict[str, int]] = None):
+        self.scores: Dict[str, int] = {}
+        self.ranking = IndexableSkipList()
+        for member, score in (scores or {}).items():
+            self.scores[member] = score
+            self.ranking.insert((-score, member))
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def incr(self, member: str, amount: int) -> int:
+        score = self.scores.get(member)
+        if score is not None:
+            self.ranking.remove((-score, member))
+        score = (score or 0) + amount
+        self.scores[member] = score
+        self.ranking.insert((-score, member))
+        return score
+
+    def rank(self, member: str) -> Optional[int]:
+        score = self.scores.get(member)
+        if score is None:
+            return None
+        return self.ranking.rank((-score, member)) + 1
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        return [(member, -negated) for negated, member in self.ranking.first(k)]
+
+class MemoryLiveLeaderboardBackend:
+    """
+    Live standings held in this worker's memory. Each worker only sees the votes it records itself, so a board
+    is rebuilt from the database once it is older than ttl seconds to pick up the other workers' votes.
+
+    Attributes:
+        ttl: Seconds a board is used before it is rebuilt.
+        max_boards: The number of boards kept before the least recently used one is dropped.
+    """
+    name = 'memory'
+
+    def __init__(self, ttl: float, max_boards: int = 64):
+        self.ttl = ttl
+        self.max_boards = max_boards
+        self.boards: 'OrderedDict[Tuple[str, date], Tuple[SortedScoreSet, float]]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def is_loaded(self, key: Tuple[str, date]) -> bool:
+        with self.lock:
+            entry = self.boards.get(key)
+            return entry is not None and time.monotonic() - entry[1] < self.ttl
+
+    def replace(self, key: Tuple[str, date], scores: Dict[str, int]) -> None:
+        board = SortedScoreSet(scores)
+        with self.lock:
+            self.boards[key] = (board, time.monotonic())
+            self.boards.move_to_end(key)
+            while len(self.boards) > self.max_boards:
+                self.boards.popitem(last=False)
+
+    def incr(self, key: Tuple[str, date], member: str, amount: int) -> None:
+        with self.lock:
+            entry = self.boards.get(key)
+            if entry is not None:
+                entry[0].incr(member, amount)
+
+    def top(self, key: Tuple[str, date], k: int) -> List[Tuple[str, int]]:
+        with self.lock:
+            entry = self.boards.get(key)
+            return entry[0].top(k) if entry is not None else []
+
+    def rank(self, key: Tuple[str, date], member: str) -> Optional[int]:
+        with self.lock:
+            entry = self.boards.get(key)
+            return entry[0].rank(member) if entry is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {'boards': len(self.boards), 'members': sum(len(board) for board, _ in self.boards.values())}
+
+class RedisLiveLeaderboardBackend:
+    """
+    Live standings kept in Redis sorted sets, shared by every worker, so each vote is seen by all of them at once.
+    A marker key with a ttl records when a board was built; once it expires the board is rebuilt from the
+    database to correct any drift.
+
+    Attributes:
+        ttl: Seconds a board is used before it is rebuilt.
+    """
+    name = 'redis'
+
+    def __init__(self, url: str, ttl: float, prefix: str = 'phrasecraze:live'):
+        if redis is None:
+            raise RuntimeError("LIVE_LEADERBOARD_BACKEND=redis requires the redis package (pip install redis)")
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, key: Tuple[str, date]) -> str:
+        category, day = key
+        return f"{self.prefix}:{category}:{day.isoformat()}"
+
+    def is_loaded(self, key: Tuple[str, date]) -> bool:
+        return bool(self.client.exists(f"{self._key(key)}:built"))
+
+    def replace(self, key: Tuple[str, date], scores: Dict[str, int]) -> None:
+        board_key = self._key(key)
+        ttl = max(1, int(self.ttl))
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.delete(board_key)
+        if scores:
+            pipeline.zadd(board_key, scores)
+            # Keep the board a day past its rebuild so it is never missing while it is being rebuilt
+            pipeline.expire(board_key, ttl + 86400)
+        pipeline.set(f"{board_key}:built", 1, ex=ttl)
+        pipeline.execute()
+
+    def incr(self, key: Tuple[str, date], member: str, amount: int) -> None:
+        self.client.zincrby(self._key(key), amount, member)
+
+    def top(self, key: Tuple[str, date], k: int) -> List[Tuple[str, int]]:
+        return [(member, int(score)) for member, score in self.client.zrevrange(self._key(key), 0, k - 1, withscores=True)]
+
+    def rank(self, key: Tuple[str, date], member: str) -> Optional[int]:
+        rank = self.client.zrevrank(self._key(key), member)
+        return rank + 1 if rank is not None else None
+
+    def stats(self) -> Dict[str, int]:
+        return {}
+
+class LiveLeaderboard:
+    """
+    Live daily standings per (category, day): each user's total votes on their submissions for that day,
+    updated as votes are cast instead of summed on every page view. A board is built from the database the
+    first time it is read, counting votes still waiting in vote_events, and again once its backend says it
+    is stale.
+
+    Attributes:
+        backend: Where the boards are kept (memory or Redis).
+        rebuilds: The number of boards built from the database.
+        votes_recorded: The number of votes applied to a board.
+
+    Methods:
+        record_vote: Count a vote on a submission.
+        top: Return the k users with the most votes.
+        rank: Return a user's 1-based rank.
+        stats: Return the counters.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.rebuilds = 0
+        self.votes_recorded = 0
+
+    def _ensure(self, session: Session, key: Tuple[str, date]) -> None:
+        if self.backend.is_loaded(key):
+            return
+        category, day = key
+        rows = session.execute(
+            text("""
+                SELECT s.username, SUM(s.votes + COALESCE(pending.votes, 0)) AS total_votes
+                FROM submissions s
+                LEFT JOIN (
+                    SELECT submission_id, COUNT(*) AS votes FROM vote_events GROUP BY submission_id
+                ) pending ON pending.submission_id = s.id
+                WHERE s.category = :category AND s.date = :date AND s.username IS NOT NULL
+                GROUP BY s.username
+            """),
+            {'category': category, 'date': day}
+        ).fetchall()
+        self.backend.replace(key, {row.username: int(row.total_votes or 0) for row in rows})
+        with self.lock:
+            self.rebuilds += 1
+
+    def record_vote(self, session: Session, category: str, day: date, submission_id: int) -> None:
+        key = (category, day)
+        # A board that is not loaded will count the vote from the database when it is next built
+        if not self.backend.is_loaded(key):
+            return
+        username = session.execute(
+            text("SELECT username FROM submissions WHERE id = :id AND category = :category AND date = :date"),
+            {'id': submission_id, 'category': category, 'date': day}
+        ).scalar()
+        if username is None:
+            return
+        self.backend.incr(key, username, 1)
+        with self.lock:
+            self.votes_recorded += 1
+
+    def top(self, session: Session, category: str, day: date, k: int = 10) -> List[Dict[str, Any]]:
+        key = (category, day)
+        self._ensure(session, key)
+        return [{'username': username, 'total_votes': votes} for username, votes in self.backend.top(key, k)]
+
+    def rank(self, session: Session, category: str, day: date, username: str) -> Optional[int]:
+        key = (category, day)
+        self._ensure(session, key)
+        return self.backend.rank(key, username)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            counters = {'backend': self.backend.name, 'rebuilds': self.rebuilds, 'votes_recorded': self.votes_recorded}
+        counters.update(self.backend.stats())
+        return counters
+
+# Process-wide live leaderboard, built on first use
+_live_leaderboard: Optional[LiveLeaderboard] = None
+_live_leaderboard_lock = threading.Lock()
+
+# Function to get the live leaderboard
+def get_live_leaderboard() -> LiveLeaderboard:
+    """
+    Get the live leaderboard for this process, building it from the LIVE_LEADERBOARD_* settings on first use.
+
+    Returns:
+        LiveLeaderboard: The shared live leaderboard.
+    """
+    global _live_leaderboard
+    if _live_leaderboard is None:
+        with _live_leaderboard_lock:
+            if _live_leaderboard is None:
+                config = current_app.config
+                if config['LIVE_LEADERBOARD_BACKEND'] == 'redis':
+                    backend = RedisLiveLeaderboardBackend(config['LIVE_LEADERBOARD_REDIS_URL'], config['LIVE_LEADERBOARD_REDIS_TTL'])
+                elif config['LIVE_LEADERBOARD_BACKEND'] == 'memory':
+                    backend = MemoryLiveLeaderboardBackend(config['LIVE_LEADERBOARD_TTL'])
+                else:
+                    raise ValueError(f"Unknown live leaderboard backend: {config['LIVE_LEADERBOARD_BACKEND']}")
+                _live_leaderboard = LiveLeaderboard(backend)
+    return _live_leaderboard
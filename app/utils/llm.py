@@ -0,0 +1,319 @@
+from typing import List, Dict, Optional, Any, Iterator
+from contextlib import asynccontextmanager
+from openai import OpenAI, AsyncOpenAI, OpenAIError
+from flask import current_app
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+import time
+
+# Providers are built once per process and shared by every caller
+_providers: Dict[str, 'LLMProvider'] = {}
+_providers_lock = threading.Lock()
+
+class LLMProviderError(Exception):
+    """
+    Raised when a provider fails to produce a completion.
+    """
+
+class LLMProvider:
+    """
+    Interface for chat completion providers used by challenge generation and scoring.
+
+    Attributes:
+        name: The name used to select the provider in LLM_PROVIDER.
+
+    Methods:
+        complete: Return the completion text for a list of chat messages.
+        stream: Yield the completion text in pieces as it is generated.
+        async_session: Async context manager yielding an object whose complete coroutine has the same signature.
+    """
+    name = 'base'
+
+    def complete(self, purpose: str, messages: List[Dict[str, str]], **params: Any) -> str:
+        """
+        Return the completion text for a list of chat messages.
+
+        Args:
+            purpose (str): What the completion is for, e.g. 'challenge' or 'score'.
+            messages (List[Dict[str, str]]): The chat messages.
+            **params: Model parameters such as model and temperature.
+
+        Returns:
+            str: The completion text.
+        """
+        raise NotImplementedError
+
+    def stream(self, purpose: str, messages: List[Dict[str, str]], **params: Any) -> Iterator[str]:
+        """
+        Yield the completion text in pieces as it is generated. Providers without streaming yield it all at once.
+
+        Args:
+            purpose (str): What the completion is for, e.g. 'challenge' or 'score'.
+            messages (List[Dict[str, str]]): The chat messages.
+            **params: Model parameters such as model and temperature.
+
+        Yields:
+            str: The next piece of the completion text.
+        """
+        yield self.complete(purpose, messages, **params)
+
+    @asynccontextmanager
+    async def async_session(self):
+        yield _AsyncAdapter(self)
+
+class _AsyncAdapter:
+    """
+    Runs a provider's blocking complete in a thread for providers without a native async client.
+    """
+    def __init__(self, provider: LLMProvider):
+        self.provider = provider
+
+    async def complete(self, purpose: str, messages: List[Dict[str, str]], **params: Any) -> str:
+        return await asyncio.to_thread(self.provider.complete, purpose, messages, **params)
+
+class OpenAIProvider(LLMProvider):
+    """
+    Provider backed by the OpenAI API.
+    """
+    name = 'openai'
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        # Retries on the request path are left to the resilience layer, which keeps them within the call's deadline
+        self.client = OpenAI(api_key=self.api_key, max_retries=0)
+
+    def complete(self, purpose: str, messages: List[Dict[str, str]], **params: Any) -> str:
+        try:
+            response = self.client.chat.completions.create(messages=messages, **params)
+        except OpenAIError as e:
+            raise LLMProviderError(str(e)) from e
+        return response.choices[0].message.content
+
+    def stream(self, purpose: str, messages: List[Dict[str, str]], **params: Any) -> Iterator[str]:
+        try:
+            response = self.client.chat.completions.create(messages=messages, stream=True, **params)
+        except OpenAIError as e:
+            raise LLMProviderError(str(e)) from e
+        try:
+            for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except OpenAIError as e:
+            raise LLMProviderError(str(e)) from e
+        finally:
+            response.close()
+
+    @asynccontextmanager
+    async def async_session(self):
+        # The async client is bound to the running event loop, so it lives only as long as the session
+        async with AsyncOpenAI(api_key=self.api_key, max_retries=1) as client:
+            yield _OpenAIAsyncSession(client)
+
+class _OpenAIAsyncSession:
+    def __init__(self, client: AsyncOpenAI):
+        self.client = client
+
+    async def complete(self, purpose: str, messages: List[Dict[str, str]], **params: Any) -> str:
+        try:
+            response = await self.client.chat.completions.create(messages=messages, **params)
+        except OpenAIError as e:
+            raise LLMProviderError(str(e)) from e
+        return response.choices[0].message.content
+
+class FakeProvider(LLMProvider):
+    """
+    Deterministic local stand-in for load testing. Makes no network calls and costs nothing.
+
+    The same messages always produce the same output. Scoring completions end with a "Score: X/10" line
+    (one per phrase for batch scoring) so they go through the normal parsing path. Latency is drawn from the configured distribution
+    and a fraction of calls can be made to fail.
+
+    Attributes:
+        latency_distribution: One of 'none', 'constant', 'uniform', 'normal', 'lognormal' or 'exponential'.
+        latency_mean: The mean latency in seconds.
+        latency_stddev: The standard deviation in seconds (half-width for 'uniform').
+        error_rate: The fraction of calls that raise LLMProviderError.
+        seed: Seed for the latency and error draws.
+    """
+    name = 'fake'
+
+    def __init__(self, latency_distribution: str = 'lognormal', latency_mean: float = 1.5, latency_stddev: float = 0.5, error_rate: float = 0.0, seed: int = 0):
+        if latency_distribution not in ('none', 'constant', 'uniform', 'normal', 'lognormal', 'exponential'):
+            raise ValueError(f"Invalid latency distribution: {latency_distribution}")
+        self.latency_distribution = latency_distribution
+        self.latency_mean = latency_mean
+        self.latency_stddev = latency_stddev
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+
+    def sample_latency(self) -> float:
+        """
+        Draw a latency in seconds from the configured distribution.
+        """
+        mean, stddev = self.latency_mean, self.latency_stddev
+        with self.rng_lock:
+            if self.latency_distribution == 'none':
+                return 0.0
+            if self.latency_distribution == 'constant':
+                return mean
+            if self.latency_distribution == 'uniform':
+                return max(0.0, self.rng.uniform(mean - stddev, mean + stddev))
+            if self.latency_distribution == 'normal':
+                return max(0.0, self.rng.gauss(mean, stddev))
+            if self.latency_distribution == 'exponential':
+                return self.rng.expovariate(1 / mean) if mean > 0 else 0.0
+            # Lognormal with the requested mean and standard deviation
+            if mean <= 0:
+                return 0.0
+            sigma_sq = math.log(1 + (stddev / mean) ** 2)
+            mu = math.log(mean) - sigma_sq / 2
+            return self.rng.lognormvariate(mu, sigma_sq ** 0.5)
+
+    def should_fail(self) -> bool:
+        with self.rng_lock:
+            return self.rng.random() < self.error_rate
+
+    def respond(self, purpose: str, messages: List[Dict[str, str]]) -> str:
+        """
+        Build the deterministic output for a request.
+        """
+        digest = hashlib.sha256(json.dumps(messages, sort_keys=True).encode('utf-8')).digest()
+
+        if purpose == 'score':
+            return self.score_feedback(digest)
+
+        if purpose == 'score_batch':
+            # Score each phrase in the batch as if it had been sent on its own
+            payload = json.loads(messages[-1]['content'])
+            return json.dumps({'results': [
+                {'id': item['id'], 'feedback': self.score_feedback(hashlib.sha256(json.dumps(item, sort_keys=True).encode('utf-8')).digest())}
+                for item in payload['phrases']
+            ]})
+
+        return f"Create a phrase that describes load test scenario #{int.from_bytes(digest[:4], 'big')}."
+
+    @staticmethod
+    def score_feedback(digest: bytes) -> str:
+        return (
+            "Strengths:\n"
+            "Clear and readable phrasing\n"
+            "Stays on topic for the prompt\n\n"
+            "Weaknesses:\n"
+            "Could take a more surprising angle\n\n"
+            f"Score: {digest[0] % 11}/10"
+        )
+
+    def complete(self, purpose: str, messages: List[Dict[str, str]], **params: Any) -> str:
+        latency = self.sample_latency()
+        timeout = params.get('timeout')
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise LLMProviderError("Simulated provider timeout")
+        time.sleep(latency)
+        if self.should_fail():
+            raise LLMProviderError("Simulated provider failure")
+        return self.respond(purpose, messages)
+
+    def stream(self, purpose: str, messages: List[Dict[str, str]], **params: Any) -> Iterator[str]:
+        # Spread the sampled latency over the lines of the response like a real token stream
+        latency = self.sample_latency()
+        timeout = params.get('timeout')
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise LLMProviderError("Simulated provider timeout")
+        if self.should_fail():
+            time.sleep(latency)
+            raise LLMProviderError("Simulated provider failure")
+        lines = self.respond(purpose, messages).splitlines(keepends=True)
+        for line in lines:
+            time.sleep(latency / len(lines))
+            yield line
+
+    @asynccontextmanager
+    async def async_session(self):
+        yield _FakeAsyncSession(self)
+
+class _FakeAsyncSession:
+    def __init__(self, provider: FakeProvider):
+        self.provider = provider
+
+    async def complete(self, purpose: str, messages: List[Dict[str, str]], **params: Any) -> str:
+        latency = self.provider.sample_latency()
+        timeout = params.get('timeout')
+        if timeout is not None and latency > timeout:
+            await asyncio.sleep(timeout)
+            raise LLMProviderError("Simulated provider timeout")
+        await asyncio.sleep(latency)
+        if self.provider.should_fail():
+            raise LLMProviderError("Simulated provider failure")
+        return self.provider.respond(purpose, messages)
+
+def build_provider(name: str, config: Dict[str, Any]) -> LLMProvider:
+    """
+    Build a provider from its name and the application config.
+
+    Args:
+        name (str): The provider name, 'openai' or 'fake'.
+        config (Dict[str, Any]): The application config.
+
+    Returns:
+        LLMProvider: The provider.
+    """
+    if name == 'openai':
+        return OpenAIProvider(config.get('OPENAI_API_KEY'))
+    if name == 'fake':
+        return FakeProvider(
+            latency_distribution=config.get('LLM_FAKE_LATENCY_DISTRIBUTION', 'lognormal'),
+            latency_mean=config.get('LLM_FAKE_LATENCY_MEAN', 1.5),
+            latency_stddev=config.get('LLM_FAKE_LATENCY_STDDEV', 0.5),
+            error_rate=config.get('LLM_FAKE_ERROR_RATE', 0.0),
+            seed=config.get('LLM_FAKE_SEED', 0)
+        )
+    raise ValueError(f"Unknown LLM provider: {name}")
+
+def get_provider() -> LLMProvider:
+    """
+    Get the provider selected by LLM_PROVIDER, building it on first use. The provider is wrapped in the
+    resilience layer, so every call has a deadline and goes through a per-purpose circuit breaker.
+
+    Returns:
+        LLMProvider: The shared provider for this process.
+    """
+    name = current_app.config.get('LLM_PROVIDER', 'openai')
+    provider = _providers.get(name)
+    if provider is None:
+        with _providers_lock:
+            provider = _providers.get(name)
+            if provider is None:
+                # Imported here because the resilience layer builds on the provider classes in this module
+                from app.utils.resilience import ResilientProvider
+                config = current_app.config
+                provider = ResilientProvider(
+                    build_provider(name, config),
+                    deadlines={
+                        'default': config['LLM_DEADLINE'],
+                        'challenge': config['LLM_DEADLINE_CHALLENGE'],
+                        'score': config['LLM_DEADLINE_SCORE'],
+                        'score_batch': config['LLM_DEADLINE_SCORE_BATCH']
+                    },
+                    failure_threshold=config['LLM_BREAKER_FAILURE_THRESHOLD'],
+                    slow_call_threshold=config['LLM_BREAKER_SLOW_CALL_SECONDS'],
+                    reset_timeout=config['LLM_BREAKER_RESET_SECONDS'],
+                    hedge=config['LLM_HEDGE_ENABLED']
+                )
+                _providers[name] = provider
+    return provider
+
+def set_provider(provider: LLMProvider) -> None:
+    """
+    Register a provider instance under its name, replacing any existing one. Used by benchmarks.
+    The instance is used as given, without the resilience layer.
+    """
+    with _providers_lock:
+        _providers[provider.name] = provider
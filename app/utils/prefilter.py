@@ -0,0 +1,170 @@
+from typing import Tuple, Optional, Dict, List, Pattern
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+from flask import current_app
+from datetime import date, timedelta
+import hashlib
+import re
+import threading
+import time
+from app.utils.score_cache import normalize_text
+
+# Deterministic score given to phrases the pre-filter rejects
+PREFILTER_SCORE = 0
+
+# Precompiled rules, checked in order against the raw phrase. The first match rejects the phrase.
+PREFILTER_RULES: List[Tuple[str, Pattern, str]] = [
+    ('no_letters', re.compile(r'^[\W\d_]*$'),
+     "This phrase doesn't contain any words."),
+    ('repeated_characters', re.compile(r'(\S)\1{9,}'),
+     "This phrase contains a long run of one repeated character."),
+    ('repeated_words', re.compile(r'^\W*(\w+)(?:\W+\1\b){3,}\W*$', re.IGNORECASE),
+     "This phrase is just the same word over and over."),
+    ('link', re.compile(r'\bhttps?://\S|\bwww\.\w', re.IGNORECASE),
+     "Links aren't allowed in phrases."),
+]
+
+COPIED_CHALLENGE_FEEDBACK = "This phrase copies the challenge prompt instead of responding to it."
+DUPLICATE_FEEDBACK = "This phrase has already been submitted by another player today."
+
+class PhrasePrefilter:
+    """
+    Cheap local checks that run before a phrase is sent to the LLM for scoring. Obvious junk gets a fixed score
+    and explanatory feedback without an LLM call.
+
+    Attributes:
+        seen: Hashes of the normalized phrases already submitted, keyed by challenge ID, with the highest submission ID loaded.
+        max_challenges: The number of challenges whose hash sets are kept before the least recently used is dropped.
+        checked: The number of phrases checked.
+        rejections: The number of phrases rejected, keyed by rule.
+
+    Methods:
+        check: Return the (score, feedback) for a rejected phrase, or None if it should be scored normally.
+        record_submission: Add a newly stored phrase to its challenge's hash set.
+        stats: Return the counters.
+    """
+    def __init__(self, max_challenges: int = 32):
+        self.max_challenges = max_challenges
+        self.seen: 'OrderedDict[str, Dict]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.checked = 0
+        self.rejections: Dict[str, int] = {name: 0 for name, _, _ in PREFILTER_RULES}
+        self.rejections.update({'copied_challenge': 0, 'duplicate': 0})
+
+    def check(self, session: Session, phrase: str, challenge_id: str, challenge: str, check_duplicate: bool = True) -> Optional[Tuple[int, str]]:
+        config = current_app.config
+        with self.lock:
+            self.checked += 1
+
+        rejected = self._match_rules(phrase)
+        normalized = normalize_text(phrase)
+        if rejected is None and self._copies_challenge(normalized, normalize_text(challenge), config['PREFILTER_CHALLENGE_SIMILARITY']):
+            rejected = ('copied_challenge', COPIED_CHALLENGE_FEEDBACK)
+        if rejected is None and check_duplicate and self._is_duplicate(session, normalized, challenge_id, config['PREFILTER_REFRESH_SECONDS']):
+            rejected = ('duplicate', DUPLICATE_FEEDBACK)
+        if rejected is None:
+            return None
+
+        rule, feedback = rejected
+        with self.lock:
+            self.rejections[rule] += 1
+        current_app.logger.info(f"Pre-filter rejected a phrase for challenge {challenge_id}: {rule}")
+        return PREFILTER_SCORE, f"{feedback}\n\nScore: {PREFILTER_SCORE}/10"
+
+    def _match_rules(self, phrase: str) -> Optional[Tuple[str, str]]:
+        for name, pattern, feedback in PREFILTER_RULES:
+            if pattern.search(phrase):
+                return name, feedback
+        return None
+
+    def _copies_challenge(self, phrase: str, challenge: str, threshold: float) -> bool:
+        if not phrase or not challenge:
+            return False
+        # A long enough fragment lifted from the prompt counts as a copy even if it is much shorter than the prompt
+        if len(phrase) >= 20 and phrase in challenge:
+            return True
+        matcher = SequenceMatcher(None, phrase, challenge, autojunk=False)
+        return matcher.real_quick_ratio() >= threshold and matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold
+
+    def _is_duplicate(self, session: Session, phrase: str, challenge_id: str, refresh_seconds: float) -> bool:
+        digest = hashlib.sha256(phrase.encode('utf-8')).digest()
+        entry = self._load(session, challenge_id, refresh_seconds)
+        with self.lock:
+            return digest in entry['hashes']
+
+    def _load(self, session: Session, challenge_id: str, refresh_seconds: float) -> Dict:
+        """
+        Return the hash set for a challenge, fetching only submissions newer than the last one loaded once the
+        entry is older than refresh_seconds, so other workers' submissions are picked up cheaply.
+        """
+        with self.lock:
+            entry = self.seen.get(challenge_id)
+            if entry is not None:
+                self.seen.move_to_end(challenge_id)
+                if time.monotonic() - entry['loaded_at'] < refresh_seconds:
+                    return entry
+                last_id = entry['last_id']
+            else:
+                last_id = 0
+
+        rows = session.execute(
+            text("""
+                SELECT id, user_phrase FROM submissions
+                WHERE challenge_id = :challenge_id AND id > :last_id AND date >= :since
+                ORDER BY id
+            """),
+            {'challenge_id': challenge_id, 'last_id': last_id, 'since': date.today() - timedelta(days=1)}
+        ).fetchall()
+
+        with self.lock:
+            entry = self.seen.setdefault(challenge_id, {'hashes': set(), 'last_id': 0, 'loaded_at': 0.0})
+            for row in rows:
+                entry['hashes'].add(hashlib.sha256(normalize_text(row.user_phrase).encode('utf-8')).digest())
+                entry['last_id'] = max(entry['last_id'], row.id)
+            entry['loaded_at'] = time.monotonic()
+            while len(self.seen) > self.max_challenges:
+                self.seen.popitem(last=False)
+            return entry
+
+    def record_submission(self, challenge_id: str, phrase: str) -> None:
+        digest = hashlib.sha256(normalize_text(phrase).encode('utf-8')).digest()
+        with self.lock:
+            entry = self.seen.get(challenge_id)
+            if entry is not None:
+                entry['hashes'].add(digest)
+
+    def stats(self) -> Dict[str, object]:
+        with self.lock:
+            rejected = sum(self.rejections.values())
+            return {
+                'checked': self.checked,
+                'rejected': rejected,
+                'rejection_rate': rejected / self.checked if self.checked else 0.0,
+                'rejections': dict(self.rejections),
+                'challenges_tracked': len(self.seen)
+            }
+
+# Process-wide pre-filter shared by every request in this worker
+phrase_prefilter = PhrasePrefilter()
+
+# Function to run the pre-filter on a phrase
+def prefilter_phrase(session: Session, phrase: str, challenge_id: str, challenge: str, check_duplicate: bool = True) -> Optional[Tuple[int, str]]:
+    """
+    Check a phrase against the local pre-filter before it is scored.
+
+    Args:
+        session (Session): The database session.
+        phrase (str): The phrase to check.
+        challenge_id (str): The ID of the challenge the phrase responds to.
+        challenge (str): The challenge text.
+        check_duplicate (bool): Whether to reject a phrase another player already submitted. Off for the final
+            submission of a previewed phrase, so a copy stored after the preview does not turn it into a duplicate.
+
+    Returns:
+        Optional[Tuple[int, str]]: The fixed score and feedback if the phrase is rejected, or None if it should go to the LLM.
+    """
+    if not current_app.config['PREFILTER_ENABLED']:
+        return None
+    return phrase_prefilter.check(session, phrase, challenge_id, challenge, check_duplicate)
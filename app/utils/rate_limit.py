@@ -0,0 +1,269 @@
+from typing import List, Dict, Tuple, Optional
+from collections import OrderedDict
+from sqlalchemy.sql import text
+from flask import current_app, request, session, jsonify
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# The scopes a limit can apply to, in the order they are checked
+RATE_LIMIT_SCOPES = ('user', 'ip', 'global')
+
+# Function to parse a rate limit setting
+def parse_rate_limit(value: Optional[str]) -> Optional[Tuple[float, float]]:
+    """
+    Parse a limit written as "<requests>/<seconds>", e.g. "6/60" for six requests a minute.
+
+    Args:
+        value (Optional[str]): The setting. An empty value disables the limit.
+
+    Returns:
+        Optional[Tuple[float, float]]: The bucket capacity and refill rate in tokens per second, or None if disabled.
+    """
+    if not value:
+        return None
+    count, _, seconds = value.partition('/')
+    capacity, period = float(count), float(seconds or 1)
+    if capacity <= 0 or period <= 0:
+        raise ValueError(f"Invalid rate limit: {value}")
+    return capacity, capacity / period
+
+class MemoryRateLimitBackend:
+    """
+    Token buckets held in this worker's memory. Limits are per process, so with several gunicorn workers
+    the effective limit is multiplied by the number of workers.
+
+    Attributes:
+        max_keys: The number of buckets kept before the least recently used one is dropped.
+    """
+    name = 'memory'
+
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self.buckets: 'OrderedDict[str, Tuple[float, float]]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def acquire(self, limits: List[Tuple[str, float, float]]) -> float:
+        now = time.monotonic()
+        with self.lock:
+            refilled = []
+            retry_after = 0.0
+            for key, capacity, rate in limits:
+                tokens, updated_at = self.buckets.get(key, (capacity, now))
+                tokens = min(capacity, tokens + (now - updated_at) * rate)
+                refilled.append((key, tokens))
+                if tokens < 1:
+                    retry_after = max(retry_after, (1 - tokens) / rate)
+
+            # A request is only charged when every bucket it passes through has a token
+            if retry_after > 0:
+                return retry_after
+            for key, tokens in refilled:
+                self.buckets[key] = (tokens - 1, now)
+                self.buckets.move_to_end(key)
+            while len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+            return 0.0
+
+class DatabaseRateLimitBackend:
+    """
+    Token buckets stored in the rate_limit_buckets table, so every worker process shares the same limits.
+    Each bucket is refilled and charged in a single conditional upsert, and all of a request's buckets are
+    charged in one transaction that is rolled back if any of them is empty.
+    """
+    name = 'database'
+
+    def acquire(self, limits: List[Tuple[str, float, float]]) -> float:
+        # Imported here so the in-memory limiter does not need a database connection
+        from app.models.db import get_db_connection
+
+        db_session = get_db_connection()
+        try:
+            for key, capacity, rate in limits:
+                params = {'key': key, 'capacity': capacity, 'rate': rate}
+                charged = db_session.execute(
+                    text("""
+                        INSERT INTO rate_limit_buckets (key, tokens, updated_at)
+                        VALUES (:key, :capacity - 1, LOCALTIMESTAMP)
+                        ON CONFLICT (key) DO UPDATE
+                        SET tokens = LEAST(:capacity, rate_limit_buckets.tokens
+                                + EXTRACT(EPOCH FROM LOCALTIMESTAMP - rate_limit_buckets.updated_at) * :rate) - 1,
+                            updated_at = LOCALTIMESTAMP
+                        WHERE LEAST(:capacity, rate_limit_buckets.tokens
+                                + EXTRACT(EPOCH FROM LOCALTIMESTAMP - rate_limit_buckets.updated_at) * :rate) >= 1
+                        RETURNING tokens
+                    """),
+                    params
+                ).fetchone()
+                if charged is None:
+                    tokens = db_session.execute(
+                        text("""
+                            SELECT LEAST(:capacity, tokens + EXTRACT(EPOCH FROM LOCALTIMESTAMP - updated_at) * :rate) AS tokens
+                            FROM rate_limit_buckets WHERE key = :key
+                        """),
+                        params
+                    ).scalar()
+                    db_session.rollback()
+                    return max((1 - (tokens or 0)) / rate, 0.001)
+            db_session.commit()
+            return 0.0
+        except Exception:
+            db_session.rollback()
+            raise
+        finally:
+            db_session.close()
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter for the LLM-backed endpoints. Every endpoint group can be limited per user,
+    per client IP and globally; a request must get a token from each bucket that applies to it.
+
+    Attributes:
+        backend: Where the buckets are kept ('memory' or 'database').
+        limits: (capacity, refill rate) per scope, keyed by endpoint group.
+        allowed: The number of requests let through, keyed by endpoint group.
+        limited: The number of requests rejected, keyed by endpoint group.
+
+    Methods:
+        check: Charge a request to its buckets and return 0, or the seconds to wait if it is over a limit.
+        stats: Return the counters.
+    """
+    def __init__(self, backend, limits: Dict[str, Dict[str, Optional[Tuple[float, float]]]]):
+        self.backend = backend
+        self.limits = limits
+        self.lock = threading.Lock()
+        self.allowed: Dict[str, int] = {group: 0 for group in limits}
+        self.limited: Dict[str, int] = {group: 0 for group in limits}
+
+    def check(self, group: str, user_id: Optional[int], ip: Optional[str]) -> float:
+        identities = {'user': user_id, 'ip': ip, 'global': 'all'}
+        buckets = []
+        for scope in RATE_LIMIT_SCOPES:
+            limit = self.limits[group].get(scope)
+            if limit is None or identities[scope] is None:
+                continue
+            key = f"{group}:global" if scope == 'global' else f"{group}:{scope}:{identities[scope]}"
+            buckets.append((key, *limit))
+        if not buckets:
+            return 0.0
+
+        try:
+            retry_after = self.backend.acquire(buckets)
+        except Exception as e:
+            # Failing open keeps the site up if the shared store is unavailable
+            logger.error(f"Rate limiter backend error, allowing request: {e}")
+            retry_after = 0.0
+
+        with self.lock:
+            if retry_after > 0:
+                self.limited[group] += 1
+            else:
+                self.allowed[group] += 1
+        return retry_after
+
+    def stats(self) -> Dict[str, object]:
+        with self.lock:
+            return {
+                'backend': self.backend.name,
+                'allowed': dict(self.allowed),
+                'limited': dict(self.limited)
+            }
+
+# Process-wide limiter, built on first use
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+# Function to get the rate limiter
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the rate limiter for this process, building it from the RATE_LIMIT_* settings on first use.
+
+    Returns:
+        RateLimiter: The shared rate limiter.
+    """
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                config = current_app.config
+                if config['RATE_LIMIT_BACKEND'] == 'database':
+                    backend = DatabaseRateLimitBackend()
+                elif config['RATE_LIMIT_BACKEND'] == 'memory':
+                    backend = MemoryRateLimitBackend()
+                else:
+                    raise ValueError(f"Unknown rate limit backend: {config['RATE_LIMIT_BACKEND']}")
+                limits = {
+                    group: {scope: parse_rate_limit(config[f'RATE_LIMIT_{group.upper()}_{scope.upper()}']) for scope in RATE_LIMIT_SCOPES}
+                    for group in ('score', 'challenge')
+                }
+                _limiter = RateLimiter(backend, limits)
+    return _limiter
+
+# Function to get the client IP used for per-IP limits
+def client_ip() -> Optional[str]:
+    """
+    Get the client IP address. Behind a trusted proxy (RATE_LIMIT_TRUST_PROXY) this is the address the proxy
+    appended to X-Forwarded-For; otherwise it is the address of the connecting peer.
+    """
+    if current_app.config['RATE_LIMIT_TRUST_PROXY'] and request.access_route:
+        return request.access_route[-1]
+    return request.remote_addr
+
+class RateLimitExceeded(Exception):
+    """
+    Raised by enforce_rate_limit when the current request is over a limit.
+
+    Attributes:
+        retry_after: Seconds until the request would be allowed.
+    """
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit exceeded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+# Function to charge the current request to an endpoint group's buckets
+def check_rate_limit(group: str) -> float:
+    """
+    Charge the current request to the per-user, per-IP and global buckets of an endpoint group.
+
+    Args:
+        group (str): The endpoint group ('score' or 'challenge').
+
+    Returns:
+        float: 0 if the request is allowed, otherwise the seconds to wait.
+    """
+    if not current_app.config['RATE_LIMIT_ENABLED']:
+        return 0.0
+    user = session.get('user') or {}
+    return get_rate_limiter().check(group, user.get('id'), client_ip())
+
+# Function to rate limit a step of the current request
+def enforce_rate_limit(group: str) -> None:
+    """
+    Charge the current request to an endpoint group's buckets, for callers that only limit the expensive part
+    of a request.
+
+    Raises:
+        RateLimitExceeded: If the request is over a limit.
+    """
+    retry_after = check_rate_limit(group)
+    if retry_after > 0:
+        raise RateLimitExceeded(retry_after)
+
+# Function to build the response for a rate limited request
+def too_many_requests(retry_after: float):
+    """
+    Build a 429 response with a Retry-After header.
+
+    Args:
+        retry_after (float): Seconds until the request would be allowed.
+
+    Returns:
+        Tuple[Response, int]: The response and status code.
+    """
+    seconds = max(1, math.ceil(retry_after))
+    response = jsonify({'error': 'Too many requests. Please wait a moment and try again.', 'retry_after': seconds})
+    response.headers['Retry-After'] = str(seconds)
+    return response, 429
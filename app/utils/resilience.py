@@ -0,0 +1,269 @@
+from typing import List, Dict, Any, Callable, Iterator, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import asynccontextmanager
+from app.utils.llm import LLMProvider, LLMProviderError
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(LLMProviderError):
+    """
+    Raised instead of calling the provider while a circuit breaker is open.
+    """
+
+class DeadlineExceededError(LLMProviderError):
+    """
+    Raised when a call does not finish within its deadline.
+    """
+
+class LatencyTracker:
+    """
+    Rolling window of recent call latencies.
+
+    Methods:
+        record: Add a latency in seconds.
+        percentile: Return a percentile of the window, or None until enough samples are recorded.
+    """
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self.lock:
+            self.samples.append(latency)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self.lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+class CircuitBreaker:
+    """
+    Circuit breaker that opens after a run of consecutive failures or slow calls, rejects calls while open,
+    and lets a single trial call through once reset_timeout has passed.
+
+    Attributes:
+        name: The call site the breaker protects.
+        failure_threshold: Consecutive failed or slow calls that open the breaker.
+        slow_call_threshold: Calls slower than this many seconds count as failures.
+        reset_timeout: Seconds the breaker stays open before allowing a trial call.
+        state: 'closed', 'open' or 'half_open'.
+
+    Methods:
+        before_call: Raise CircuitOpenError if the call should be rejected.
+        record_success: Record a call that returned, with its latency.
+        record_failure: Record a call that raised.
+        record_cancelled: Record a call the caller abandoned before it finished.
+        stats: Return the breaker state and counters.
+    """
+    def __init__(self, name: str, failure_threshold: int = 5, slow_call_threshold: float = 10.0, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+        self.latency = LatencyTracker()
+        self.counters = {'calls': 0, 'successes': 0, 'failures': 0, 'slow_calls': 0, 'rejected': 0, 'opened': 0, 'hedged': 0}
+
+    def before_call(self) -> None:
+        with self.lock:
+            if self.state == 'open':
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.counters['rejected'] += 1
+                    raise CircuitOpenError(f"Circuit breaker '{self.name}' is open")
+                self.state = 'half_open'
+                self.trial_in_flight = False
+
+            if self.state == 'half_open':
+                if self.trial_in_flight:
+                    self.counters['rejected'] += 1
+                    raise CircuitOpenError(f"Circuit breaker '{self.name}' is waiting on a trial call")
+                self.trial_in_flight = True
+
+            self.counters['calls'] += 1
+
+    def record_success(self, latency: float) -> None:
+        self.latency.record(latency)
+        with self.lock:
+            if latency > self.slow_call_threshold:
+                self.counters['slow_calls'] += 1
+                self._record_bad_call()
+                return
+            self.counters['successes'] += 1
+            self.consecutive_failures = 0
+            if self.state != 'closed':
+                logger.info(f"Circuit breaker '{self.name}' closed")
+            self.state = 'closed'
+            self.trial_in_flight = False
+
+    def record_cancelled(self) -> None:
+        # A call abandoned by its caller says nothing about upstream health, so only free the trial slot
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.counters['failures'] += 1
+            self._record_bad_call()
+
+    def _record_bad_call(self) -> None:
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        if self.state == 'half_open' or self.consecutive_failures >= self.failure_threshold:
+            if self.state != 'open':
+                logger.warning(f"Circuit breaker '{self.name}' opened after {self.consecutive_failures} bad calls")
+                self.counters['opened'] += 1
+            self.state = 'open'
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95 = self.latency.percentile(50), self.latency.percentile(95)
+        with self.lock:
+            return dict(self.counters, state=self.state, consecutive_failures=self.consecutive_failures, p50_latency=p50, p95_latency=p95)
+
+class ResilientProvider(LLMProvider):
+    """
+    Wraps a provider with a per-purpose deadline, a per-purpose circuit breaker and optional hedged requests,
+    so a degraded upstream fails fast instead of pinning web workers.
+
+    Attributes:
+        provider: The wrapped provider.
+        deadlines: Deadline in seconds per purpose; 'default' applies to purposes without their own entry.
+        hedge: Whether to send a second request when the first is slower than the purpose's p95 latency.
+        breakers: The circuit breaker per purpose.
+    """
+    def __init__(self, provider: LLMProvider, deadlines: Dict[str, float], failure_threshold: int = 5, slow_call_threshold: float = 10.0,
+                 reset_timeout: float = 30.0, hedge: bool = False, hedge_workers: int = 8):
+        self.provider = provider
+        self.name = provider.name
+        self.deadlines = deadlines
+        self.failure_threshold = failure_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.reset_timeout = reset_timeout
+        self.hedge = hedge
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.breakers_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=hedge_workers, thread_name_prefix='llm-hedge') if hedge else None
+
+    def breaker(self, purpose: str) -> CircuitBreaker:
+        with self.breakers_lock:
+            if purpose not in self.breakers:
+                self.breakers[purpose] = CircuitBreaker(purpose, self.failure_threshold, self.slow_call_threshold, self.reset_timeout)
+            return self.breakers[purpose]
+
+    def deadline(self, purpose: str) -> float:
+        return self.deadlines.get(purpose, self.deadlines['default'])
+
+    def complete(self, purpose: str, messages: List[Dict[str, str]], **params: Any) -> str:
+        breaker = self.breaker(purpose)
+        breaker.before_call()
+        deadline = self.deadline(purpose)
+        started = time.monotonic()
+        try:
+            # The deadline reaches the client as a per-read timeout. A non-streamed completion sends its body only
+            # once it is finished, so that bounds the whole call unless the upstream trickles bytes; hedged calls
+            # are additionally bounded by waiting on them for at most the deadline.
+            call = lambda: self.provider.complete(purpose, messages, timeout=deadline, **params)
+            hedge_after = breaker.latency.percentile(95) if self.hedge else None
+            if hedge_after is not None and hedge_after < deadline:
+                result = self._hedged(call, hedge_after, deadline, breaker)
+            else:
+                result = call()
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success(time.monotonic() - started)
+        return result
+
+    def _hedged(self, call: Callable[[], str], hedge_after: float, deadline: float, breaker: CircuitBreaker) -> str:
+        """
+        Run the call, and if it has not finished by hedge_after seconds run a second copy and return whichever
+        succeeds first. Raises if both fail or neither finishes within the deadline.
+        """
+        started = time.monotonic()
+        futures = [self.executor.submit(call)]
+        done, _ = wait(futures, timeout=hedge_after)
+        if not done:
+            with breaker.lock:
+                breaker.counters['hedged'] += 1
+            futures.append(self.executor.submit(call))
+
+        error: Optional[BaseException] = None
+        pending = set(futures)
+        while pending:
+            remaining = deadline - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+
+        if pending:
+            raise DeadlineExceededError(f"LLM call exceeded its {deadline}s deadline")
+        raise error
+
+    def stream(self, purpose: str, messages: List[Dict[str, str]], **params: Any) -> Iterator[str]:
+        breaker = self.breaker(purpose)
+        breaker.before_call()
+        deadline = self.deadline(purpose)
+        started = time.monotonic()
+        chunks = self.provider.stream(purpose, messages, timeout=deadline, **params)
+        try:
+            # The client's timeout only bounds each read, so a slow stream is cut off here once the deadline passes
+            for chunk in chunks:
+                if time.monotonic() - started > deadline:
+                    raise DeadlineExceededError(f"LLM stream exceeded its {deadline}s deadline")
+                yield chunk
+        except GeneratorExit:
+            breaker.record_cancelled()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        finally:
+            chunks.close()
+        breaker.record_success(time.monotonic() - started)
+
+    @asynccontextmanager
+    async def async_session(self):
+        async with self.provider.async_session() as inner:
+            yield _ResilientAsyncSession(self, inner)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self.breakers_lock:
+            breakers = list(self.breakers.values())
+        return {breaker.name: breaker.stats() for breaker in breakers}
+
+class _ResilientAsyncSession:
+    def __init__(self, resilient: ResilientProvider, inner):
+        self.resilient = resilient
+        self.inner = inner
+
+    async def complete(self, purpose: str, messages: List[Dict[str, str]], **params: Any) -> str:
+        breaker = self.resilient.breaker(purpose)
+        breaker.before_call()
+        started = time.monotonic()
+        try:
+            result = await self.inner.complete(purpose, messages, timeout=self.resilient.deadline(purpose), **params)
+        except asyncio.CancelledError:
+            # Cancelled by the caller's own timeout (a BaseException), so free a half-open trial slot
+            breaker.record_cancelled()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success(time.monotonic() - started)
+        return result
@@ -1,15 +1,13 @@
-from typing import Tuple
-from openai import OpenAI
+from typing import Tuple, Optional, List, Dict, Iterator, Any
 from flask import current_app
-import os
 from dotenv import load_dotenv
+import json
+from app.utils.llm import get_provider
+from app.utils.score_cache import score_cache, score_cache_key
 
 # Load environment variables
 load_dotenv()
 
-# Initialize the OpenAI client
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-
 SCORING_SYSTEM_PROMPT = [
         {
             "role": "system",
@@ -90,15 +88,100 @@ SCORING_SYSTEM_PROMPT = [
         }
     ]
 
+# Instructions appended to the scoring prompt when several phrases are evaluated in one request
+BATCH_SCORING_PROMPT = {
+    "role": "system",
+    "content":
+    """
+    You will receive a JSON object with a category and a list of phrases, each with an id and its original prompt.
+    Evaluate every phrase independently using the evaluation format above. Do not compare phrases with each other.
+    Respond with only a JSON object of the form {"results": [{"id": 1, "feedback": "Strengths:\n...\n\nWeaknesses:\n...\n\nScore: X/10"}]}
+    with exactly one result per phrase id.
+    """
+}
+
+# Function to extract the score from feedback without a default
+def extract_score(feedback: str) -> Optional[int]:
+    """
+    Extracts the numeric score from a "Score: X/10" line in the feedback.
+
+    Args:
+        feedback (str): The feedback returned by the LLM.
+
+    Returns:
+        Optional[int]: The score, or None if the feedback has no valid score.
+    """
+    try:
+        score = int(feedback.split("Score:")[1].split("/")[0].strip())
+    except (AttributeError, IndexError, ValueError):
+        return None
+    return score if 0 <= score <= 10 else None
+
+# Function to extract the score from feedback
+def parse_score(feedback: str) -> int:
+    """
+    Extracts the numeric score from a "Score: X/10" line in the feedback.
+
+    Args:
+        feedback (str): The feedback returned by the LLM.
+
+    Returns:
+        int: The score, or 0 if it could not be extracted.
+    """
+    score = extract_score(feedback)
+    if score is None:
+        current_app.logger.warning("Could not extract score from feedback. Defaulting to 0.")
+        return 0
+    return score
+
+# Function to look up a cached score without calling the LLM
+def get_cached_score(phrase: str, category: str, original_prompt: str) -> Optional[Tuple[int, str]]:
+    """
+    Returns the cached score and feedback for a phrase if it was scored recently in this worker.
+
+    Args:
+        phrase (str): The phrase to evaluate.
+        category (str): The category of the phrase.
+        original_prompt (str): The original prompt for the phrase.
+
+    Returns:
+        Optional[Tuple[int, str]]: The score and feedback, or None if the phrase has not been scored.
+    """
+    return score_cache.get(score_cache_key(phrase, category, original_prompt))
+
+# Function to build the completion request for scoring a phrase
+def scoring_request(phrase: str, category: str, original_prompt: str) -> Dict:
+    """
+    Builds the completion arguments used to score a single phrase, shared by the blocking and streaming paths.
+
+    Args:
+        phrase (str): The phrase to evaluate.
+        category (str): The category of the phrase.
+        original_prompt (str): The original prompt for the phrase.
+
+    Returns:
+        Dict: The messages and model parameters for LLMProvider.complete and LLMProvider.stream.
+    """
+    return {
+        'model': "gpt-4o",
+        'messages': SCORING_SYSTEM_PROMPT + [
+            {"role": "user", "content": f"Please evaluate this phrase: '{phrase}'\n\nOriginal Prompt: {original_prompt}\n\nCategory: {category}."}
+        ],
+        'temperature': 0.6, # Lower temperature for more conservative responses
+    }
+
 # Function to calculate the initial score of a phrase
-def calculate_initial_score(phrase: str, category: str, original_prompt: str) -> Tuple[int, str]:
+def calculate_initial_score(phrase: str, category: str, original_prompt: str, use_cache: bool = True) -> Tuple[int, str]:
     """
     Calculates the initial score of a phrase based on evaluation criteria provided by the scoring system prompt.
+    Results are cached by a normalized hash of the phrase, category and prompt, so a phrase scored during the
+    score-first preview is not sent to the LLM again on final submission.
 
     Args:
         phrase (str): The phrase to evaluate.
         category (str): The category of the phrase.
         original_prompt (str): The original prompt for the phrase.
+        use_cache (bool): Whether to reuse and store cached results.
 
     Returns:
         Tuple[int, str]: A tuple containing the calculated score for the phrase and the feedback provided.
@@ -106,28 +189,162 @@ def calculate_initial_score(phrase: str, category: str, original_prompt: str) ->
     Raises:
         Exception: If there's an error in calculating the score.
     """
+    cache_key = score_cache_key(phrase, category, original_prompt)
+    if use_cache:
+        cached = score_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=SCORING_SYSTEM_PROMPT + [
-                {"role": "user", "content": f"Please evaluate this phrase: '{phrase}'\n\nOriginal Prompt: {original_prompt}\n\nCategory: {category}."}
-            ],
-            temperature=0.6, # Lower temperature for more conservative responses
-        )
-
-        feedback = response.choices[0].message.content
+        feedback = get_provider().complete('score', **scoring_request(phrase, category, original_prompt))
 
         # Extract score from feedback
-        try:
-            score_str = feedback.split("Score:")[1].split("/")[0].strip()
-            score = int(score_str)
-        except (IndexError, ValueError):
-            current_app.logger.warning("Could not extract score from feedback. Defaulting to 0.")
-            score = 0
+        score = parse_score(feedback)
 
+        if use_cache:
+            score_cache.set(cache_key, score, feedback)
         return score, feedback
 
     except Exception as e:
         current_app.logger.error(f"Error calculating initial score: {e}")
-        raise
\ No newline at end of file
+        raise
+
+# Function to stream the evaluation of a phrase
+def stream_initial_score(phrase: str, category: str, original_prompt: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Streams the evaluation of a phrase as it is generated. Yields ('chunk', text) for each piece of feedback and
+    finally ('score', (score, feedback)) once the "Score:" line has been parsed. The result is stored in the score
+    cache, so the final submission reuses it exactly like a blocking preview.
+
+    Args:
+        phrase (str): The phrase to evaluate.
+        category (str): The category of the phrase.
+        original_prompt (str): The original prompt for the phrase.
+
+    Yields:
+        Tuple[str, Any]: The event type and its payload.
+
+    Raises:
+        Exception: If there's an error while streaming the evaluation.
+    """
+    cached = get_cached_score(phrase, category, original_prompt)
+    if cached is not None:
+        yield 'chunk', cached[1]
+        yield 'score', cached
+        return
+
+    chunks = []
+    try:
+        for chunk in get_provider().stream('score', **scoring_request(phrase, category, original_prompt)):
+            chunks.append(chunk)
+            yield 'chunk', chunk
+    except Exception as e:
+        current_app.logger.error(f"Error streaming initial score: {e}")
+        raise
+
+    feedback = ''.join(chunks)
+    score = parse_score(feedback)
+    score_cache.set(score_cache_key(phrase, category, original_prompt), score, feedback)
+    yield 'score', (score, feedback)
+
+# Function to parse the results of a batch scoring request
+def parse_batch_scores(response: str, count: int) -> List[Optional[Tuple[int, str]]]:
+    """
+    Parses a batch scoring response item by item. Any item that is missing, duplicated or has no valid
+    score is returned as None, so one bad item does not discard the rest of the batch.
+
+    Args:
+        response (str): The JSON response returned by the LLM.
+        count (int): The number of phrases in the request.
+
+    Returns:
+        List[Optional[Tuple[int, str]]]: The score and feedback for each phrase, in request order.
+    """
+    results: List[Optional[Tuple[int, str]]] = [None] * count
+    try:
+        items = json.loads(response).get('results', [])
+    except (ValueError, AttributeError):
+        current_app.logger.warning("Could not parse batch scoring response.")
+        return results
+
+    if not isinstance(items, list):
+        return results
+
+    seen = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(item.get('id')) - 1
+        except (TypeError, ValueError):
+            continue
+        feedback = item.get('feedback')
+        if not 0 <= index < count or index in seen or not isinstance(feedback, str):
+            continue
+        seen.add(index)
+
+        score = extract_score(feedback)
+        if score is not None:
+            results[index] = (score, feedback.strip())
+    return results
+
+# Function to calculate the initial scores of several phrases in one request
+def calculate_batch_scores(phrases: List[Tuple[str, str]], category: str, use_cache: bool = True) -> List[Optional[Tuple[int, str]]]:
+    """
+    Scores several phrases from the same category with one LLM request, so the scoring system prompt is sent
+    once per batch instead of once per phrase. Phrases are split into requests of at most SCORING_BATCH_MAX_ITEMS.
+    Any phrase the batch response does not score cleanly falls back to calculate_initial_score.
+
+    Args:
+        phrases (List[Tuple[str, str]]): The (phrase, original prompt) pairs to evaluate.
+        category (str): The category of the phrases.
+        use_cache (bool): Whether to reuse and store cached results.
+
+    Returns:
+        List[Optional[Tuple[int, str]]]: The score and feedback for each phrase, in the order given, or None for
+        a phrase that could not be scored by the batch request or by the single-phrase fallback.
+    """
+    results: List[Optional[Tuple[int, str]]] = [None] * len(phrases)
+
+    pending = []
+    for index, (phrase, original_prompt) in enumerate(phrases):
+        cached = get_cached_score(phrase, category, original_prompt) if use_cache else None
+        if cached is not None:
+            results[index] = cached
+        else:
+            pending.append(index)
+
+    chunk_size = current_app.config['SCORING_BATCH_MAX_ITEMS']
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        payload = {
+            'category': category,
+            'phrases': [{'id': i + 1, 'phrase': phrases[index][0], 'prompt': phrases[index][1]} for i, index in enumerate(chunk)]
+        }
+
+        try:
+            response = get_provider().complete(
+                'score_batch',
+                model="gpt-4o",
+                messages=SCORING_SYSTEM_PROMPT + [BATCH_SCORING_PROMPT, {"role": "user", "content": json.dumps(payload)}],
+                temperature=0.6,
+                response_format={"type": "json_object"}
+            )
+            parsed = parse_batch_scores(response, len(chunk))
+        except Exception as e:
+            current_app.logger.error(f"Error calculating batch scores, falling back to single scoring: {e}")
+            parsed = [None] * len(chunk)
+
+        for index, result in zip(chunk, parsed):
+            phrase, original_prompt = phrases[index]
+            if result is None:
+                try:
+                    results[index] = calculate_initial_score(phrase, category, original_prompt, use_cache)
+                except Exception:
+                    results[index] = None
+                continue
+            results[index] = result
+            if use_cache:
+                score_cache.set(score_cache_key(phrase, category, original_prompt), *result)
+
+    return results
@@ -0,0 +1,97 @@
+from typing import Tuple, Optional, Dict
+from collections import OrderedDict
+import hashlib
+import threading
+import time
+import unicodedata
+
+# Function to normalize text before hashing or comparing it
+def normalize_text(value: str) -> str:
+    """
+    Apply NFKC normalization, casefold and collapse runs of whitespace.
+    """
+    return ' '.join(unicodedata.normalize('NFKC', value or '').casefold().split())
+
+# Function to build the cache key for a scoring request
+def score_cache_key(phrase: str, category: str, challenge: str) -> str:
+    """
+    Hash a normalized (phrase, category, challenge) triple. Case, Unicode form and runs of whitespace
+    do not change the key, so trivially different copies of the same phrase share a score.
+
+    Args:
+        phrase (str): The phrase being scored.
+        category (str): The category of the challenge.
+        challenge (str): The challenge text.
+
+    Returns:
+        str: The hex digest used as the cache key.
+    """
+    raw = '\x1f'.join(normalize_text(part) for part in (phrase, category, challenge))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class ScoreCache:
+    """
+    Thread-safe LRU cache of scoring results with a time-to-live.
+
+    Attributes:
+        max_size: The maximum number of results kept before the least recently used one is evicted.
+        ttl: The number of seconds a result stays valid.
+        hits: The number of lookups that found a valid result.
+        misses: The number of lookups that did not.
+        evictions: The number of results dropped to stay within max_size.
+
+    Methods:
+        get: Return the cached (score, feedback) for a key, or None.
+        set: Store the (score, feedback) for a key.
+        stats: Return the counters and current size.
+    """
+    def __init__(self, max_size: int = 1024, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: 'OrderedDict[str, Tuple[float, int, str]]' = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Tuple[int, str]]:
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def set(self, key: str, score: int, feedback: str) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, score, feedback)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def configure(self, max_size: int, ttl: float) -> None:
+        with self.lock:
+            self.max_size = max_size
+            self.ttl = ttl
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+# Process-wide cache shared by every scoring call in this worker
+score_cache = ScoreCache()
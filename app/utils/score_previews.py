@@ -0,0 +1,64 @@
+from typing import Tuple, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+from flask import current_app
+from datetime import datetime, timedelta
+from app.utils.score_cache import score_cache_key
+
+# Function to store the result of a score-first preview
+def store_score_preview(session: Session, phrase: str, category: str, challenge: str, score: int, feedback: str) -> None:
+    """
+    Store a preview's score and feedback under the phrase's normalized hash, so the final submission reuses them
+    on whichever worker it reaches, and remove previews older than SCORE_CACHE_TTL. The caller's session is
+    committed. A failure is logged and not raised, since the submission can still be scored from the queue.
+
+    Args:
+        session (Session): The database session.
+        phrase (str): The phrase that was scored.
+        category (str): The category of the challenge.
+        challenge (str): The challenge text.
+        score (int): The preview score.
+        feedback (str): The preview feedback.
+    """
+    now = datetime.now()
+    try:
+        session.execute(
+            text("""
+                INSERT INTO score_previews (cache_key, score, feedback, created_at)
+                VALUES (:cache_key, :score, :feedback, :now)
+                ON CONFLICT (cache_key) DO UPDATE
+                SET score = EXCLUDED.score, feedback = EXCLUDED.feedback, created_at = EXCLUDED.created_at
+            """),
+            {'cache_key': score_cache_key(phrase, category, challenge), 'score': score, 'feedback': feedback, 'now': now}
+        )
+        session.execute(
+            text("DELETE FROM score_previews WHERE created_at < :cutoff"),
+            {'cutoff': now - timedelta(seconds=current_app.config['SCORE_CACHE_TTL'])}
+        )
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        current_app.logger.warning(f"Could not store score preview: {e}")
+
+# Function to look up the result of a score-first preview
+def get_score_preview(session: Session, phrase: str, category: str, challenge: str) -> Optional[Tuple[int, str]]:
+    """
+    Get the score and feedback stored for a phrase's preview by any worker.
+
+    Args:
+        session (Session): The database session.
+        phrase (str): The phrase being submitted.
+        category (str): The category of the challenge.
+        challenge (str): The challenge text.
+
+    Returns:
+        Optional[Tuple[int, str]]: The score and feedback, or None if the phrase has no preview newer than SCORE_CACHE_TTL.
+    """
+    row = session.execute(
+        text("SELECT score, feedback FROM score_previews WHERE cache_key = :cache_key AND created_at >= :cutoff"),
+        {
+            'cache_key': score_cache_key(phrase, category, challenge),
+            'cutoff': datetime.now() - timedelta(seconds=current_app.config['SCORE_CACHE_TTL'])
+        }
+    ).fetchone()
+    return (row.score, row.feedback) if row is not None else None
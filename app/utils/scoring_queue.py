@@ -0,0 +1,197 @@
+from typing import List, Dict, Any, Optional
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from app.utils.score import calculate_batch_scores
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Function to claim queued scoring jobs
+def claim_scoring_jobs(session: Session, limit: int, stale_after: int) -> List[Dict[str, Any]]:
+    """
+    Claim up to `limit` pending jobs, plus running jobs whose worker stopped responding more than
+    `stale_after` seconds ago. SKIP LOCKED lets several workers claim from the queue at once.
+
+    Args:
+        session (Session): The database session.
+        limit (int): The maximum number of jobs to claim.
+        stale_after (int): Seconds after which a running job is considered abandoned.
+
+    Returns:
+        List[Dict[str, Any]]: The claimed jobs with the submission fields needed for scoring.
+    """
+    rows = session.execute(
+        text("""
+            WITH claimed AS (
+                UPDATE scoring_jobs
+                SET status = 'running', attempts = attempts + 1, locked_at = NOW()
+                WHERE id IN (
+                    SELECT id FROM scoring_jobs
+                    WHERE status = 'pending'
+                    OR (status = 'running' AND locked_at < NOW() - make_interval(secs => :stale_after))
+                    ORDER BY id
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, submission_id, attempts
+            )
+            SELECT c.id, c.submission_id, c.attempts, s.user_phrase, s.category, s.challenge
+            FROM claimed c
+            JOIN submissions s ON s.id = c.submission_id
+            ORDER BY c.id
+        """),
+        {'limit': limit, 'stale_after': stale_after}
+    ).fetchall()
+    session.commit()
+    return [row._asdict() for row in rows]
+
+# Function to store a finished score
+def complete_scoring_job(session: Session, job_id: int, submission_id: int, score: int, feedback: str) -> None:
+    """
+    Write the score and feedback to the submission and remove the job. The caller is responsible for committing.
+    """
+    session.execute(
+        text("UPDATE submissions SET initial_score = :score, feedback = :feedback, score_status = 'done' WHERE id = :id"),
+        {'score': score, 'feedback': feedback, 'id': submission_id}
+    )
+    session.execute(text("DELETE FROM scoring_jobs WHERE id = :id"), {'id': job_id})
+
+# Function to record a failed scoring attempt
+def fail_scoring_job(session: Session, job_id: int, submission_id: int, attempts: int, max_attempts: int, error: str) -> None:
+    """
+    Put the job back in the queue, or mark it and its submission as failed once max_attempts is reached.
+    The caller is responsible for committing.
+    """
+    if attempts >= max_attempts:
+        session.execute(
+            text("UPDATE scoring_jobs SET status = 'failed', last_error = :error WHERE id = :id"),
+            {'error': error, 'id': job_id}
+        )
+        session.execute(
+            text("UPDATE submissions SET score_status = 'failed' WHERE id = :id"),
+            {'id': submission_id}
+        )
+    else:
+        session.execute(
+            text("UPDATE scoring_jobs SET status = 'pending', last_error = :error WHERE id = :id"),
+            {'error': error, 'id': job_id}
+        )
+
+# Function to process one batch of scoring jobs
+def process_scoring_jobs(session: Session, executor: ThreadPoolExecutor, limit: Optional[int] = None) -> int:
+    """
+    Claim a batch of jobs, score them on the executor with one batched LLM request per category and write the results.
+
+    Args:
+        session (Session): The database session.
+        executor (ThreadPoolExecutor): The pool the LLM calls run on.
+        limit (Optional[int]): The maximum number of jobs to claim. Defaults to SCORING_BATCH_SIZE.
+
+    Returns:
+        int: The number of jobs claimed.
+    """
+    config = current_app.config
+    if limit is None:
+        limit = config['SCORING_BATCH_SIZE']
+
+    jobs = claim_scoring_jobs(session, limit, config['SCORING_JOB_STALE_SECONDS'])
+    if not jobs:
+        return 0
+
+    app = current_app._get_current_object()
+
+    # Jobs in the same category are scored together in batched LLM requests
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for job in jobs:
+        groups.setdefault(job['category'], []).append(job)
+
+    def score(category, group):
+        with app.app_context():
+            return calculate_batch_scores([(job['user_phrase'], job['challenge']) for job in group], category)
+
+    futures = [(group, executor.submit(score, category, group)) for category, group in groups.items()]
+    for group, future in futures:
+        try:
+            results = future.result()
+        except Exception as e:
+            logger.error(f"Batch scoring failed for {len(group)} jobs: {e}")
+            results = [None] * len(group)
+
+        for job, result in zip(group, results):
+            if result is None:
+                logger.error(f"Scoring job {job['id']} failed on attempt {job['attempts']}")
+                fail_scoring_job(session, job['id'], job['submission_id'], job['attempts'], config['SCORING_JOB_MAX_ATTEMPTS'], "Scoring failed")
+            else:
+                complete_scoring_job(session, job['id'], job['submission_id'], *result)
+        session.commit()
+
+    return len(jobs)
+
+# Function to get the scoring status of a submission
+def get_submission_score(session: Session, submission_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Get the scoring status of one of a user's submissions.
+
+    Args:
+        session (Session): The database session.
+        submission_id (int): The ID of the submission.
+        user_id (int): The ID of the user who owns the submission.
+
+    Returns:
+        Optional[Dict[str, Any]]: The status, score and feedback, or None if the user has no such submission.
+    """
+    row = session.execute(
+        text("SELECT score_status, initial_score, feedback FROM submissions WHERE id = :id AND user_id = :user_id"),
+        {'id': submission_id, 'user_id': user_id}
+    ).fetchone()
+    if row is None:
+        return None
+
+    done = row.score_status == 'done'
+    return {
+        'status': row.score_status,
+        'score': row.initial_score if done else None,
+        'feedback': row.feedback if done else None
+    }
+
+# Function to re-score every submission for a date
+def rescore_submissions(session: Session, target_date, categories: List[str]) -> Dict[str, int]:
+    """
+    Re-score the submissions for a date with batched LLM requests, bypassing the score cache, and store the
+    new scores and feedback. Submissions that cannot be scored keep their current score.
+
+    Args:
+        session (Session): The database session.
+        target_date (date): The date of the submissions.
+        categories (List[str]): The categories to re-score.
+
+    Returns:
+        Dict[str, int]: The number of submissions re-scored, keyed by category.
+    """
+    rescored = {}
+    for category in categories:
+        rows = session.execute(
+            text("SELECT id, user_phrase, challenge FROM submissions WHERE category = :category AND date = :date ORDER BY id"),
+            {'category': category, 'date': target_date}
+        ).fetchall()
+        if not rows:
+            continue
+
+        results = calculate_batch_scores([(row.user_phrase, row.challenge) for row in rows], category, use_cache=False)
+        updates = [
+            {'score': result[0], 'feedback': result[1], 'id': row.id}
+            for row, result in zip(rows, results) if result is not None
+        ]
+        if updates:
+            session.execute(
+                text("UPDATE submissions SET initial_score = :score, feedback = :feedback, score_status = 'done' WHERE id = :id"),
+                updates
+            )
+        session.commit()
+
+        rescored[category] = len(updates)
+        if len(updates) < len(rows):
+            logger.warning(f"{len(rows) - len(updates)} {category} submissions could not be re-scored")
+    return rescored
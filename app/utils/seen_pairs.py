@@ -0,0 +1,75 @@
+from typing import Tuple, Dict
+from collections import OrderedDict
+from datetime import date
+import hashlib
+import threading
+
+class SeenPairs:
+    """
+    Remembers which vote pairs each user has been shown, per (user, category, date). Every entry is a small
+    fixed-size Bloom filter over the pair's submission IDs rather than a row per pair, so memory stays
+    bounded by max_entries * bits / 8 bytes regardless of how many pairs are shown. A false positive only
+    means a pair the user has not seen is skipped.
+
+    Attributes:
+        bits: The size of each Bloom filter in bits.
+        hashes: The number of bit positions set per pair.
+        max_entries: The number of filters kept before the least recently used one is dropped.
+
+    Methods:
+        seen: Return whether a user has probably been shown a pair.
+        add: Record that a user has been shown a pair.
+        stats: Return the number of filters and their memory use.
+    """
+    def __init__(self, bits: int = 512, hashes: int = 3, max_entries: int = 50000):
+        self.bits = bits
+        self.hashes = hashes
+        self.max_entries = max_entries
+        self.filters: 'OrderedDict[Tuple[int, str, date], bytearray]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def configure(self, bits: int, hashes: int, max_entries: int) -> None:
+        with self.lock:
+            if bits != self.bits or hashes != self.hashes:
+                self.filters.clear()
+            self.bits = bits
+            self.hashes = hashes
+            self.max_entries = max_entries
+
+    def _positions(self, first_id: int, second_id: int):
+        # The pair is unordered, so (a, b) and (b, a) map to the same bits
+        low, high = sorted((first_id, second_id))
+        digest = hashlib.blake2b(f"{low}:{high}".encode('ascii'), digest_size=8).digest()
+        h1, h2 = int.from_bytes(digest[:4], 'little'), int.from_bytes(digest[4:], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def seen(self, key: Tuple[int, str, date], first_id: int, second_id: int) -> bool:
+        positions = self._positions(first_id, second_id)
+        with self.lock:
+            bloom = self.filters.get(key)
+            if bloom is None:
+                return False
+            return all(bloom[position >> 3] & (1 << (position & 7)) for position in positions)
+
+    def add(self, key: Tuple[int, str, date], first_id: int, second_id: int) -> None:
+        positions = self._positions(first_id, second_id)
+        with self.lock:
+            bloom = self.filters.get(key)
+            if bloom is None:
+                bloom = self.filters[key] = bytearray((self.bits + 7) // 8)
+            self.filters.move_to_end(key)
+            for position in positions:
+                bloom[position >> 3] |= 1 << (position & 7)
+            while len(self.filters) > self.max_entries:
+                self.filters.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'entries': len(self.filters),
+                'max_entries': self.max_entries,
+                'filter_bytes': len(self.filters) * ((self.bits + 7) // 8)
+            }
+
+# Process-wide seen-pair store shared by every request in this worker
+seen_pairs = SeenPairs()
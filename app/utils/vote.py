@@ -1,107 +1,349 @@
 from datetime import datetime, date, timedelta
-from sqlalchemy import and_
-from app.models.db import User, get_db_connection
-from app.utils.streaks import update_voting_streak
-from sqlalchemy.orm.attributes import flag_modified
+from flask import current_app
+from sqlalchemy.sql import text
+from app.models.db import get_db_connection
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
 MAX_VOTES_PER_CATEGORY = 5
 
-def get_user_votes(user, category):
+# Number of past days whose vote counts can still affect vote limits
+VOTE_LIMIT_WINDOW_DAYS = 2
+
+class VoteError(Exception):
+    """
+    Raised when a vote is rejected. The message is shown to the user.
+    """
+
+def get_user_votes(session_db, user_id, category, vote_date):
     """
     Get the number of votes a user has made for a specific category.
     
     Args:
-        user: The user object to get votes for
+        session_db: The database session object
+        user_id: The ID of the user to get votes for
         category: The category to get votes for
+        vote_date: The date of the submissions being voted on
         
     Returns:
-        The number of votes the user has made in the specified category today.
+        The number of votes the user has made in the specified category for that date.
     """
-    today = date.today().isoformat()
-    if not user.votes_per_category:
-        user.votes_per_category = {}
-    return user.votes_per_category.get(today, {}).get(category, 0)
+    votes = session_db.execute(
+        text("SELECT votes FROM user_category_votes WHERE user_id = :user_id AND category = :category AND date = :date"),
+        {'user_id': user_id, 'category': category, 'date': vote_date}
+    ).scalar()
+    return votes or 0
 
-def increment_user_vote(user, category, session_db):
+def get_vote_history(session_db, user_id, since):
     """
-    Increment the vote count for a user in a specific category.
+    Get a user's vote counts per date and category, in the shape votes_per_category used to have.
     
     Args:
-        user: The user object to increment votes for
-        category: The category to increment votes for
         session_db: The database session object
+        user_id: The ID of the user
+        since: The earliest voting date to include
     
     Returns:
-        Returns the number of remaining votes for that category.
-        Returns 0 if the user has reached the maximum number of votes for the category.
+        A dict of {date: {category: votes}} with ISO date keys.
     """
-    try:
-        today = date.today()
-        voting_date = (today - timedelta(days=1)).isoformat()  # Use yesterday's date for voting
-        logger.debug(f"Voting date: {voting_date}")
-        
-        if not user.votes_per_category:
-            user.votes_per_category = {}
-        
-        # Ensure the voting_date exists in votes_per_category
-        if voting_date not in user.votes_per_category:
-            user.votes_per_category[voting_date] = {}
-        
-        logger.debug(f"User's votes_per_category: {user.votes_per_category}")
-        
-        current_votes = user.votes_per_category[voting_date].get(category, 0)
-        logger.debug(f"Current votes for {category}: {current_votes}")
-        
-        if current_votes >= MAX_VOTES_PER_CATEGORY:
-            return 0
-
-        user.votes_per_category[voting_date][category] = current_votes + 1
-        user.daily_votes = sum(user.votes_per_category[voting_date].values())
-        user.last_vote_date = datetime.now()
+    rows = session_db.execute(
+        text("SELECT date, category, votes FROM user_category_votes WHERE user_id = :user_id AND date >= :since ORDER BY date, category"),
+        {'user_id': user_id, 'since': since}
+    ).fetchall()
+    history = {}
+    for row in rows:
+        history.setdefault(row.date.isoformat(), {})[row.category] = row.votes
+    return history
 
-        logger.debug(f"Updated votes_per_category: {user.votes_per_category}")
-        logger.debug(f"Updated daily_votes: {user.daily_votes}")
-        logger.debug(f"Updated last_vote_date: {user.last_vote_date}")
+def set_vote_counts(session_db, user_id, history, since):
+    """
+    Replace a user's vote counts from since on with the ones given, so counts the admin user editor showed
+    and the submitted history leaves out are removed. The caller is responsible for committing.
+    
+    Args:
+        session_db: The database session object
+        user_id: The ID of the user
+        history: A dict of {date: {category: votes}} with ISO date keys
+        since: The earliest voting date the editor showed
+    
+    Raises:
+        ValueError: If a date or count is invalid.
+    """
+    counts = [
+        {'user_id': user_id, 'date': date.fromisoformat(vote_date), 'category': category, 'votes': int(votes)}
+        for vote_date, categories in history.items()
+        for category, votes in categories.items()
+    ]
+    session_db.execute(
+        text("DELETE FROM user_category_votes WHERE user_id = :user_id AND date >= :since"),
+        {'user_id': user_id, 'since': since}
+    )
+    if counts:
+        session_db.execute(
+            text("""
+                INSERT INTO user_category_votes (user_id, category, date, votes)
+                VALUES (:user_id, :category, :date, :votes)
+                ON CONFLICT (user_id, category, date) DO UPDATE SET votes = EXCLUDED.votes
+            """),
+            counts
+        )
 
-        flag_modified(user, "votes_per_category")
-        flag_modified(user, "daily_votes")
-        flag_modified(user, "last_vote_date")
+def cast_vote(session_db, user_id, submission_id, category, vote_date):
+    """
+    Record a vote in one transaction of conditional statements: take one of the user's votes for the category
+    only if they have votes left, count the vote on the submission only if it belongs to the category and not
+    to the voter, and update the voter's daily count and voting streak. With VOTE_WRITE_BEHIND the vote is
+    appended to vote_events and reaches submissions.votes on the next flush_vote_events. Concurrent votes cannot exceed the limit
+    because the limit is checked by the same statement that increments the counter.
+    
+    Args:
+        session_db: The database session object
+        user_id: The ID of the user voting
+        submission_id: The ID of the submission voted for
+        category: The category being voted on
+        vote_date: The date of the submissions being voted on
+    
+    Returns:
+        The number of votes the user has left for that category.
+    
+    Raises:
+        VoteError: If the user has no votes left or cannot vote for the submission.
+    """
+    try:
+        votes = session_db.execute(
+            text("""
+                INSERT INTO user_category_votes (user_id, category, date, votes)
+                VALUES (:user_id, :category, :date, 1)
+                ON CONFLICT (user_id, category, date) DO UPDATE
+                SET votes = user_category_votes.votes + 1
+                WHERE user_category_votes.votes < :max_votes
+                RETURNING votes
+            """),
+            {'user_id': user_id, 'category': category, 'date': vote_date, 'max_votes': MAX_VOTES_PER_CATEGORY}
+        ).scalar()
+        if votes is None:
+            session_db.rollback()
+            raise VoteError(f"You have reached your voting limit for the {format_category_name(category)} category.")
         
-        update_voting_streak(user, session_db)
+        if current_app.config['VOTE_WRITE_BEHIND']:
+            # Append the vote instead of locking the submission row; flush_vote_events adds it to submissions.votes
+            counted = session_db.execute(
+                text("""
+                    INSERT INTO vote_events (submission_id, user_id, created_at)
+                    SELECT id, :user_id, NOW() FROM submissions
+                    WHERE id = :submission_id AND category = :category AND user_id <> :user_id
+                    RETURNING submission_id
+                """),
+                {'submission_id': submission_id, 'category': category, 'user_id': user_id}
+            ).scalar()
+        else:
+            counted = session_db.execute(
+                text("""
+                    UPDATE submissions SET votes = votes + 1
+                    WHERE id = :submission_id AND category = :category AND user_id <> :user_id
+                    RETURNING id
+                """),
+                {'submission_id': submission_id, 'category': category, 'user_id': user_id}
+            ).scalar()
+        if counted is None:
+            session_db.rollback()
+            raise VoteError("You cannot vote for your own submission." if submission_owned_by(session_db, submission_id, user_id) else "That submission could not be found.")
         
-        session_db.add(user)
-        session_db.commit()
+        # Same rules as update_voting_streak, applied in place. The daily count rolls over on the first vote of a new day.
+        # last_vote_date is stored as naive ET time so it compares against the ET day, not the database's CURRENT_DATE
+        now = datetime.now(current_app.config['TIMEZONE'])
+        today = now.date()
+        session_db.execute(
+            text("""
+                UPDATE users SET
+                    voting_streak = CASE
+                        WHEN last_voting_date = :today THEN COALESCE(voting_streak, 0)
+                        WHEN last_voting_date = :yesterday THEN COALESCE(voting_streak, 0) + 1
+                        ELSE 1
+                    END,
+                    last_voting_date = :today,
+                    daily_votes = CASE
+                        WHEN last_vote_date >= :today THEN COALESCE(daily_votes, 0) + 1
+                        ELSE 1
+                    END,
+                    last_vote_date = :now
+                WHERE id = :user_id
+            """),
+            {'user_id': user_id, 'today': today, 'yesterday': today - timedelta(days=1), 'now': now.replace(tzinfo=None)}
+        )
         
-        remaining_votes = MAX_VOTES_PER_CATEGORY - user.votes_per_category[voting_date][category]
-        return max(remaining_votes, 0)
+        session_db.commit()
+        return max(MAX_VOTES_PER_CATEGORY - votes, 0)
+    except VoteError:
+        raise
     except Exception as e:
-        logger.error(f"Error in increment_user_vote: {str(e)}", exc_info=True)
+        session_db.rollback()
+        logger.error(f"Error in cast_vote: {str(e)}", exc_info=True)
         raise
 
+def flush_vote_events(session_db, batch_size=5000, wait=False):
+    """
+    Fold pending vote events into submissions.votes. Each batch deletes up to batch_size events and applies their
+    per-submission counts in the same statement, so an event is counted exactly once even if the flusher crashes,
+    and every hot submission takes one row lock per batch instead of one per vote. If another flusher is already
+    running, this one returns unless wait is set.
+    
+    Args:
+        session_db: The database session object
+        batch_size: The maximum number of events folded per transaction
+        wait: Whether to wait for a running flusher instead of returning, so every queued event is folded
+    
+    Returns:
+        The number of vote events folded.
+    """
+    folded = 0
+    while True:
+        try:
+            # One flusher at a time, so concurrent batches cannot lock the same submissions in different orders
+            if wait:
+                session_db.execute(text("SELECT pg_advisory_xact_lock(hashtext('flush_vote_events'))"))
+            elif not session_db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext('flush_vote_events'))")).scalar():
+                session_db.rollback()
+                return folded
+            count = session_db.execute(
+                text("""
+                    WITH drained AS (
+                        DELETE FROM vote_events
+                        WHERE id IN (
+                            SELECT id FROM vote_events
+                            ORDER BY id
+                            LIMIT :batch_size
+                            FOR UPDATE SKIP LOCKED
+                        )
+                        RETURNING submission_id
+                    ), counts AS (
+                        SELECT submission_id, COUNT(*) AS votes FROM drained GROUP BY submission_id
+                    ), applied AS (
+                        UPDATE submissions s
+                        SET votes = s.votes + counts.votes
+                        FROM counts
+                        WHERE s.id = counts.submission_id
+                        RETURNING counts.votes
+                    )
+                    SELECT COALESCE(SUM(votes), 0) FROM applied
+                """),
+                {'batch_size': batch_size}
+            ).scalar()
+            session_db.commit()
+        except Exception as e:
+            session_db.rollback()
+            logger.error(f"Error in flush_vote_events: {str(e)}", exc_info=True)
+            raise
+        folded += count
+        if count < batch_size:
+            return folded
+
+def start_vote_flusher(app):
+    """
+    Start a daemon thread that runs flush_vote_events every VOTE_FLUSH_INTERVAL seconds in this process.
+    Used when VOTE_FLUSH_IN_PROCESS is set instead of running flush_vote_events.py.
+    """
+    def run():
+        with app.app_context():
+            while True:
+                time.sleep(app.config['VOTE_FLUSH_INTERVAL'])
+                session_db = get_db_connection()
+                try:
+                    flush_vote_events(session_db, app.config['VOTE_FLUSH_BATCH_SIZE'])
+                except Exception:
+                    pass  # Already logged; the events stay queued for the next pass
+                finally:
+                    session_db.close()
+    
+    thread = threading.Thread(target=run, name='vote-flusher', daemon=True)
+    thread.start()
+    return thread
+
+def submission_owned_by(session_db, submission_id, user_id):
+    """
+    Check whether a submission belongs to a user.
+    """
+    owner_id = session_db.execute(
+        text("SELECT user_id FROM submissions WHERE id = :id"),
+        {'id': submission_id}
+    ).scalar()
+    return owner_id == user_id
+
 def format_category_name(category):
     """
     Format the category name for display.
     """
     return " ".join(word.capitalize() for word in category.split('_'))
 
-def reset_daily_votes():
+def reset_daily_votes(session_db):
+    """
+    Zero daily_votes for every user whose last vote was before today (ET), in one set-based UPDATE.
+    Optional: cast_vote rolls the count over on a user's first vote of the day, so this only tidies up
+    the stored counts of users who have not voted yet today.
+    
+    Args:
+        session_db: The database session object
+    
+    Returns:
+        The number of users reset.
+    """
+    today = datetime.now(current_app.config['TIMEZONE']).date()
+    try:
+        result = session_db.execute(
+            text("""
+                UPDATE users SET daily_votes = 0
+                WHERE daily_votes <> 0
+                AND (last_vote_date IS NULL OR last_vote_date < :today)
+            """),
+            {'today': today}
+        )
+        session_db.commit()
+        return result.rowcount
+    except Exception as e:
+        session_db.rollback()
+        logger.error(f"Error in reset_daily_votes: {str(e)}", exc_info=True)
+        raise
+
+def compact_vote_history(session_db):
     """
-    Reset votes for all users if it's a new day.
-    This function should be called once per day, perhaps in a before_request handler.
+    Move any vote counts still held in users.votes_per_category into user_category_votes and empty the blob.
+    Vote limits are enforced from the table, so the blob needs no dates at all; this catches rows written
+    by older code and keeps them from growing again.
+    
+    Args:
+        session_db: The database session object
+    
+    Returns:
+        The number of users compacted.
     """
-    session_db = get_db_connection()
     try:
-        today = date.today().isoformat()
-        users = session_db.query(User).all()
-        for user in users:
-            if not user.votes_per_category:
-                user.votes_per_category = {}
-            if today not in user.votes_per_category:
-                user.votes_per_category[today] = {}
-                user.daily_votes = 0
+        session_db.execute(
+            text(r"""
+                INSERT INTO user_category_votes (user_id, category, date, votes)
+                SELECT u.id, c.key, d.key::date, c.value::int
+                FROM users u
+                CROSS JOIN LATERAL jsonb_each(u.votes_per_category) d
+                CROSS JOIN LATERAL jsonb_each_text(CASE WHEN jsonb_typeof(d.value) = 'object' THEN d.value ELSE '{}'::jsonb END) c
+                WHERE jsonb_typeof(u.votes_per_category) = 'object'
+                AND u.votes_per_category <> '{}'::jsonb
+                AND d.key ~ '^\d{4}-\d{2}-\d{2}$'
+                AND c.value ~ '^\d+$'
+                ON CONFLICT (user_id, category, date) DO UPDATE
+                SET votes = GREATEST(user_category_votes.votes, EXCLUDED.votes)
+            """)
+        )
+        result = session_db.execute(
+            text("""
+                UPDATE users SET votes_per_category = '{}'::jsonb
+                WHERE votes_per_category IS NOT NULL AND votes_per_category <> '{}'::jsonb
+            """)
+        )
         session_db.commit()
-    finally:
-        session_db.close()
\ No newline at end of file
+        return result.rowcount
+    except Exception as e:
+        session_db.rollback()
+        logger.error(f"Error in compact_vote_history: {str(e)}", exc_info=True)
+        raise
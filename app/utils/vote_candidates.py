@@ -0,0 +1,245 @@
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from array import array
+from collections import OrderedDict
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text, bindparam
+from flask import current_app
+from datetime import date
+import atexit
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from app.models.db import get_db_connection
+from app.utils.seen_pairs import seen_pairs
+
+logger = logging.getLogger(__name__)
+
+SUBMISSION_COLUMNS = ['id', 'username', 'category', 'challenge', 'user_phrase', 'votes']
+
+class CandidateSet:
+    """
+    The submissions to vote on for one category and date, with a min-heap of (impressions, tiebreak, position)
+    so the least-shown submissions are always served next. Ties are broken randomly, and the tiebreak is
+    redrawn every time a submission is shown.
+
+    Attributes:
+        ids: The submission IDs, indexed by position.
+        heap: (impressions, tiebreak, position) for every submission.
+        built_at: When the set was loaded from the database.
+
+    Methods:
+        take_pair: Return the positions of the two least-shown submissions, optionally skipping pairs, and count an impression for each.
+    """
+    def __init__(self, ids: array, impressions: List[int]):
+        self.ids = ids
+        self.heap = [(count, random.random(), position) for position, count in enumerate(impressions)]
+        heapq.heapify(self.heap)
+        self.built_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def take_pair(self, skip: Optional[Callable[[int, int], bool]] = None, probes: int = 8) -> Optional[Tuple[int, int]]:
+        """
+        Return the positions of the two least-shown submissions and count an impression for each. If skip is given,
+        pairs among the `probes` least-shown submissions are tried in order and the first one skip rejects is
+        passed over; if every such pair is rejected the two least-shown are returned anyway.
+        """
+        with self.lock:
+            if len(self.heap) < 2:
+                return None
+            popped = [heapq.heappop(self.heap) for _ in range(min(probes if skip else 2, len(self.heap)))]
+
+            chosen = (0, 1)
+            if skip is not None:
+                pairs = sorted(itertools.combinations(range(len(popped)), 2), key=lambda pair: pair[0] + pair[1])
+                chosen = next((pair for pair in pairs if not skip(popped[pair[0]][2], popped[pair[1]][2])), chosen)
+
+            for index, (count, tiebreak, position) in enumerate(popped):
+                if index in chosen:
+                    heapq.heappush(self.heap, (count + 1, random.random(), position))
+                else:
+                    heapq.heappush(self.heap, (count, tiebreak, position))
+            return popped[chosen[0]][2], popped[chosen[1]][2]
+
+class CandidateIndex:
+    """
+    Per-(category, date) candidate sets, held in memory by each worker. Voting runs on the previous day's
+    submissions, which no longer change, so a set is built with one index scan and then reused until it
+    expires. Rebuilding picks up the impressions other workers have flushed.
+
+    Attributes:
+        entries: The candidate sets keyed by (category, date).
+        max_entries: The number of sets kept before the least recently used one is dropped.
+
+    Methods:
+        get: Return the candidate set for a category and date, building it if needed.
+        invalidate: Drop the set for a category and date.
+    """
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[Tuple[str, date], CandidateSet]' = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, session: Session, category: str, day: date, ttl: float) -> CandidateSet:
+        key = (category, day)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry.built_at < ttl:
+                self.entries.move_to_end(key)
+                return entry
+
+        rows = session.execute(
+            text("SELECT id, impressions FROM submissions WHERE category = :category AND date = :date ORDER BY id"),
+            {'category': category, 'date': day}
+        ).fetchall()
+        entry = CandidateSet(array('q', (row.id for row in rows)), [row.impressions for row in rows])
+
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, category: str, day: date) -> None:
+        with self.lock:
+            self.entries.pop((category, day), None)
+
+class ImpressionBuffer:
+    """
+    Impressions counted in memory and written to submissions.impressions in batches, instead of one
+    UPDATE per page view.
+
+    Attributes:
+        pending: Unwritten impressions keyed by submission ID.
+        last_flush: When the buffer was last written.
+
+    Methods:
+        record: Count an impression for each submission.
+        flush: Write the pending impressions in one batch.
+        flush_if_due: Flush once flush_size impressions are pending or flush_interval seconds have passed.
+    """
+    def __init__(self):
+        self.pending: Dict[int, int] = {}
+        self.pending_total = 0
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    def record(self, submission_ids: List[int]) -> None:
+        with self.lock:
+            for submission_id in submission_ids:
+                self.pending[submission_id] = self.pending.get(submission_id, 0) + 1
+            self.pending_total += len(submission_ids)
+
+    def flush(self, session: Session) -> int:
+        with self.lock:
+            pending, self.pending, self.pending_total = self.pending, {}, 0
+            self.last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        try:
+            session.execute(
+                text("UPDATE submissions SET impressions = impressions + :count WHERE id = :id"),
+                [{'id': submission_id, 'count': count} for submission_id, count in sorted(pending.items())]
+            )
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error flushing {len(pending)} submission impressions: {e}")
+            # Put the counts back so the next flush retries them
+            with self.lock:
+                for submission_id, count in pending.items():
+                    self.pending[submission_id] = self.pending.get(submission_id, 0) + count
+                    self.pending_total += count
+            return 0
+        return len(pending)
+
+    def flush_if_due(self, session: Session, flush_size: int, flush_interval: float) -> int:
+        with self.lock:
+            due = self.pending_total >= flush_size or (self.pending and time.monotonic() - self.last_flush >= flush_interval)
+        return self.flush(session) if due else 0
+
+# Process-wide candidate index and impression buffer shared by every request in this worker
+vote_candidates = CandidateIndex()
+impression_buffer = ImpressionBuffer()
+
+# Function to write any buffered impressions when the worker exits
+@atexit.register
+def _flush_impressions_on_exit() -> None:
+    if not impression_buffer.pending:
+        return
+    session = get_db_connection()
+    if session is None:
+        return
+    try:
+        impression_buffer.flush(session)
+    finally:
+        session.close()
+
+# Function to fetch submissions by ID for the vote page
+def fetch_submissions(session: Session, submission_ids: List[int]) -> List[Dict[str, Any]]:
+    """
+    Fetch the fields shown on the vote page for a set of submissions with one primary-key lookup,
+    in the order the IDs were given.
+
+    Args:
+        session (Session): The database session.
+        submission_ids (List[int]): The IDs of the submissions.
+
+    Returns:
+        List[Dict[str, Any]]: The submissions that still exist.
+    """
+    rows = session.execute(
+        text("SELECT id, username, category, challenge, user_phrase, votes FROM submissions WHERE id IN :ids")
+            .bindparams(bindparam('ids', expanding=True)),
+        {'ids': list(submission_ids)}
+    ).fetchall()
+    by_id = {row.id: dict(zip(SUBMISSION_COLUMNS, row)) for row in rows}
+    return [by_id[submission_id] for submission_id in submission_ids if submission_id in by_id]
+
+# Function to pick the next two submissions to vote on
+def next_vote_pair(session: Session, category: str, day: date, user_id: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Pick the two least-shown submissions from a category and date, count an impression for each and fetch
+    them by primary key. Impressions are written to the database in batches. For a logged-in user, pairs the
+    user has already been shown are skipped where possible.
+
+    Args:
+        session (Session): The database session.
+        category (str): The category of the submissions.
+        day (date): The date of the submissions.
+        user_id (Optional[int]): The ID of the user viewing the page, if logged in.
+
+    Returns:
+        Optional[List[Dict[str, Any]]]: The two submissions in random order, or None if there are fewer than two.
+    """
+    config = current_app.config
+    seen_key = (user_id, category, day)
+    for _ in range(2):
+        candidates = vote_candidates.get(session, category, day, config['VOTE_CANDIDATE_TTL'])
+        skip = None
+        if user_id is not None:
+            skip = lambda first, second: seen_pairs.seen(seen_key, candidates.ids[first], candidates.ids[second])
+        pair = candidates.take_pair(skip, config['VOTE_SEEN_PROBES'])
+        if pair is None:
+            return None
+
+        pair_ids = [candidates.ids[position] for position in pair]
+        random.shuffle(pair_ids)
+        submissions = fetch_submissions(session, pair_ids)
+        if len(submissions) == 2:
+            if user_id is not None:
+                seen_pairs.add(seen_key, *pair_ids)
+            impression_buffer.record(pair_ids)
+            impression_buffer.flush_if_due(session, config['VOTE_IMPRESSION_FLUSH_SIZE'], config['VOTE_IMPRESSION_FLUSH_INTERVAL'])
+            return submissions
+
+        # A submission was deleted since the set was built
+        vote_candidates.invalidate(category, day)
+    return None
@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import logging
+import argparse
+import statistics
+from datetime import date
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import text
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.get_leaderboard import get_leaderboards, leaderboard_timeframes
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ['tiny_story', 'scene_description', 'specific_word', 'rhyming_phrase', 'emotion', 'dialogue', 'idiom', 'slogan', 'movie_quote']
+
+# Scratch schema holding its own users and leaderboard_entries. The benchmark connections put it first on the
+# search_path, so the application's queries run unchanged against it and never touch real data.
+SCHEMA = 'bench_leaderboard'
+SETUP = [
+    f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE",
+    f"CREATE SCHEMA {SCHEMA}",
+    f"CREATE TABLE {SCHEMA}.users (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL)",
+    f"CREATE TABLE {SCHEMA}.leaderboard_entries (id SERIAL PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES {SCHEMA}.users(id), category VARCHAR(64) NOT NULL, score INTEGER NOT NULL, date DATE NOT NULL)",
+]
+TEARDOWN = [f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"]
+
+# The query get_leaderboard builds through the ORM, run once per category and timeframe
+SINGLE_LEADERBOARD = text("""
+    SELECT users.name, SUM(leaderboard_entries.score) AS total_score
+    FROM leaderboard_entries JOIN users ON users.id = leaderboard_entries.user_id
+    WHERE leaderboard_entries.category = :category AND leaderboard_entries.date BETWEEN :start_date AND :end_date
+    GROUP BY users.id, users.name
+    ORDER BY SUM(leaderboard_entries.score) DESC
+    LIMIT 10
+""")
+
+def seed(engine, rows, users, days):
+    """
+    Fill the scratch tables with `rows` leaderboard entries spread over `users` users, every category and the last `days` days.
+    """
+    with engine.begin() as conn:
+        for statement_sql in SETUP:
+            conn.execute(text(statement_sql))
+        conn.execute(text(f"INSERT INTO {SCHEMA}.users (id, name) SELECT g, 'user' || g FROM generate_series(1, :users) g"), {'users': users})
+        conn.execute(
+            text(f"""
+                INSERT INTO {SCHEMA}.leaderboard_entries (user_id, category, score, date)
+                SELECT 1 + (random() * (:users - 1))::int,
+                       (CAST(:categories AS text[]))[1 + g % :category_count],
+                       (random() * 50)::int,
+                       CURRENT_DATE - 1 - (random() * (:days - 1))::int
+                FROM generate_series(1, :rows) g
+            """),
+            {'rows': rows, 'users': users, 'days': days, 'categories': CATEGORIES, 'category_count': len(CATEGORIES)}
+        )
+        conn.execute(text(f"ANALYZE {SCHEMA}.users"))
+        conn.execute(text(f"ANALYZE {SCHEMA}.leaderboard_entries"))
+
+def page_per_leaderboard(Session, timeframes):
+    # One session and one query per category and timeframe, as the page used to do
+    for category in CATEGORIES:
+        for start_date, end_date in timeframes.values():
+            session = Session()
+            try:
+                session.execute(SINGLE_LEADERBOARD, {'category': category, 'start_date': start_date, 'end_date': end_date}).fetchall()
+            finally:
+                session.close()
+
+def page_bulk(Session, timeframes):
+    session = Session()
+    try:
+        get_leaderboards(session, CATEGORIES, timeframes)
+    finally:
+        session.close()
+
+def time_page(render, Session, timeframes, repeats):
+    render(Session, timeframes)  # warm the cache and the connection pool
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        render(Session, timeframes)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), max(samples)
+
+def run_benchmark(sizes, users, days, repeats):
+    url = os.environ['DATABASE_URL'].replace("postgres://", "postgresql://", 1)
+    engine = create_engine(url, connect_args={'options': f'-csearch_path={SCHEMA}'})
+    Session = sessionmaker(bind=engine)
+    timeframes = leaderboard_timeframes(date.today())
+    try:
+        for rows in sizes:
+            seed(engine, rows, users, days)
+            for name, render in (('27 queries', page_per_leaderboard), ('bulk', page_bulk)):
+                median, worst = time_page(render, Session, timeframes, repeats)
+                logger.info(f"{rows} entries, {name}: median {median * 1000:.1f} ms, max {worst * 1000:.1f} ms over {repeats} page loads")
+    finally:
+        with engine.begin() as conn:
+            for statement_sql in TEARDOWN:
+                conn.execute(text(statement_sql))
+        engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare /leaderboards page query latency for one query per leaderboard and the bulk query. Requires DATABASE_URL; uses a scratch schema.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000], help="leaderboard_entries sizes to test.")
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=90, help="Days of history the entries are spread over.")
+    parser.add_argument('--repeats', type=int, default=10)
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.users, args.days, args.repeats)
@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import logging
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from config import Config
+from app.utils.llm import set_provider, build_provider
+from app.utils.score import calculate_initial_score
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CHALLENGE = "Create a phrase that tells a tiny story about a lost sock."
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run_benchmark(requests, workers):
+    """
+    Score `requests` distinct phrases from `workers` threads, the way gunicorn threads would call
+    calculate_initial_score from submit_phrase, and report throughput and the latency profile.
+    """
+    latencies = []
+    errors = 0
+
+    def score_one(i):
+        start = time.perf_counter()
+        calculate_initial_score(f"The lost sock number {i} found a new life as a puppet.", 'tiny_story', CHALLENGE)
+        return time.perf_counter() - start
+
+    app = Flask(__name__)
+    app.config.from_object(Config)
+
+    def worker(i):
+        with app.app_context():
+            return score_one(i)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(worker, i) for i in range(requests)]
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except Exception:
+                errors += 1
+    elapsed = time.perf_counter() - started
+
+    logger.info(f"Scored {len(latencies)} phrases ({errors} errors) in {elapsed:.2f}s with {workers} workers")
+    logger.info(f"Throughput: {requests / elapsed:.1f} req/s")
+    if latencies:
+        logger.info(
+            f"Latency: mean {statistics.mean(latencies) * 1000:.0f}ms, "
+            f"p50 {percentile(latencies, 50) * 1000:.0f}ms, "
+            f"p95 {percentile(latencies, 95) * 1000:.0f}ms, "
+            f"p99 {percentile(latencies, 99) * 1000:.0f}ms"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scoring step of submit_phrase against an LLM provider.")
+    parser.add_argument('--provider', default='fake', choices=['fake', 'openai'], help="Provider to benchmark. 'openai' makes real, billed calls.")
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency-distribution', default=Config.LLM_FAKE_LATENCY_DISTRIBUTION)
+    parser.add_argument('--latency-mean', type=float, default=Config.LLM_FAKE_LATENCY_MEAN)
+    parser.add_argument('--latency-stddev', type=float, default=Config.LLM_FAKE_LATENCY_STDDEV)
+    parser.add_argument('--error-rate', type=float, default=Config.LLM_FAKE_ERROR_RATE)
+    args = parser.parse_args()
+
+    Config.LLM_PROVIDER = args.provider
+    set_provider(build_provider(args.provider, {
+        'OPENAI_API_KEY': Config.OPENAI_API_KEY,
+        'LLM_FAKE_LATENCY_DISTRIBUTION': args.latency_distribution,
+        'LLM_FAKE_LATENCY_MEAN': args.latency_mean,
+        'LLM_FAKE_LATENCY_STDDEV': args.latency_stddev,
+        'LLM_FAKE_ERROR_RATE': args.error_rate,
+        'LLM_FAKE_SEED': Config.LLM_FAKE_SEED
+    }))
+
+    run_benchmark(args.requests, args.workers)
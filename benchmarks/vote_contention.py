@@ -0,0 +1,115 @@
+import os
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine
+from sqlalchemy.sql import text
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Scratch tables, so the benchmark never touches real votes
+SETUP = [
+    "DROP TABLE IF EXISTS bench_vote_events",
+    "DROP TABLE IF EXISTS bench_submissions",
+    "CREATE TABLE bench_submissions (id BIGINT PRIMARY KEY, user_id INTEGER NOT NULL, category VARCHAR(64) NOT NULL, votes INTEGER NOT NULL DEFAULT 0)",
+    "CREATE TABLE bench_vote_events (id BIGSERIAL PRIMARY KEY, submission_id BIGINT NOT NULL REFERENCES bench_submissions(id) ON DELETE CASCADE, user_id INTEGER NOT NULL, created_at TIMESTAMP NOT NULL)",
+]
+TEARDOWN = ["DROP TABLE IF EXISTS bench_vote_events", "DROP TABLE IF EXISTS bench_submissions"]
+
+# The same statements cast_vote and flush_vote_events run, against the scratch tables
+DIRECT_VOTE = text("""
+    UPDATE bench_submissions SET votes = votes + 1
+    WHERE id = :submission_id AND category = :category AND user_id <> :user_id
+    RETURNING id
+""")
+APPEND_VOTE = text("""
+    INSERT INTO bench_vote_events (submission_id, user_id, created_at)
+    SELECT id, :user_id, NOW() FROM bench_submissions
+    WHERE id = :submission_id AND category = :category AND user_id <> :user_id
+    RETURNING submission_id
+""")
+FLUSH = text("""
+    WITH drained AS (
+        DELETE FROM bench_vote_events
+        WHERE id IN (SELECT id FROM bench_vote_events ORDER BY id LIMIT :batch_size FOR UPDATE SKIP LOCKED)
+        RETURNING submission_id
+    ), counts AS (
+        SELECT submission_id, COUNT(*) AS votes FROM drained GROUP BY submission_id
+    ), applied AS (
+        UPDATE bench_submissions s SET votes = s.votes + counts.votes
+        FROM counts WHERE s.id = counts.submission_id
+        RETURNING counts.votes
+    )
+    SELECT COALESCE(SUM(votes), 0) FROM applied
+""")
+
+def run_votes(engine, statement, votes, workers, hot_submissions, hold):
+    """
+    Cast `votes` votes from `workers` threads, spread over `hot_submissions` submissions. Each vote holds its
+    transaction open for `hold` seconds before committing, standing in for the rest of cast_vote.
+    """
+    def vote(i):
+        with engine.begin() as conn:
+            conn.execute(statement, {'submission_id': i % hot_submissions + 1, 'category': 'emotion', 'user_id': 1000 + i})
+            if hold:
+                conn.execute(text("SELECT pg_sleep(:hold)"), {'hold': hold})
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(vote, range(votes)))
+    return time.perf_counter() - started
+
+def run_benchmark(votes, workers, hot_submissions, hold, batch_size):
+    engine = create_engine(os.environ['DATABASE_URL'].replace("postgres://", "postgresql://", 1), pool_size=workers, max_overflow=0)
+    try:
+        for mode, statement in (('direct', DIRECT_VOTE), ('write-behind', APPEND_VOTE)):
+            with engine.begin() as conn:
+                for statement_sql in SETUP:
+                    conn.execute(text(statement_sql))
+                conn.execute(
+                    text("INSERT INTO bench_submissions (id, user_id, category) SELECT g, g, 'emotion' FROM generate_series(1, :n) g"),
+                    {'n': hot_submissions}
+                )
+
+            elapsed = run_votes(engine, statement, votes, workers, hot_submissions, hold)
+            logger.info(f"{mode}: {votes} votes on {hot_submissions} submission(s) with {workers} workers in {elapsed:.2f}s ({votes / elapsed:.0f} votes/s)")
+
+            if mode == 'write-behind':
+                started = time.perf_counter()
+                folded = 0
+                with engine.connect() as conn:
+                    while True:
+                        count = conn.execute(FLUSH, {'batch_size': batch_size}).scalar()
+                        conn.commit()
+                        folded += count
+                        if count < batch_size:
+                            break
+                flush_elapsed = time.perf_counter() - started
+                logger.info(f"write-behind: folded {folded} events in {flush_elapsed:.3f}s ({folded / flush_elapsed:.0f} events/s)")
+
+            with engine.connect() as conn:
+                total = conn.execute(text("SELECT SUM(votes) FROM bench_submissions")).scalar()
+            logger.info(f"{mode}: submissions.votes total = {total}")
+    finally:
+        with engine.begin() as conn:
+            for statement_sql in TEARDOWN:
+                conn.execute(text(statement_sql))
+        engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare direct and write-behind vote counting under contention. Requires DATABASE_URL; uses scratch tables.")
+    parser.add_argument('--votes', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--hot-submissions', type=int, default=1, help="Number of submissions the votes are spread over.")
+    parser.add_argument('--hold', type=float, default=0.002, help="Seconds each vote transaction stays open after counting the vote.")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    run_benchmark(args.votes, args.workers, args.hot_submissions, args.hold, args.batch_size)
@@ -0,0 +1,139 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+from sqlalchemy import create_engine
+from sqlalchemy.sql import text
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ['emotion', 'humor', 'creativity', 'wordplay', 'clarity', 'originality', 'persuasion', 'imagery', 'rhythm']
+
+# Scratch tables, so the benchmark never touches real users or votes
+SETUP = [
+    "DROP TABLE IF EXISTS bench_users",
+    "DROP TABLE IF EXISTS bench_user_category_votes",
+    "CREATE TABLE bench_users (id INTEGER PRIMARY KEY, votes_per_category JSONB NOT NULL DEFAULT '{}'::jsonb)",
+    "CREATE TABLE bench_user_category_votes (user_id INTEGER NOT NULL, category VARCHAR(64) NOT NULL, date DATE NOT NULL, votes INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (user_id, category, date))",
+]
+TEARDOWN = ["DROP TABLE IF EXISTS bench_users", "DROP TABLE IF EXISTS bench_user_category_votes"]
+
+# The legacy vote: read the whole history blob, change one counter and write the blob back
+LEGACY_READ = text("SELECT votes_per_category FROM bench_users WHERE id = :user_id FOR UPDATE")
+LEGACY_WRITE = text("UPDATE bench_users SET votes_per_category = CAST(:history AS jsonb) WHERE id = :user_id")
+
+# The statement cast_vote runs now, against the scratch table
+UPSERT_VOTE = text("""
+    INSERT INTO bench_user_category_votes (user_id, category, date, votes)
+    VALUES (:user_id, :category, CURRENT_DATE, 1)
+    ON CONFLICT (user_id, category, date) DO UPDATE
+    SET votes = bench_user_category_votes.votes + 1
+    WHERE bench_user_category_votes.votes < :max_votes
+    RETURNING votes
+""")
+
+def report_live_sizes(engine):
+    """
+    Log how much space vote history takes in the real tables. Read-only.
+    """
+    with engine.connect() as conn:
+        blob = conn.execute(text("""
+            SELECT COUNT(*) AS users,
+                   COALESCE(AVG(pg_column_size(votes_per_category)), 0) AS avg_bytes,
+                   COALESCE(MAX(pg_column_size(votes_per_category)), 0) AS max_bytes,
+                   COALESCE(SUM(pg_column_size(votes_per_category)), 0) AS total_bytes
+            FROM users
+        """)).fetchone()
+        logger.info(
+            f"users.votes_per_category: {blob.users} rows, avg {float(blob.avg_bytes):.0f} B, "
+            f"max {blob.max_bytes} B, total {blob.total_bytes} B"
+        )
+        users_size = conn.execute(text("SELECT pg_total_relation_size('users')")).scalar()
+        votes_rows = conn.execute(text("SELECT COUNT(*) FROM user_category_votes")).scalar()
+        votes_size = conn.execute(text("SELECT pg_total_relation_size('user_category_votes')")).scalar()
+        logger.info(f"users table: {users_size} B; user_category_votes: {votes_rows} rows, {votes_size} B")
+
+def run_latency(engine, users, history_days, votes, max_votes):
+    """
+    Compare the per-vote latency of the legacy JSONB read-modify-write, with `history_days` days of history per
+    user, against the user_category_votes upsert with the same history stored as rows.
+    """
+    with engine.begin() as conn:
+        for statement_sql in SETUP:
+            conn.execute(text(statement_sql))
+        conn.execute(
+            text("""
+                INSERT INTO bench_users (id, votes_per_category)
+                SELECT u, (
+                    SELECT jsonb_object_agg(to_char(CURRENT_DATE - d, 'YYYY-MM-DD'),
+                                            (SELECT jsonb_object_agg(c, 3) FROM unnest(CAST(:categories AS text[])) c))
+                    FROM generate_series(1, :days) d
+                )
+                FROM generate_series(1, :users) u
+            """),
+            {'users': users, 'days': history_days, 'categories': CATEGORIES}
+        )
+        conn.execute(
+            text("""
+                INSERT INTO bench_user_category_votes (user_id, category, date, votes)
+                SELECT u, c, CURRENT_DATE - d, 3
+                FROM generate_series(1, :users) u, generate_series(1, :days) d, unnest(CAST(:categories AS text[])) c
+            """),
+            {'users': users, 'days': history_days, 'categories': CATEGORIES}
+        )
+        conn.execute(text("ANALYZE bench_users"))
+        conn.execute(text("ANALYZE bench_user_category_votes"))
+        avg_bytes = conn.execute(text("SELECT AVG(pg_column_size(votes_per_category)) FROM bench_users")).scalar()
+    logger.info(f"{users} users with {history_days} days of history: avg blob {float(avg_bytes or 0):.0f} B")
+
+    today = time.strftime('%Y-%m-%d')
+    with engine.connect() as conn:
+        started = time.perf_counter()
+        for i in range(votes):
+            user_id, category = i % users + 1, CATEGORIES[i % len(CATEGORIES)]
+            history = conn.execute(LEGACY_READ, {'user_id': user_id}).scalar()
+            day = history.setdefault(today, {})
+            if day.get(category, 0) < max_votes:
+                day[category] = day.get(category, 0) + 1
+            conn.execute(LEGACY_WRITE, {'user_id': user_id, 'history': json.dumps(history)})
+            conn.commit()
+        legacy = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for i in range(votes):
+            conn.execute(UPSERT_VOTE, {'user_id': i % users + 1, 'category': CATEGORIES[i % len(CATEGORIES)], 'max_votes': max_votes})
+            conn.commit()
+        upsert = time.perf_counter() - started
+
+    logger.info(f"legacy JSONB read-modify-write: {votes} votes in {legacy:.2f}s ({legacy / votes * 1000:.2f} ms/vote)")
+    logger.info(f"user_category_votes upsert: {votes} votes in {upsert:.2f}s ({upsert / votes * 1000:.2f} ms/vote)")
+
+def run_benchmark(users, history_days, votes, max_votes, skip_live):
+    engine = create_engine(os.environ['DATABASE_URL'].replace("postgres://", "postgresql://", 1))
+    try:
+        if not skip_live:
+            report_live_sizes(engine)
+        run_latency(engine, users, history_days, votes, max_votes)
+    finally:
+        with engine.begin() as conn:
+            for statement_sql in TEARDOWN:
+                conn.execute(text(statement_sql))
+        engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report vote history size and compare JSONB and table-backed vote latency. Requires DATABASE_URL; the latency part uses scratch tables.")
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--history-days', type=int, default=365, help="Days of vote history each scratch user starts with.")
+    parser.add_argument('--votes', type=int, default=2000)
+    parser.add_argument('--max-votes', type=int, default=5)
+    parser.add_argument('--skip-live', action='store_true', help="Skip the read-only size report on the real tables.")
+    args = parser.parse_args()
+
+    run_benchmark(args.users, args.history_days, args.votes, args.max_votes, args.skip_live)
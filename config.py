@@ -28,6 +28,95 @@ class Config:
     # OPENAI API Key
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
     
+    # LLM provider: 'openai' for real completions, 'fake' for the deterministic local stand-in used in load tests
+    LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'openai')
+    LLM_FAKE_LATENCY_DISTRIBUTION = os.environ.get('LLM_FAKE_LATENCY_DISTRIBUTION', 'lognormal')
+    LLM_FAKE_LATENCY_MEAN = float(os.environ.get('LLM_FAKE_LATENCY_MEAN', 1.5))
+    LLM_FAKE_LATENCY_STDDEV = float(os.environ.get('LLM_FAKE_LATENCY_STDDEV', 0.5))
+    LLM_FAKE_ERROR_RATE = float(os.environ.get('LLM_FAKE_ERROR_RATE', 0.0))
+    LLM_FAKE_SEED = int(os.environ.get('LLM_FAKE_SEED', 0))
+    
+    # Resilience around every LLM call: deadlines in seconds, circuit breaker and hedged requests
+    LLM_DEADLINE = float(os.environ.get('LLM_DEADLINE', 20))
+    LLM_DEADLINE_CHALLENGE = float(os.environ.get('LLM_DEADLINE_CHALLENGE', 20))
+    LLM_DEADLINE_SCORE = float(os.environ.get('LLM_DEADLINE_SCORE', 15))
+    LLM_DEADLINE_SCORE_BATCH = float(os.environ.get('LLM_DEADLINE_SCORE_BATCH', 60))
+    LLM_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('LLM_BREAKER_FAILURE_THRESHOLD', 5))
+    LLM_BREAKER_SLOW_CALL_SECONDS = float(os.environ.get('LLM_BREAKER_SLOW_CALL_SECONDS', 12))
+    LLM_BREAKER_RESET_SECONDS = float(os.environ.get('LLM_BREAKER_RESET_SECONDS', 30))
+    LLM_HEDGE_ENABLED = os.environ.get('LLM_HEDGE_ENABLED', 'False').lower() == 'true'
+    
+    # Scoring result cache, so a score-first preview is reused on final submission
+    SCORE_CACHE_SIZE = int(os.environ.get('SCORE_CACHE_SIZE', 4096))
+    SCORE_CACHE_TTL = int(os.environ.get('SCORE_CACHE_TTL', 86400))
+    
+    # Local pre-filter that gives obvious junk a fixed score without an LLM call
+    PREFILTER_ENABLED = os.environ.get('PREFILTER_ENABLED', 'True').lower() == 'true'
+    PREFILTER_CHALLENGE_SIMILARITY = float(os.environ.get('PREFILTER_CHALLENGE_SIMILARITY', 0.85))
+    PREFILTER_REFRESH_SECONDS = float(os.environ.get('PREFILTER_REFRESH_SECONDS', 30))
+    
+    # Token-bucket limits on the LLM-backed endpoints, written as "<requests>/<seconds>". An empty value disables a limit.
+    # The 'memory' backend limits each worker process separately; 'database' shares the buckets across workers.
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_TRUST_PROXY = os.environ.get('RATE_LIMIT_TRUST_PROXY', 'False').lower() == 'true'
+    RATE_LIMIT_SCORE_USER = os.environ.get('RATE_LIMIT_SCORE_USER', '6/60')
+    RATE_LIMIT_SCORE_IP = os.environ.get('RATE_LIMIT_SCORE_IP', '20/60')
+    RATE_LIMIT_SCORE_GLOBAL = os.environ.get('RATE_LIMIT_SCORE_GLOBAL', '300/60')
+    # Challenge limits are only charged when a challenge has to be generated inline by OpenAI, not on cached reads
+    RATE_LIMIT_CHALLENGE_USER = os.environ.get('RATE_LIMIT_CHALLENGE_USER', '30/60')
+    RATE_LIMIT_CHALLENGE_IP = os.environ.get('RATE_LIMIT_CHALLENGE_IP', '60/60')
+    RATE_LIMIT_CHALLENGE_GLOBAL = os.environ.get('RATE_LIMIT_CHALLENGE_GLOBAL', '1200/60')
+    
+    # Background scoring queue processed by scoring_worker.py
+    SCORING_WORKER_THREADS = int(os.environ.get('SCORING_WORKER_THREADS', 8))
+    SCORING_BATCH_SIZE = int(os.environ.get('SCORING_BATCH_SIZE', 16))
+    SCORING_POLL_INTERVAL = float(os.environ.get('SCORING_POLL_INTERVAL', 1))
+    SCORING_JOB_MAX_ATTEMPTS = int(os.environ.get('SCORING_JOB_MAX_ATTEMPTS', 3))
+    SCORING_JOB_STALE_SECONDS = int(os.environ.get('SCORING_JOB_STALE_SECONDS', 300))
+    SCORING_BATCH_MAX_ITEMS = int(os.environ.get('SCORING_BATCH_MAX_ITEMS', 10))
+    
+    # Shared cache of today's challenges, readable by every worker process on the host
+    CHALLENGE_CACHE_PATH = os.environ.get('CHALLENGE_CACHE_PATH')
+    
+    # Concurrent challenge generation limits
+    CHALLENGE_GENERATION_CONCURRENCY = int(os.environ.get('CHALLENGE_GENERATION_CONCURRENCY', 4))
+    CHALLENGE_GENERATION_TIMEOUT = float(os.environ.get('CHALLENGE_GENERATION_TIMEOUT', 30))
+    
+    # Number of unused generated prompts to keep banked per category
+    CHALLENGE_BANK_SIZE = int(os.environ.get('CHALLENGE_BANK_SIZE', 5))
+    
+    # Seconds a worker keeps its in-memory set of the submissions to vote on for a category and day.
+    # Lower values pick up impressions flushed by other workers sooner.
+    VOTE_CANDIDATE_TTL = float(os.environ.get('VOTE_CANDIDATE_TTL', 300))
+    
+    # Vote page impressions are counted in memory and written in batches of this size, or after this many seconds
+    VOTE_IMPRESSION_FLUSH_SIZE = int(os.environ.get('VOTE_IMPRESSION_FLUSH_SIZE', 100))
+    VOTE_IMPRESSION_FLUSH_INTERVAL = float(os.environ.get('VOTE_IMPRESSION_FLUSH_INTERVAL', 30))
+    
+    # Write-behind vote counting: votes are appended to vote_events and folded into submissions.votes
+    # every VOTE_FLUSH_INTERVAL seconds by flush_vote_events.py (or by a thread in each web worker)
+    VOTE_WRITE_BEHIND = os.environ.get('VOTE_WRITE_BEHIND', 'True').lower() == 'true'
+    VOTE_FLUSH_INTERVAL = float(os.environ.get('VOTE_FLUSH_INTERVAL', 2))
+    VOTE_FLUSH_BATCH_SIZE = int(os.environ.get('VOTE_FLUSH_BATCH_SIZE', 5000))
+    VOTE_FLUSH_IN_PROCESS = os.environ.get('VOTE_FLUSH_IN_PROCESS', 'False').lower() == 'true'
+    
+    # Per-(user, category, day) Bloom filters of the vote pairs each user has been shown
+    VOTE_SEEN_BLOOM_BITS = int(os.environ.get('VOTE_SEEN_BLOOM_BITS', 512))
+    VOTE_SEEN_BLOOM_HASHES = int(os.environ.get('VOTE_SEEN_BLOOM_HASHES', 3))
+    VOTE_SEEN_MAX_ENTRIES = int(os.environ.get('VOTE_SEEN_MAX_ENTRIES', 50000))
+    VOTE_SEEN_PROBES = int(os.environ.get('VOTE_SEEN_PROBES', 8))
+    
+    # Live daily standings on the vote page, kept in each worker's memory ('memory') or shared in Redis ('redis').
+    # In-memory boards are rebuilt from the database every LIVE_LEADERBOARD_TTL seconds to pick up other workers' votes.
+    LIVE_LEADERBOARD_BACKEND = os.environ.get('LIVE_LEADERBOARD_BACKEND', 'memory')
+    LIVE_LEADERBOARD_TTL = float(os.environ.get('LIVE_LEADERBOARD_TTL', 30))
+    LIVE_LEADERBOARD_REDIS_URL = os.environ.get('LIVE_LEADERBOARD_REDIS_URL', 'redis://localhost:6379/0')
+    LIVE_LEADERBOARD_REDIS_TTL = float(os.environ.get('LIVE_LEADERBOARD_REDIS_TTL', 3600))
+    
+    # Number of ranked entries kept in each weekly, monthly and all-time leaderboard snapshot
+    LEADERBOARD_SNAPSHOT_SIZE = int(os.environ.get('LEADERBOARD_SNAPSHOT_SIZE', 10))
+    
     # Mail configuration
     MAIL_SERVER = os.environ.get('MAIL_SERVER', 'live.smtp.mailtrap.io')
     MAIL_PORT = int(os.environ.get('MAIL_PORT', 587))
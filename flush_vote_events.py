@@ -0,0 +1,50 @@
+import os
+import sys
+import time
+import logging
+import argparse
+from sqlalchemy.exc import SQLAlchemyError
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.utils.vote import flush_vote_events
+from app.models.db import get_db_connection
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def run_flusher(once=False):
+    """
+    Fold write-behind vote events into submissions.votes every VOTE_FLUSH_INTERVAL seconds until stopped.
+    Events are committed with the vote, so anything left unfolded by a crash is picked up on the next pass.
+    """
+    app = create_app()
+    with app.app_context():
+        interval = app.config['VOTE_FLUSH_INTERVAL']
+        batch_size = app.config['VOTE_FLUSH_BATCH_SIZE']
+        logger.info("Vote flusher started")
+        while True:
+            session = get_db_connection()
+            try:
+                folded = flush_vote_events(session, batch_size)
+                if folded:
+                    logger.info(f"Folded {folded} vote events")
+            except SQLAlchemyError as e:
+                logger.error(f"Database error occurred: {str(e)}")
+                session.rollback()
+            finally:
+                session.close()
+
+            if once:
+                break
+            time.sleep(interval)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold queued vote events into submission vote counts.")
+    parser.add_argument('--once', action='store_true', help="Fold everything queued and exit.")
+    args = parser.parse_args()
+
+    run_flusher(args.once)
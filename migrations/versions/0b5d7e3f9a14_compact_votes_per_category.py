@@ -0,0 +1,52 @@
+"""Move votes_per_category history into user_category_votes
+
+Revision ID: 0b5d7e3f9a14
+Revises: f1a3d8b6e092
+Create Date: 2026-10-17 16:30:41.902371
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0b5d7e3f9a14'
+down_revision = 'f1a3d8b6e092'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Copy every day of history into the aggregate table, keeping the higher count where both have one
+    op.execute(r"""
+        INSERT INTO user_category_votes (user_id, category, date, votes)
+        SELECT u.id, c.key, d.key::date, c.value::int
+        FROM users u
+        CROSS JOIN LATERAL jsonb_each(CASE WHEN jsonb_typeof(u.votes_per_category) = 'object' THEN u.votes_per_category ELSE '{}'::jsonb END) d
+        CROSS JOIN LATERAL jsonb_each_text(CASE WHEN jsonb_typeof(d.value) = 'object' THEN d.value ELSE '{}'::jsonb END) c
+        WHERE d.key ~ '^\d{4}-\d{2}-\d{2}$'
+        AND c.value ~ '^\d+$'
+        ON CONFLICT (user_id, category, date) DO UPDATE
+        SET votes = GREATEST(user_category_votes.votes, EXCLUDED.votes)
+    """)
+    
+    # Vote limits are enforced from user_category_votes, so the blob no longer needs any dates
+    op.execute("""
+        UPDATE users SET votes_per_category = '{}'::jsonb
+        WHERE votes_per_category IS NOT NULL AND votes_per_category <> '{}'::jsonb
+    """)
+
+def downgrade():
+    # Rebuild the blob from the aggregate table
+    op.execute("""
+        UPDATE users u
+        SET votes_per_category = h.history
+        FROM (
+            SELECT user_id, jsonb_object_agg(vote_date, categories) AS history
+            FROM (
+                SELECT user_id, to_char(date, 'YYYY-MM-DD') AS vote_date, jsonb_object_agg(category, votes) AS categories
+                FROM user_category_votes
+                GROUP BY user_id, date
+            ) per_day
+            GROUP BY user_id
+        ) h
+        WHERE u.id = h.user_id
+    """)
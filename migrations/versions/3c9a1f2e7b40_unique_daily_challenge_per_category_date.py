@@ -0,0 +1,45 @@
+"""Unique daily challenge per category and date
+
+Revision ID: 3c9a1f2e7b40
+Revises: 88b17198dffa
+Create Date: 2026-10-17 09:12:44.512031
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3c9a1f2e7b40'
+down_revision = '88b17198dffa'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Point submissions on duplicate challenges at the first challenge created for that day
+    op.execute("""
+        WITH keepers AS (
+            SELECT DISTINCT ON (category, date) category, date, challenge_id
+            FROM daily_challenges
+            ORDER BY category, date, id
+        )
+        UPDATE submissions s
+        SET challenge_id = k.challenge_id
+        FROM daily_challenges d
+        JOIN keepers k ON k.category = d.category AND k.date = d.date
+        WHERE s.challenge_id = d.challenge_id
+        AND d.challenge_id <> k.challenge_id
+    """)
+    
+    # Drop the duplicates so the unique constraint can be created
+    op.execute("""
+        DELETE FROM daily_challenges d
+        USING daily_challenges k
+        WHERE d.category = k.category
+        AND d.date = k.date
+        AND d.id > k.id
+    """)
+    
+    op.create_unique_constraint('uq_daily_challenges_category_date', 'daily_challenges', ['category', 'date'])
+
+def downgrade():
+    op.drop_constraint('uq_daily_challenges_category_date', 'daily_challenges', type_='unique')
@@ -0,0 +1,26 @@
+"""Add rate limit buckets
+
+Revision ID: 5e9c3a7d1f28
+Revises: b41f6e0d92c3
+Create Date: 2026-10-17 13:02:14.518327
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '5e9c3a7d1f28'
+down_revision = 'b41f6e0d92c3'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('rate_limit_buckets',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+def downgrade():
+    op.drop_table('rate_limit_buckets')
@@ -0,0 +1,29 @@
+"""Add challenge bank
+
+Revision ID: 7d2e4b8c1a95
+Revises: 3c9a1f2e7b40
+Create Date: 2026-10-17 10:03:18.274410
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7d2e4b8c1a95'
+down_revision = '3c9a1f2e7b40'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('challenge_bank',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('category', sa.String(length=64), nullable=False),
+    sa.Column('prompt', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_challenge_bank_category_id', 'challenge_bank', ['category', 'id'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_challenge_bank_category_id', table_name='challenge_bank')
+    op.drop_table('challenge_bank')
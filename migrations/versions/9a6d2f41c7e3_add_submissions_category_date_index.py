@@ -0,0 +1,21 @@
+"""Add submissions category and date index
+
+Revision ID: 9a6d2f41c7e3
+Revises: 5e9c3a7d1f28
+Create Date: 2026-10-17 13:48:09.204615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9a6d2f41c7e3'
+down_revision = '5e9c3a7d1f28'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_submissions_category_date', 'submissions', ['category', 'date'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_submissions_category_date', table_name='submissions')
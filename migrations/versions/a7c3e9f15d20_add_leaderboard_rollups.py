@@ -0,0 +1,48 @@
+"""Add leaderboard rollups
+
+Revision ID: a7c3e9f15d20
+Revises: 0b5d7e3f9a14
+Create Date: 2026-10-17 18:12:41.305127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'a7c3e9f15d20'
+down_revision = '0b5d7e3f9a14'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('leaderboard_rollups',
+    sa.Column('category', sa.String(length=64), nullable=False),
+    sa.Column('period', sa.String(length=16), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('category', 'period', 'user_id')
+    )
+    op.create_table('leaderboard_rollup_state',
+    sa.Column('category', sa.String(length=64), nullable=False),
+    sa.Column('period', sa.String(length=16), nullable=False),
+    sa.Column('window_start', sa.Date(), nullable=True),
+    sa.Column('through_date', sa.Date(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('category', 'period')
+    )
+    op.create_table('leaderboard_snapshots',
+    sa.Column('category', sa.String(length=64), nullable=False),
+    sa.Column('period', sa.String(length=16), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('category', 'period', 'position')
+    )
+    # The rollups are built on the next run of update_leaderboards.py
+
+def downgrade():
+    op.drop_table('leaderboard_snapshots')
+    op.drop_table('leaderboard_rollup_state')
+    op.drop_table('leaderboard_rollups')
@@ -0,0 +1,39 @@
+"""Add scoring queue
+
+Revision ID: b41f6e0d92c3
+Revises: 7d2e4b8c1a95
+Create Date: 2026-10-17 11:26:51.730912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b41f6e0d92c3'
+down_revision = '7d2e4b8c1a95'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('submissions', sa.Column('score_status', sa.String(length=16), server_default=sa.text("'done'"), nullable=False))
+    op.add_column('submissions', sa.Column('feedback', sa.Text(), nullable=True))
+    
+    op.create_table('scoring_jobs',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('submission_id', sa.BigInteger(), nullable=False),
+    sa.Column('status', sa.String(length=16), server_default=sa.text("'pending'"), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['submission_id'], ['submissions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('submission_id')
+    )
+    op.create_index('ix_scoring_jobs_status_id', 'scoring_jobs', ['status', 'id'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_scoring_jobs_status_id', table_name='scoring_jobs')
+    op.drop_table('scoring_jobs')
+    op.drop_column('submissions', 'feedback')
+    op.drop_column('submissions', 'score_status')
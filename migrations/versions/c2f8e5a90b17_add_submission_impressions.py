@@ -0,0 +1,21 @@
+"""Add submission impressions
+
+Revision ID: c2f8e5a90b17
+Revises: 9a6d2f41c7e3
+Create Date: 2026-10-17 14:21:37.880154
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c2f8e5a90b17'
+down_revision = '9a6d2f41c7e3'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('submissions', sa.Column('impressions', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+def downgrade():
+    op.drop_column('submissions', 'impressions')
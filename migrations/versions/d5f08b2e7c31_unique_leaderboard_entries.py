@@ -0,0 +1,31 @@
+"""Unique leaderboard entry per user, category and date
+
+Revision ID: d5f08b2e7c31
+Revises: a7c3e9f15d20
+Create Date: 2026-10-17 18:47:15.882604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd5f08b2e7c31'
+down_revision = 'a7c3e9f15d20'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Re-runs of update_leaderboards.py inserted a new entry each time; keep the most recent one
+    op.execute("""
+        DELETE FROM leaderboard_entries a
+        USING leaderboard_entries b
+        WHERE a.user_id = b.user_id AND a.category = b.category AND a.date = b.date
+        AND a.id < b.id
+    """)
+    op.create_index('ux_leaderboard_entries_category_date_user', 'leaderboard_entries', ['category', 'date', 'user_id'], unique=True)
+
+    # Rollups may have counted the duplicates; forget them so the next update_leaderboards.py run rebuilds them
+    op.execute("DELETE FROM leaderboard_rollup_state")
+
+def downgrade():
+    op.drop_index('ux_leaderboard_entries_category_date_user', table_name='leaderboard_entries')
@@ -0,0 +1,40 @@
+"""Add user category votes
+
+Revision ID: e4b7c19a2d56
+Revises: c2f8e5a90b17
+Create Date: 2026-10-17 15:03:52.117406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e4b7c19a2d56'
+down_revision = 'c2f8e5a90b17'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('user_category_votes',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(length=64), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('votes', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'category', 'date')
+    )
+    
+    # Carry over the counts still used for vote limits, so votes cast before the upgrade keep counting
+    op.execute(r"""
+        INSERT INTO user_category_votes (user_id, category, date, votes)
+        SELECT u.id, c.key, CASE WHEN d.key ~ '^\d{4}-\d{2}-\d{2}$' THEN d.key::date END, c.value::int
+        FROM users u
+        CROSS JOIN LATERAL jsonb_each(CASE WHEN jsonb_typeof(u.votes_per_category) = 'object' THEN u.votes_per_category ELSE '{}'::jsonb END) d
+        CROSS JOIN LATERAL jsonb_each_text(CASE WHEN jsonb_typeof(d.value) = 'object' THEN d.value ELSE '{}'::jsonb END) c
+        WHERE d.key >= to_char(CURRENT_DATE - 2, 'YYYY-MM-DD')
+        AND d.key ~ '^\d{4}-\d{2}-\d{2}$'
+        AND c.value ~ '^\d+$'
+    """)
+
+def downgrade():
+    op.drop_table('user_category_votes')
@@ -0,0 +1,29 @@
+"""Add score previews
+
+Revision ID: e8c41a7d3b59
+Revises: d5f08b2e7c31
+Create Date: 2026-10-17 21:12:40.518337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e8c41a7d3b59'
+down_revision = 'd5f08b2e7c31'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('score_previews',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.Column('feedback', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index('ix_score_previews_created_at', 'score_previews', ['created_at'], unique=False)
+
+def downgrade():
+    op.drop_index('ix_score_previews_created_at', table_name='score_previews')
+    op.drop_table('score_previews')
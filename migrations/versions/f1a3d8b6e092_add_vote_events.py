@@ -0,0 +1,35 @@
+"""Add vote events
+
+Revision ID: f1a3d8b6e092
+Revises: e4b7c19a2d56
+Create Date: 2026-10-17 15:47:20.663918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f1a3d8b6e092'
+down_revision = 'e4b7c19a2d56'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('vote_events',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('submission_id', sa.BigInteger(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['submission_id'], ['submissions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+def downgrade():
+    # Fold any votes that were not counted yet before dropping the table
+    op.execute("""
+        UPDATE submissions s
+        SET votes = s.votes + e.n
+        FROM (SELECT submission_id, COUNT(*) AS n FROM vote_events GROUP BY submission_id) e
+        WHERE s.id = e.submission_id
+    """)
+    op.drop_table('vote_events')
@@ -0,0 +1,60 @@
+import os
+import sys
+import logging
+import argparse
+from datetime import date, datetime, timedelta
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.utils.get_challenge import CATEGORIES
+from app.utils.async_challenge import generate_and_store_challenges
+from app.models.db import get_db_connection
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def pregenerate_all_challenges(target_dates=None, categories=None, concurrency=None, timeout=None):
+    """
+    Generate and store the daily challenges for the given categories and dates ahead of time.
+    If no date is provided, it generates the challenges for tomorrow (ET); if no categories are provided, all of them.
+    Schedule this to run before ET midnight so the first request of the day does not wait on OpenAI.
+    """
+    if categories is None:
+        categories = CATEGORIES
+
+    app = create_app()
+    with app.app_context():
+        if not target_dates:
+            target_dates = [datetime.now(app.config['TIMEZONE']).date() + timedelta(days=1)]
+
+        session = get_db_connection()
+        try:
+            logger.info(f"Pre-generating {len(categories)} categories for dates: {', '.join(d.isoformat() for d in target_dates)}")
+            created = generate_and_store_challenges(session, categories, target_dates, concurrency, timeout)
+            for (category, challenge_date), challenge_id in sorted(created.items()):
+                logger.info(f"Created challenge {challenge_id} for category: {category}, date: {challenge_date}")
+            logger.info(f"Challenge pre-generation finished, {len(created)} challenges created")
+        except Exception as e:
+            logger.error(f"An unexpected error occurred: {str(e)}")
+            session.rollback()
+        finally:
+            session.close()
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Invalid date format. Please use YYYY-MM-DD.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate daily challenges.")
+    parser.add_argument('dates', nargs='*', type=parse_date, help="Dates to generate (YYYY-MM-DD). Defaults to tomorrow.")
+    parser.add_argument('--categories', nargs='+', choices=CATEGORIES, help="Categories to generate. Defaults to all.")
+    parser.add_argument('--concurrency', type=int, help="Maximum OpenAI calls in flight.")
+    parser.add_argument('--timeout', type=float, help="Deadline in seconds for each OpenAI call.")
+    args = parser.parse_args()
+
+    pregenerate_all_challenges(args.dates, args.categories, args.concurrency, args.timeout)
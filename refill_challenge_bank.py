@@ -0,0 +1,46 @@
+import os
+import sys
+import logging
+import argparse
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.utils.get_challenge import CATEGORIES
+from app.utils.async_challenge import refill_challenge_bank
+from app.models.db import get_db_connection
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def refill_all_banks(target_size=None, categories=None):
+    """
+    Top up the challenge bank so every category holds target_size unused prompts.
+    Schedule this to run regularly so daily challenge creation never has to wait on OpenAI.
+    """
+    if categories is None:
+        categories = CATEGORIES
+
+    app = create_app()
+    with app.app_context():
+        session = get_db_connection()
+        try:
+            added = refill_challenge_bank(session, categories, target_size)
+            for category, count in sorted(added.items()):
+                logger.info(f"Banked {count} prompts for category: {category}")
+            logger.info(f"Challenge bank refill finished, {sum(added.values())} prompts added")
+        except Exception as e:
+            logger.error(f"An unexpected error occurred: {str(e)}")
+            session.rollback()
+        finally:
+            session.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refill the challenge bank.")
+    parser.add_argument('--size', type=int, help="Unused prompts to keep per category. Defaults to CHALLENGE_BANK_SIZE.")
+    parser.add_argument('--categories', nargs='+', choices=CATEGORIES, help="Categories to refill. Defaults to all.")
+    args = parser.parse_args()
+
+    refill_all_banks(args.size, args.categories)
@@ -0,0 +1,52 @@
+import os
+import sys
+import logging
+import argparse
+from datetime import date
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.utils.get_challenge import CATEGORIES
+from app.utils.scoring_queue import rescore_submissions
+from app.models.db import get_db_connection
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def rescore_date(target_date, categories=None):
+    """
+    Re-score every submission for a date, one batched LLM request per group of phrases in a category.
+    """
+    if categories is None:
+        categories = CATEGORIES
+
+    app = create_app()
+    with app.app_context():
+        session = get_db_connection()
+        try:
+            rescored = rescore_submissions(session, target_date, categories)
+            for category, count in sorted(rescored.items()):
+                logger.info(f"Re-scored {count} submissions for category: {category}, date: {target_date}")
+            logger.info(f"Re-scoring finished, {sum(rescored.values())} submissions updated")
+        except Exception as e:
+            logger.error(f"An unexpected error occurred: {str(e)}")
+            session.rollback()
+        finally:
+            session.close()
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Invalid date format. Please use YYYY-MM-DD.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score submissions for a date.")
+    parser.add_argument('date', type=parse_date, help="Submission date to re-score (YYYY-MM-DD).")
+    parser.add_argument('--categories', nargs='+', choices=CATEGORIES, help="Categories to re-score. Defaults to all.")
+    args = parser.parse_args()
+
+    rescore_date(args.date, args.categories)
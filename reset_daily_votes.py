@@ -0,0 +1,37 @@
+import os
+import sys
+import logging
+from sqlalchemy.exc import SQLAlchemyError
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.utils.vote import reset_daily_votes, compact_vote_history
+from app.models.db import get_db_connection
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def run_reset():
+    """
+    Zero the daily vote count of every user who has not voted today, and move any vote history left in
+    users.votes_per_category into user_category_votes.
+    """
+    app = create_app()
+    with app.app_context():
+        session = get_db_connection()
+        try:
+            reset = reset_daily_votes(session)
+            logger.info(f"Reset daily votes for {reset} users")
+            compacted = compact_vote_history(session)
+            logger.info(f"Moved leftover votes_per_category history into user_category_votes for {compacted} users")
+        except SQLAlchemyError as e:
+            logger.error(f"Database error occurred: {str(e)}")
+            session.rollback()
+        finally:
+            session.close()
+
+if __name__ == "__main__":
+    run_reset()
@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.exc import SQLAlchemyError
+
+# Add the project root directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.utils.scoring_queue import process_scoring_jobs
+from app.models.db import get_db_connection
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def run_worker(once=False):
+    """
+    Score queued submissions until stopped. LLM calls run on a thread pool of SCORING_WORKER_THREADS,
+    so this process absorbs the slow part of final submission instead of the gunicorn web workers.
+    Several copies can run at once; jobs are claimed with SKIP LOCKED.
+    """
+    app = create_app()
+    with app.app_context():
+        poll_interval = app.config['SCORING_POLL_INTERVAL']
+        with ThreadPoolExecutor(max_workers=app.config['SCORING_WORKER_THREADS']) as executor:
+            logger.info("Scoring worker started")
+            while True:
+                session = get_db_connection()
+                try:
+                    processed = process_scoring_jobs(session, executor)
+                    if processed:
+                        logger.info(f"Processed {processed} scoring jobs")
+                except SQLAlchemyError as e:
+                    logger.error(f"Database error occurred: {str(e)}")
+                    session.rollback()
+                    processed = 0
+                finally:
+                    session.close()
+
+                if once:
+                    break
+                if not processed:
+                    time.sleep(poll_interval)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score queued submissions.")
+    parser.add_argument('--once', action='store_true', help="Process one batch and exit.")
+    args = parser.parse_args()
+
+    run_worker(args.once)
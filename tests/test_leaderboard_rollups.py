@@ -0,0 +1,151 @@
+import os
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy.sql import text
+
+# The rollups use Postgres upserts and row locks, so these tests run against the database in DATABASE_URL.
+# Every row they write belongs to a throwaway category and users, which are removed afterwards.
+pytestmark = pytest.mark.skipif(
+    not (os.environ.get('DATABASE_URL') or '').startswith(('postgres://', 'postgresql')),
+    reason="needs a Postgres DATABASE_URL"
+)
+
+FIRST_DAY = date(2026, 5, 25)
+
+@pytest.fixture
+def board():
+    from app.models.db import get_db_connection
+
+    session = get_db_connection()
+    tag = uuid.uuid4().hex[:12]
+    category = f"test_{tag}"
+    user_ids = [
+        session.execute(
+            text("INSERT INTO users (email, name, is_admin) VALUES (:email, :name, FALSE) RETURNING id"),
+            {'email': f"{tag}_{i}@example.com", 'name': f"{tag}_{i}"}
+        ).scalar()
+        for i in range(3)
+    ]
+    session.execute(
+        text("INSERT INTO daily_challenges (challenge_id, category, original_challenge, date) VALUES (:id, :category, 'test', :date)"),
+        {'id': category, 'category': category, 'date': FIRST_DAY}
+    )
+    session.commit()
+    try:
+        yield session, category, user_ids
+    finally:
+        session.rollback()
+        for table in ('leaderboard_snapshots', 'leaderboard_rollups', 'leaderboard_rollup_state', 'leaderboard_entries', 'submissions'):
+            session.execute(text(f"DELETE FROM {table} WHERE category = :category"), {'category': category})
+        session.execute(text("DELETE FROM daily_challenges WHERE challenge_id = :category"), {'category': category})
+        session.execute(text("DELETE FROM users WHERE id = ANY(:ids)"), {'ids': user_ids})
+        session.commit()
+        session.close()
+
+def add_submission(session, category, user_id, day, votes):
+    return session.execute(
+        text("""
+            INSERT INTO submissions (date, category, challenge_id, challenge, user_phrase, user_id, votes)
+            VALUES (:date, :category, :category, 'test', 'test', :user_id, :votes)
+            RETURNING id
+        """),
+        {'date': day, 'category': category, 'user_id': user_id, 'votes': votes}
+    ).scalar()
+
+def finalize(session, category, day):
+    from app.utils.get_leaderboard import finalize_daily_leaderboards
+    from app.utils.leaderboard_rollups import update_leaderboard_rollups
+
+    finalize_daily_leaderboards(session, day, [category])
+    return update_leaderboard_rollups(session, category, day, 10)
+
+def assert_rollups_match_entries(session, category, end_date):
+    from app.utils.leaderboard_rollups import ROLLUP_PERIODS, rollup_window_start
+
+    for period in ROLLUP_PERIODS:
+        expected = dict(session.execute(
+            text("""
+                SELECT user_id, SUM(score) FROM leaderboard_entries
+                WHERE category = :category AND date BETWEEN :start AND :end
+                GROUP BY user_id
+            """),
+            {'category': category, 'start': rollup_window_start(period, end_date), 'end': end_date}
+        ).fetchall())
+        actual = dict(session.execute(
+            text("SELECT user_id, score FROM leaderboard_rollups WHERE category = :category AND period = :period"),
+            {'category': category, 'period': period}
+        ).fetchall())
+        assert {k: v for k, v in actual.items() if v} == {k: v for k, v in expected.items() if v}, period
+
+def test_correcting_a_counted_day_rebuilds_on_the_next_advance(board):
+    session, category, user_ids = board
+    days = [FIRST_DAY + timedelta(days=offset) for offset in range(12)]
+    corrected = {}
+    for index, day in enumerate(days[:8]):
+        for position, user_id in enumerate(user_ids):
+            submission_id = add_submission(session, category, user_id, day, (index + position) % 5 + 1)
+            if index == 2 and position == 0:
+                corrected['id'] = submission_id
+        session.commit()
+        finalize(session, category, day)
+
+    # Correct the third day, which every period has already counted
+    session.execute(text("UPDATE submissions SET votes = votes + 40 WHERE id = :id"), {'id': corrected['id']})
+    session.commit()
+    from app.utils.get_leaderboard import finalize_daily_leaderboards
+    finalize_daily_leaderboards(session, days[2], [category])
+
+    # The next day must rebuild rather than advance from totals that missed the correction
+    for day in days[8:]:
+        add_submission(session, category, user_ids[1], day, 2)
+        session.commit()
+        modes = finalize(session, category, day)
+        if day == days[8]:
+            assert set(modes.values()) == {'rebuilt'}
+        assert_rollups_match_entries(session, category, day)
+
+def test_consecutive_days_advance_incrementally(board):
+    session, category, user_ids = board
+    for offset in range(10):
+        day = FIRST_DAY + timedelta(days=offset)
+        add_submission(session, category, user_ids[offset % 3], day, offset + 1)
+        session.commit()
+        modes = finalize(session, category, day)
+        assert set(modes.values()) == {'rebuilt' if offset == 0 else 'incremental'}
+        assert_rollups_match_entries(session, category, day)
+
+def test_rebuild_forces_a_rebuild_on_the_next_day(board):
+    from app.utils.get_leaderboard import finalize_daily_leaderboards
+    from app.utils.leaderboard_rollups import update_leaderboard_rollups
+
+    session, category, user_ids = board
+    for offset in range(6):
+        day = FIRST_DAY + timedelta(days=offset)
+        add_submission(session, category, user_ids[0], day, 3)
+        session.commit()
+        finalize(session, category, day)
+
+    # A backfill rewrites days without resetting state, then finishes on the day after the last one counted
+    session.execute(text("UPDATE leaderboard_entries SET score = score + 10 WHERE category = :category"), {'category': category})
+    session.commit()
+    end_date = FIRST_DAY + timedelta(days=6)
+    add_submission(session, category, user_ids[1], end_date, 4)
+    session.commit()
+    finalize_daily_leaderboards(session, end_date, [category])
+    modes = update_leaderboard_rollups(session, category, end_date, 10, rebuild=True)
+    assert set(modes.values()) == {'rebuilt'}
+    assert_rollups_match_entries(session, category, end_date)
+
+def test_snapshot_is_only_served_through_its_end_date(board):
+    from app.utils.leaderboard_rollups import get_rollup_leaderboard
+
+    session, category, user_ids = board
+    add_submission(session, category, user_ids[0], FIRST_DAY, 5)
+    session.commit()
+    finalize(session, category, FIRST_DAY)
+
+    assert [entry['total_score'] for entry in get_rollup_leaderboard(session, category, 'weekly', FIRST_DAY)] == [5]
+    # A missed night leaves the snapshot behind, so the caller must fall back to summing the entries
+    assert get_rollup_leaderboard(session, category, 'weekly', FIRST_DAY + timedelta(days=1)) is None
@@ -0,0 +1,79 @@
+import random
+from datetime import date
+
+import pytest
+
+from app.utils.live_leaderboard import IndexableSkipList, SortedScoreSet, MemoryLiveLeaderboardBackend
+
+def test_skip_list_matches_a_sorted_list():
+    rng = random.Random(7)
+    skip_list = IndexableSkipList()
+    expected = []
+    for _ in range(2000):
+        key = rng.randrange(500)
+        if key in expected and rng.random() < 0.5:
+            skip_list.remove(key)
+            expected.remove(key)
+        elif key not in expected:
+            skip_list.insert(key)
+            expected.append(key)
+        expected.sort()
+        assert len(skip_list) == len(expected)
+
+    assert skip_list.first(len(expected) + 5) == expected
+    assert skip_list.first(10) == expected[:10]
+    for position, key in enumerate(expected):
+        assert skip_list.rank(key) == position
+
+def test_skip_list_misses():
+    skip_list = IndexableSkipList()
+    skip_list.insert(3)
+    assert skip_list.rank(4) is None
+    assert skip_list.first(0) == []
+    with pytest.raises(KeyError):
+        skip_list.remove(4)
+
+def test_sorted_score_set_ranks_by_score_then_member():
+    board = SortedScoreSet({'carol': 3, 'alice': 5, 'bob': 3})
+    assert board.top(3) == [('alice', 5), ('bob', 3), ('carol', 3)]
+    assert board.rank('carol') == 3
+
+    assert board.incr('carol', 4) == 7
+    assert board.top(2) == [('carol', 7), ('alice', 5)]
+    assert board.rank('bob') == 3
+    assert board.incr('dave', 1) == 1
+    assert board.rank('dave') == 4
+    assert board.rank('erin') is None
+    assert len(board) == 4
+
+def test_sorted_score_set_matches_a_full_sort():
+    rng = random.Random(11)
+    board = SortedScoreSet()
+    scores = {}
+    for _ in range(1000):
+        member = f"user{rng.randrange(60)}"
+        amount = rng.randrange(1, 4)
+        scores[member] = scores.get(member, 0) + amount
+        board.incr(member, amount)
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    assert board.top(10) == ranked[:10]
+    for position, (member, _) in enumerate(ranked, start=1):
+        assert board.rank(member) == position
+
+def test_memory_backend_ignores_votes_for_unloaded_boards_and_drops_old_ones():
+    backend = MemoryLiveLeaderboardBackend(ttl=60, max_boards=2)
+    first, second, third = (('slogan', date(2026, 10, day)) for day in (14, 15, 16))
+    backend.incr(first, 'alice', 1)
+    assert not backend.is_loaded(first)
+    assert backend.top(first, 5) == []
+
+    backend.replace(first, {'alice': 2})
+    backend.incr(first, 'bob', 3)
+    assert backend.top(first, 5) == [('bob', 3), ('alice', 2)]
+    assert backend.rank(first, 'alice') == 2
+
+    backend.replace(second, {})
+    backend.replace(third, {})
+    assert not backend.is_loaded(first)
+    assert backend.stats() == {'boards': 2, 'members': 0}
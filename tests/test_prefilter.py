@@ -0,0 +1,76 @@
+from datetime import date
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+
+from app.utils.prefilter import PhrasePrefilter, PREFILTER_SCORE
+
+def matched_rule(phrase):
+    return PhrasePrefilter()._match_rules(phrase)
+
+@pytest.mark.parametrize('phrase', [
+    "Buy buy buy buy now",
+    "ha ha ha ha, very funny",
+    "I love dot.com startups",
+    "Run run run",
+    "Meet me at the cafe.No wait, the park",
+    "Sweet dreams are made of this",
+])
+def test_ordinary_phrases_pass_the_rules(phrase):
+    assert matched_rule(phrase) is None
+
+@pytest.mark.parametrize('phrase, rule', [
+    ("!!! ??? 123", 'no_letters'),
+    ("Nooooooooooooo", 'repeated_characters'),
+    ("ha ha ha ha", 'repeated_words'),
+    ("Spam, spam, SPAM, spam!", 'repeated_words'),
+    ("check out https://example.com", 'link'),
+    ("visit www.example.org today", 'link'),
+])
+def test_junk_phrases_match_their_rule(phrase, rule):
+    assert matched_rule(phrase)[0] == rule
+
+@pytest.fixture
+def checker():
+    app = Flask(__name__)
+    app.config.update(PREFILTER_CHALLENGE_SIMILARITY=0.85, PREFILTER_REFRESH_SECONDS=0)
+    engine = create_engine('sqlite://')
+    session = Session(engine)
+    session.execute(text("CREATE TABLE submissions (id INTEGER PRIMARY KEY, challenge_id TEXT, user_phrase TEXT, date DATE)"))
+    session.execute(
+        text("INSERT INTO submissions (challenge_id, user_phrase, date) VALUES ('c1', 'The moon hums a lullaby', :date)"),
+        {'date': date.today()}
+    )
+    session.commit()
+    with app.app_context():
+        yield PhrasePrefilter(), session
+    session.close()
+
+def test_duplicates_are_rejected_after_normalizing(checker):
+    prefilter, session = checker
+    score, feedback = prefilter.check(session, "  the MOON hums a lullaby ", 'c1', "Write a tiny story about the night sky")
+    assert score == PREFILTER_SCORE
+    assert "already been submitted" in feedback
+    assert prefilter.stats()['rejections']['duplicate'] == 1
+
+def test_final_submission_skips_the_duplicate_check(checker):
+    prefilter, session = checker
+    assert prefilter.check(session, "The moon hums a lullaby", 'c1', "Write a tiny story about the night sky", check_duplicate=False) is None
+
+def test_copying_the_challenge_is_rejected(checker):
+    prefilter, session = checker
+    challenge = "Describe a rainy street market at dusk"
+    assert prefilter.check(session, "describe a rainy street market at dusk", 'c1', challenge)[0] == PREFILTER_SCORE
+    assert prefilter.check(session, "Umbrellas bloom between the fruit stalls", 'c1', challenge) is None
+
+def test_recorded_submissions_count_as_duplicates(checker):
+    prefilter, session = checker
+    challenge = "Write a tiny story about the night sky"
+    assert prefilter.check(session, "Stars blink in Morse code", 'c1', challenge) is None
+    prefilter.record_submission('c1', "Stars blink in Morse code")
+    # Within the refresh window the new phrase is only known from record_submission
+    prefilter.seen['c1']['loaded_at'] = float('inf')
+    assert prefilter.check(session, "stars blink in morse code", 'c1', challenge) is not None
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import rate_limit
+from app.utils.rate_limit import MemoryRateLimitBackend, RateLimiter, parse_rate_limit
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the module under test sees the fake clock
+    monkeypatch.setattr(rate_limit, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+def test_parse_rate_limit():
+    assert parse_rate_limit("6/60") == (6.0, 0.1)
+    assert parse_rate_limit("5") == (5.0, 5.0)
+    assert parse_rate_limit("") is None
+    with pytest.raises(ValueError):
+        parse_rate_limit("0/60")
+
+def test_a_full_bucket_allows_a_burst_of_its_capacity(clock):
+    backend = MemoryRateLimitBackend()
+    limits = [('score:user:1', 3, 0.5)]
+    assert [backend.acquire(limits) for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Empty: one token takes 1 / 0.5 seconds to refill
+    assert backend.acquire(limits) == pytest.approx(2.0)
+
+def test_tokens_refill_at_the_rate_up_to_capacity(clock):
+    backend = MemoryRateLimitBackend()
+    limits = [('score:user:1', 2, 1.0)]
+    backend.acquire(limits)
+    backend.acquire(limits)
+    clock.now += 0.25
+    assert backend.acquire(limits) == pytest.approx(0.75)
+    clock.now += 0.75
+    assert backend.acquire(limits) == 0.0
+    # A long idle spell refills only up to capacity
+    clock.now += 100
+    assert [backend.acquire(limits) for _ in range(3)] == [0.0, 0.0, pytest.approx(1.0)]
+
+def test_a_rejected_request_is_not_charged_to_any_bucket(clock):
+    backend = MemoryRateLimitBackend()
+    user = ('score:user:1', 5, 1.0)
+    shared = ('score:global', 1, 0.1)
+    assert backend.acquire([user, shared]) == 0.0
+    assert backend.acquire([user, shared]) == pytest.approx(10.0)
+    # The user bucket kept the token the rejected request would have taken
+    assert backend.buckets['score:user:1'][0] == 4
+
+def test_least_recently_used_buckets_are_dropped(clock):
+    backend = MemoryRateLimitBackend(max_keys=2)
+    for user_id in (1, 2, 3):
+        backend.acquire([(f'score:user:{user_id}', 1, 1.0)])
+    assert list(backend.buckets) == ['score:user:2', 'score:user:3']
+
+def test_limiter_skips_scopes_without_an_identity_and_counts(clock):
+    limiter = RateLimiter(MemoryRateLimitBackend(), {'score': {'user': (1, 1.0), 'ip': (2, 1.0), 'global': None}})
+    assert limiter.check('score', None, '10.0.0.1') == 0.0
+    assert limiter.check('score', None, '10.0.0.1') == 0.0
+    assert limiter.check('score', 7, '10.0.0.1') == pytest.approx(1.0)
+    assert limiter.stats()['allowed'] == {'score': 2}
+    assert limiter.stats()['limited'] == {'score': 1}
+
+def test_limiter_fails_open_when_the_backend_errors():
+    class Broken:
+        name = 'broken'
+
+        def acquire(self, limits):
+            raise RuntimeError("store unavailable")
+
+    limiter = RateLimiter(Broken(), {'score': {'user': (1, 1.0), 'ip': None, 'global': None}})
+    assert limiter.check('score', 1, None) == 0.0
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import resilience
+from app.utils.llm import LLMProviderError
+from app.utils.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceededError, ResilientProvider
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    # Only the module under test sees the fake clock
+    monkeypatch.setattr(resilience, 'time', SimpleNamespace(monotonic=clock))
+    return clock
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+def test_consecutive_failures_open_the_breaker(clock):
+    breaker = CircuitBreaker('score', failure_threshold=3, reset_timeout=30)
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success(0.1)
+    assert breaker.consecutive_failures == 0
+
+    open_breaker(breaker)
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats()['rejected'] == 1
+
+def test_slow_calls_count_as_failures(clock):
+    breaker = CircuitBreaker('score', failure_threshold=2, slow_call_threshold=5)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_success(6.0)
+    assert breaker.state == 'open'
+    assert breaker.stats()['slow_calls'] == 2
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker('score', failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    clock.now += 30
+    breaker.before_call()
+    assert breaker.state == 'half_open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success(0.1)
+    assert breaker.state == 'closed'
+    breaker.before_call()
+
+def test_a_failed_trial_reopens_the_breaker(clock):
+    breaker = CircuitBreaker('score', failure_threshold=5, reset_timeout=30)
+    open_breaker(breaker)
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+def test_a_cancelled_trial_frees_the_slot_without_a_verdict(clock):
+    breaker = CircuitBreaker('score', failure_threshold=1, reset_timeout=30)
+    open_breaker(breaker)
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_cancelled()
+    assert breaker.state == 'half_open'
+    breaker.before_call()
+    assert breaker.trial_in_flight
+
+class SlowProvider:
+    name = 'slow'
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.closed = False
+
+    def stream(self, purpose, messages, **params):
+        try:
+            for piece in range(100):
+                time.sleep(self.delay)
+                yield str(piece)
+        finally:
+            self.closed = True
+
+    @asynccontextmanager
+    async def async_session(self):
+        yield self
+
+    async def complete(self, purpose, messages, **params):
+        await asyncio.sleep(10)
+
+def test_a_stream_is_cut_off_at_its_deadline():
+    provider = SlowProvider(0.02)
+    resilient = ResilientProvider(provider, {'default': 0.1}, failure_threshold=1)
+    pieces = []
+    with pytest.raises(DeadlineExceededError):
+        for piece in resilient.stream('score', []):
+            pieces.append(piece)
+    assert 0 < len(pieces) < 100
+    assert provider.closed
+    assert resilient.breaker('score').state == 'open'
+    assert isinstance(DeadlineExceededError(), LLMProviderError)
+
+def test_an_abandoned_stream_frees_the_trial_slot(clock):
+    resilient = ResilientProvider(SlowProvider(0), {'default': 10}, failure_threshold=1, reset_timeout=30)
+    breaker = resilient.breaker('score')
+    open_breaker(breaker)
+    clock.now += 30
+    stream = resilient.stream('score', [])
+    next(stream)
+    stream.close()
+    assert breaker.state == 'half_open' and not breaker.trial_in_flight
+
+def test_a_cancelled_async_call_frees_the_trial_slot(clock):
+    resilient = ResilientProvider(SlowProvider(0), {'default': 10}, failure_threshold=1, reset_timeout=30)
+    breaker = resilient.breaker('challenge')
+    open_breaker(breaker)
+    clock.now += 30
+
+    async def call():
+        async with resilient.async_session() as session:
+            await asyncio.wait_for(session.complete('challenge', []), 0.01)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(call())
+    assert breaker.state == 'half_open' and not breaker.trial_in_flight
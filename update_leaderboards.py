@@ -1,38 +1,66 @@
 import os
 import sys
+import json
+import time
 import logging
-from datetime import date, timedelta
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, date, timedelta
 from sqlalchemy.exc import SQLAlchemyError
 
 # Add the project root directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app import create_app
-from app.utils.get_leaderboard import update_daily_leaderboard
+from config import Config
+from app.utils.get_challenge import CATEGORIES
+from app.utils.get_leaderboard import finalize_daily_leaderboards
+from app.utils.leaderboard_rollups import update_leaderboard_rollups
+from app.utils.vote import flush_vote_events
 from app.models.db import get_db_connection
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Where a backfill records the days it has finished, so an interrupted run can resume
+DEFAULT_CHECKPOINT = '.leaderboard_backfill.json'
+
+def et_yesterday():
+    # /api/leaderboard only serves rollups that run through the ET yesterday
+    return datetime.now(Config.TIMEZONE).date() - timedelta(days=1)
+
+def update_rollups(session, snapshot_size, through_date, rebuild=False):
+    for category in CATEGORIES:
+        modes = update_leaderboard_rollups(session, category, through_date, snapshot_size, rebuild)
+        logger.info(f"Updated rollups for category: {category} ({', '.join(f'{period}: {mode}' for period, mode in modes.items())})")
+
 def update_all_leaderboards(target_date=None):
     """
-    Update leaderboards for all categories for a specific date.
-    If no date is provided, it updates for yesterday.
+    Update leaderboards for all categories for a specific date, then advance the weekly, monthly and
+    all-time rollups to include it. If no date is provided, it updates for yesterday.
     """
     if target_date is None:
-        target_date = date.today() - timedelta(days=1)
-    
-    categories = ['tiny_story', 'scene_description', 'specific_word', 'rhyming_phrase', 
-                    'emotion', 'dialogue', 'idiom', 'slogan', 'movie_quote']
+        target_date = et_yesterday()
     
     app = create_app()
     with app.app_context():
         session = get_db_connection()
         try:
-            for category in categories:
-                logger.info(f"Updating leaderboard for category: {category}, date: {target_date}")
-                update_daily_leaderboard(category, target_date)
+            # Count any write-behind votes that have not been folded into submissions yet
+            folded = flush_vote_events(session, app.config['VOTE_FLUSH_BATCH_SIZE'], wait=True)
+            logger.info(f"Folded {folded} pending vote events")
+            
+            started = time.perf_counter()
+            written, removed = finalize_daily_leaderboards(session, target_date, CATEGORIES)
+            logger.info(
+                f"Finalized leaderboard entries for {target_date} in {time.perf_counter() - started:.2f}s: "
+                f"{sum(written.values())} inserted or changed, {removed} stale removed"
+            )
+            for category in CATEGORIES:
+                logger.info(f"Category {category}: {written.get(category, 0)} entries inserted or changed")
+            
+            update_rollups(session, app.config['LEADERBOARD_SNAPSHOT_SIZE'], target_date)
             logger.info("All leaderboards updated successfully")
         except SQLAlchemyError as e:
             logger.error(f"Database error occurred: {str(e)}")
@@ -42,15 +70,113 @@ def update_all_leaderboards(target_date=None):
         finally:
             session.close()
 
-if __name__ == "__main__":
-    # Check if a date argument is provided
-    if len(sys.argv) > 1:
+def load_checkpoint(path, start_date, end_date):
+    """
+    Return the days a previous backfill of the same range finished, or an empty set if there is none.
+    """
+    try:
+        with open(path) as f:
+            checkpoint = json.load(f)
+    except FileNotFoundError:
+        return set()
+    if checkpoint.get('start') != start_date.isoformat() or checkpoint.get('end') != end_date.isoformat():
+        logger.info(f"Ignoring checkpoint {path}, it is for {checkpoint.get('start')} to {checkpoint.get('end')}")
+        return set()
+    return {date.fromisoformat(day) for day in checkpoint.get('done', [])}
+
+def save_checkpoint(path, start_date, end_date, done):
+    # Write to a temporary file and rename it, so an interrupted write never leaves a corrupt checkpoint
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w') as f:
+        json.dump({'start': start_date.isoformat(), 'end': end_date.isoformat(), 'done': sorted(day.isoformat() for day in done)}, f)
+    os.replace(temporary, path)
+
+def finalize_day(target_date):
+    # Each worker thread finalizes its day on its own session and connection
+    session = get_db_connection()
+    try:
+        started = time.perf_counter()
+        written, removed = finalize_daily_leaderboards(session, target_date, CATEGORIES)
+        return sum(written.values()), removed, time.perf_counter() - started
+    finally:
+        session.close()
+
+def backfill_leaderboards(start_date, end_date, workers=4, checkpoint_path=DEFAULT_CHECKPOINT, restart=False):
+    """
+    Recompute the leaderboard entries of every day from start_date to end_date, spread over a pool of worker
+    threads, then rebuild the rollups once. Finished days are recorded in a checkpoint file, so running the
+    same range again after an interruption only does the days that are left.
+    """
+    days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+    done = set() if restart else load_checkpoint(checkpoint_path, start_date, end_date)
+    pending = [day for day in days if day not in done]
+    logger.info(f"Backfilling {len(days)} days from {start_date} to {end_date}: {len(done)} already done, {len(pending)} to go, {workers} workers")
+
+    app = create_app()
+    with app.app_context():
+        session = get_db_connection()
         try:
-            target_date = date.fromisoformat(sys.argv[1])
-        except ValueError:
-            logger.error("Invalid date format. Please use YYYY-MM-DD.")
+            folded = flush_vote_events(session, app.config['VOTE_FLUSH_BATCH_SIZE'], wait=True)
+            logger.info(f"Folded {folded} pending vote events")
+        finally:
+            session.close()
+
+        started = time.perf_counter()
+        failed = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(finalize_day, day): day for day in pending}
+            for finished, future in enumerate(as_completed(futures), 1):
+                day = futures[future]
+                try:
+                    written, removed, elapsed = future.result()
+                except Exception as e:
+                    failed.append(day)
+                    logger.error(f"[{finished}/{len(pending)}] {day} failed: {str(e)}")
+                    continue
+
+                done.add(day)
+                save_checkpoint(checkpoint_path, start_date, end_date, done)
+                rate = finished / (time.perf_counter() - started)
+                logger.info(
+                    f"[{finished}/{len(pending)}] {day}: {written} inserted or changed, {removed} stale removed "
+                    f"in {elapsed:.2f}s, about {(len(pending) - finished) / rate:.0f}s left"
+                )
+
+        logger.info(f"Finalized {len(pending) - len(failed)} days in {time.perf_counter() - started:.2f}s")
+        if failed:
+            logger.error(f"{len(failed)} days failed and can be retried by running the same range again: {', '.join(day.isoformat() for day in sorted(failed))}")
             sys.exit(1)
+
+        # The days were finished out of order, so the rollups are rebuilt once at the end
+        session = get_db_connection()
+        try:
+            update_rollups(session, app.config['LEADERBOARD_SNAPSHOT_SIZE'], end_date, rebuild=True)
+        finally:
+            session.close()
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        logger.info("Backfill finished")
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("Invalid date format. Please use YYYY-MM-DD.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Finalize daily leaderboards and update the rollups.")
+    parser.add_argument('target_date', nargs='?', type=parse_date, help="Day to finalize (YYYY-MM-DD). Defaults to yesterday.")
+    parser.add_argument('--start', type=parse_date, help="First day of a backfill (YYYY-MM-DD).")
+    parser.add_argument('--end', type=parse_date, help="Last day of a backfill (YYYY-MM-DD). Defaults to yesterday.")
+    parser.add_argument('--workers', type=int, default=4, help="Days finalized in parallel during a backfill, each on its own connection (the pool allows up to 15).")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help="File recording the days a backfill has finished.")
+    parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint and redo the whole range.")
+    args = parser.parse_args()
+
+    if args.start is not None:
+        end_date = args.end or et_yesterday()
+        if end_date < args.start:
+            parser.error("--end must not be before --start")
+        backfill_leaderboards(args.start, end_date, args.workers, args.checkpoint, args.restart)
     else:
-        target_date = None
-    
-    update_all_leaderboards(target_date)
\ No newline at end of file
+        update_all_leaderboards(args.target_date)